@@ -0,0 +1,140 @@
+import ast
+
+from analysis.incremental import LLM_ERROR_PREFIX
+from analysis.shared import (
+    CHARS_PER_TOKEN,
+    analyze_function_with_llama,
+    estimate_tokens,
+)
+
+SUMMARY_TOKEN_THRESHOLD = 3000  # Bundan büyük dosyalar parça parça özetlenir
+SUMMARY_CHUNK_TOKENS = 2000  # Bir parça (ve bir birleştirme) prompt'unun hedef boyutu
+
+
+def needs_chunked_summary(code, token_threshold=SUMMARY_TOKEN_THRESHOLD):
+    """token_threshold 0 ise parçalı özet kapalıdır"""
+    return token_threshold > 0 and estimate_tokens(code) > token_threshold
+
+
+def is_failed_summary(text):
+    return not text or str(text).startswith(LLM_ERROR_PREFIX)
+
+
+def split_top_level_chunks(code, max_tokens=SUMMARY_CHUNK_TOKENS):
+    """Kodu üst düzey tanım sınırlarından bölüp max_tokens'a sığan parçalar yapar.
+
+    Tek başına sınırı aşan sınıflar metot sınırlarından (her parça sınıf
+    başlığıyla), geri kalan büyük bloklar satır sınırlarından bölünür.
+    Ayrıştırılamayan kod doğrudan satırlara göre bölünür.
+    """
+    lines = code.splitlines(keepends=True)
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return _split_lines(lines, max_tokens)
+    if not tree.body:
+        return _split_lines(lines, max_tokens)
+
+    segments = []
+    for start, end, node in _spans(tree.body, 0, len(lines)):
+        text = "".join(lines[start:end])
+        if estimate_tokens(text) <= max_tokens:
+            segments.append(text)
+        elif isinstance(node, ast.ClassDef):
+            segments.extend(_split_class(node, lines, start, end, max_tokens))
+        else:
+            segments.extend(_split_lines(lines[start:end], max_tokens))
+    return merge_segments(segments, max_tokens)
+
+
+def group_by_tokens(texts, max_tokens):
+    """Ardışık metinleri sırayı bozmadan max_tokens'a sığan listelere ayırır"""
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def merge_segments(segments, max_tokens):
+    return ["".join(group) for group in group_by_tokens(segments, max_tokens)]
+
+
+def _node_start(node):
+    """Dekoratörler dahil düğümün ilk satırının indeksi"""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators]) - 1
+
+
+def _spans(nodes, start, end):
+    """Düğümleri [başlangıç, bitiş) satır aralıklarına çevirir.
+
+    İlk aralık start'tan başlar (dosya başındaki yorumlar dahil), aradaki
+    yorum ve boş satırlar önceki düğüme kalır.
+    """
+    starts = [start] + [_node_start(node) for node in nodes[1:]]
+    ends = starts[1:] + [end]
+    return zip(starts, ends, nodes)
+
+
+def _split_class(node, lines, start, end, max_tokens):
+    body_start = _node_start(node.body[0])
+    header = "".join(lines[start:body_start])
+    pieces = []
+    for child_start, child_end, _ in _spans(node.body, body_start, end):
+        text = "".join(lines[child_start:child_end])
+        if estimate_tokens(text) <= max_tokens:
+            pieces.append(text)
+        else:
+            pieces.extend(_split_lines(lines[child_start:child_end], max_tokens))
+    # Her parça sınıf başlığıyla başlar; model metodun hangi sınıfa ait
+    # olduğunu bilir
+    budget = max(1, max_tokens - estimate_tokens(header))
+    return [header + piece for piece in merge_segments(pieces, budget)]
+
+
+def _split_lines(lines, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current, current_chars = [], 0
+    for line in lines:
+        if current and current_chars + len(line) > max_chars:
+            chunks.append("".join(current))
+            current, current_chars = [], 0
+        current.append(line)
+        current_chars += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def summarize_file_chunk(chunk, index, total):
+    """Map adımı: büyük dosyanın tek parçasını özetler"""
+    prompt = (
+        f"Aşağıda büyük bir Python dosyasının {index}/{total}. parçası var. "
+        f"Bu parçadaki sınıf ve fonksiyonları, ne yaptıklarını ve kullandıkları "
+        f"modülleri kısaca özetle. Güvenlik, verimlilik ya da okunabilirlik "
+        f"açısından dikkat çeken noktaları belirt:\n\n{chunk}"
+    )
+    return analyze_function_with_llama(chunk, prompt, kind="summary_chunk")
+
+
+def reduce_file_summaries(summaries, on_token=None):
+    """Reduce adımı: parça özetlerini tek bir dosya özetinde birleştirir"""
+    joined = "\n\n".join(
+        f"### Parça {index}\n{summary}" for index, summary in enumerate(summaries, 1)
+    )
+    prompt = (
+        f"Aşağıda büyük bir Python dosyasının parça parça çıkarılmış özetleri var. "
+        f"Bunları birleştirerek dosyanın genel yapısını açıkla. Dosyada hangi modüller var, "
+        f"hangi işlemleri yapıyor? Önemli sınıflar, fonksiyonlar ve dosyanın amacı nedir? "
+        f"Güvenlik, verimlilik ya da okunabilirlik açısından genel bir değerlendirme yap:\n\n{joined}"
+    )
+    return analyze_function_with_llama(joined, prompt, on_token, kind="summary_reduce")
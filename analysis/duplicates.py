@@ -0,0 +1,123 @@
+DUPLICATES_OFF = "off"
+DUPLICATES_EXACT = "exact"  # Yalnızca isim/biçim farkı olan kopyalar
+DUPLICATES_NEAR = "near"  # Sabit değerleri de farklı olabilen yakın kopyalar
+# Sabitleri farklı fonksiyonlar farklı davranabilir; yakın eşleşme isteğe bağlıdır
+DUPLICATE_MATCH = DUPLICATES_EXACT
+# Kısa fonksiyonlarda sabit değer anlamın tamamıdır ("return 3" / "return 5"),
+# bu yüzden yakın kopya eşleşmesi yalnızca bu uzunluktan itibaren yapılır
+NEAR_DUPLICATE_MIN_LINES = 5
+
+
+class DuplicateIndex:
+    """Bir çalıştırmadaki kopya fonksiyonları parmak iziyle eşler.
+
+    Her gruptan ilk görülen fonksiyon temsilci olur ve LLM'e yalnızca o
+    gönderilir; sonraki kopyalar temsilcinin sonuçlarını paylaşır.
+    Önce birebir ("fingerprint"), mode "near" ise ardından yakın kopya
+    ("near_fingerprint") eşleşmesi aranır.
+    """
+
+    def __init__(self, mode=DUPLICATE_MATCH):
+        self.mode = mode
+        self.exact = {}
+        self.near = {}
+        self.stats = {"functions_deduplicated": 0}
+
+    def find(self, func):
+        """Fonksiyonun temsilcisini (kayıt, eşleşme türü) olarak döndürür, yoksa None"""
+        if self.mode == DUPLICATES_OFF:
+            return None
+        representative = self.exact.get(func.get("fingerprint"))
+        if representative:
+            return representative, DUPLICATES_EXACT
+        if self.mode == DUPLICATES_NEAR and _near_eligible(func):
+            representative = self.near.get(func.get("near_fingerprint"))
+            if representative:
+                return representative, DUPLICATES_NEAR
+        return None
+
+    def register(self, pending, func, futures=None, previous=None):
+        """Fonksiyonu kendi grubunun temsilcisi olarak kaydeder (ilk kayıt kalır)"""
+        if self.mode == DUPLICATES_OFF:
+            return
+        entry = {
+            "pending": pending,
+            "func": func,
+            "futures": futures,
+            "previous": previous,
+        }
+        if func.get("fingerprint"):
+            self.exact.setdefault(func["fingerprint"], entry)
+        if func.get("near_fingerprint") and _near_eligible(func):
+            self.near.setdefault(func["near_fingerprint"], entry)
+
+    def link(self, pending, func, representative, match):
+        """Kopyayı bekleyen dosyaya temsilcisiyle birlikte not eder"""
+        pending.setdefault("duplicates", {})[id(func)] = (representative, match)
+        self.stats["functions_deduplicated"] += 1
+
+
+def _near_eligible(func):
+    return (func.get("length") or 0) >= NEAR_DUPLICATE_MIN_LINES
+
+
+def duplicate_of_entry(representative, match):
+    """Sonuç dosyasında kopyanın hangi fonksiyonun sonucunu paylaştığı"""
+    return {
+        "path": representative["pending"]["path"],
+        "name": representative["func"]["name"],
+        "lineno": representative["func"]["lineno"],
+        "match": match,
+    }
+
+
+def duplicate_report(analysis_results, min_count=2):
+    """Sonuçlardaki kopya fonksiyon gruplarını büyükten küçüğe listeler.
+
+    Birden çok reponun sonuçları birleştirilerek verilebilir. Birebir
+    kopya grupları, yalnızca sabitleri farklı yakın kopya gruplarından
+    ayrı raporlanır; birebir grupla aynı üyelere sahip yakın gruplar tekrar
+    yazılmaz.
+    """
+    exact = {}
+    near = {}
+    for file in analysis_results:
+        path = file.get("path", file.get("source_file"))
+        for func in file.get("functions", []):
+            member = {
+                "path": path,
+                "name": func.get("name"),
+                "lineno": func.get("lineno"),
+                "length": func.get("length"),
+            }
+            if func.get("fingerprint"):
+                exact.setdefault(func["fingerprint"], []).append(member)
+            if func.get("near_fingerprint") and _near_eligible(func):
+                near.setdefault(func["near_fingerprint"], []).append(member)
+
+    groups = []
+    for fingerprint, members in exact.items():
+        if len(members) >= min_count:
+            groups.append(_report_group(fingerprint, DUPLICATES_EXACT, members))
+    exact_keys = {
+        tuple(sorted((m["path"], m["lineno"]) for m in g["functions"])) for g in groups
+    }
+    for fingerprint, members in near.items():
+        key = tuple(sorted((m["path"], m["lineno"]) for m in members))
+        if len(members) >= min_count and key not in exact_keys:
+            groups.append(_report_group(fingerprint, DUPLICATES_NEAR, members))
+
+    groups.sort(key=lambda g: (-g["count"], -g["redundant_lines"], g["fingerprint"]))
+    return groups
+
+
+def _report_group(fingerprint, match, members):
+    length = members[0].get("length") or 0
+    return {
+        "fingerprint": fingerprint,
+        "match": match,
+        "count": len(members),
+        # Temsilci dışındaki kopyaların toplam satırı
+        "redundant_lines": length * (len(members) - 1),
+        "functions": members,
+    }
@@ -1,52 +1,256 @@
 import ast
-import streamlit as st
-import astor
+import hashlib
+import textwrap
+
+from analysis.progress import resolve_progress
+
+
+class SourceVisitor(ast.NodeVisitor):
+    """Kaynağı tek geçişte dolaşıp fonksiyon, sınıf ve import bilgilerini toplar"""
+
+    def __init__(self, code):
+        self.lines = code.splitlines(keepends=True)
+        self.functions = []
+        self.classes = []
+        self.imports = []
+        self._class_stack = []
+
+    def segment(self, node):
+        """Düğümün kaynağını (dekoratörler dahil) satır aralığından keser"""
+        start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+        end = getattr(node, "end_lineno", None) or node.lineno
+        return textwrap.dedent("".join(self.lines[start - 1 : end]))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append(alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node):
+        if node.module:
+            self.imports.append(node.module.split(".")[0])
+
+    def visit_ClassDef(self, node):
+        self.classes.append(
+            {
+                "name": node.name,
+                "lineno": node.lineno,
+                "end_lineno": getattr(node, "end_lineno", None),
+                "methods": [
+                    child.name
+                    for child in node.body
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ],
+            }
+        )
+        self._class_stack.append(node.name)
+        self.generic_visit(node)
+        self._class_stack.pop()
+
+    def visit_FunctionDef(self, node):
+        func_code = self.segment(node)
+        end_lineno = getattr(node, "end_lineno", None)
+
+        self.functions.append(
+            {
+                "name": node.name,
+                "args": [arg.arg for arg in node.args.args],
+                "docstring": ast.get_docstring(node),
+                "lineno": node.lineno,
+                "end_lineno": end_lineno,
+                "length": end_lineno - node.lineno if end_lineno else None,
+                "class_name": self._class_stack[-1] if self._class_stack else None,
+                "code": func_code,
+                "source_hash": normalized_source_hash(node),
+                **function_fingerprints(node),
+                # Fonksiyon karmaşıklığını hesapla (basit metrik)
+                "complexity": func_code.count("\n") + 1,
+                **control_flow_stats(node),
+            }
+        )
+        # İç içe fonksiyonların sınıf bağlamı yoktur
+        self._class_stack.append(None)
+        self.generic_visit(node)
+        self._class_stack.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+BRANCH_NODES = (
+    ast.If,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    ast.With,
+    ast.AsyncWith,
+    ast.IfExp,
+    ast.BoolOp,
+    ast.ExceptHandler,
+    ast.comprehension,
+)
+BLOCK_NODES = (
+    ast.If,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    ast.With,
+    ast.AsyncWith,
+)
+
+
+def control_flow_stats(node):
+    """Fonksiyon gövdesindeki dallanma sayısı ve en derin blok iç içeliği.
+
+    İç fonksiyon ve sınıflara inilmez; onlar kendi kayıtlarında sayılır.
+    """
+    branches = 0
+    max_depth = 0
+    stack = [(child, 1) for child in node.body]
+    while stack:
+        current, depth = stack.pop()
+        if isinstance(
+            current, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            continue
+        if isinstance(current, BRANCH_NODES):
+            branches += 1
+        if isinstance(current, BLOCK_NODES):
+            max_depth = max(max_depth, depth)
+            depth += 1
+        stack.extend((child, depth) for child in ast.iter_child_nodes(current))
+    return {"branches": branches, "max_depth": max_depth}
+
+
+def normalized_source_hash(node):
+    """Biçimlendirme ve yorumlardan bağımsız, AST tabanlı kaynak özeti"""
+    dumped = ast.dump(node, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+def function_fingerprints(node):
+    """İsimlerden, docstring'lerden ve biçimlendirmeden bağımsız AST parmak izleri.
+
+    Fonksiyonun kendi adı yok sayılır, fonksiyon içinde bağlanan isimler
+    (parametreler, yerel değişkenler, iç tanımlar) ilk görülme sırasına göre
+    yeniden adlandırılır; global isimler ve öznitelik adları korunur.
+    "fingerprint" birebir kopyaları, sabit değerlerin yalnızca türünü dikkate
+    alan "near_fingerprint" ise sabitleri farklı yakın kopyaları eşler.
+    """
+    bound = _bound_names(node)
+    exact = _normalized_dump(node, node, bound, {}, abstract_constants=False)
+    near = _normalized_dump(node, node, bound, {}, abstract_constants=True)
+    return {
+        "fingerprint": hashlib.sha256(exact.encode("utf-8")).hexdigest(),
+        "near_fingerprint": hashlib.sha256(near.encode("utf-8")).hexdigest(),
+    }
+
+
+def _bound_names(node):
+    bound = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.arg):
+            bound.add(child.arg)
+        elif isinstance(child, ast.Name) and not isinstance(child.ctx, ast.Load):
+            bound.add(child.id)
+        elif child is not node and isinstance(
+            child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            bound.add(child.name)
+        elif isinstance(child, ast.alias):
+            bound.add((child.asname or child.name).split(".")[0])
+        elif isinstance(child, ast.ExceptHandler) and child.name:
+            bound.add(child.name)
+    return bound
+
+
+def _strip_docstring(body):
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        return body[1:]
+    return body
+
+
+def _normalized_dump(node, root, bound, names, abstract_constants):
+    if isinstance(node, list):
+        return (
+            "["
+            + ",".join(
+                _normalized_dump(item, root, bound, names, abstract_constants)
+                for item in node
+            )
+            + "]"
+        )
+    if not isinstance(node, ast.AST):
+        return repr(node)
+
+    def rename(name):
+        if name not in bound:
+            return name
+        return names.setdefault(name, f"_{len(names)}")
+
+    if isinstance(node, ast.Name):
+        return f"Name({rename(node.id)})"
+    if isinstance(node, ast.Constant):
+        if abstract_constants:
+            return f"Constant({type(node.value).__name__})"
+        return f"Constant({node.value!r})"
+
+    fields = []
+    for field, value in ast.iter_fields(node):
+        if field in ("ctx", "type_comment", "kind"):
+            continue
+        if field == "body" and isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            value = _strip_docstring(value)
+        if field in ("name", "arg", "asname") and isinstance(value, str):
+            if node is root:
+                continue
+            value = rename(value)
+        fields.append(_normalized_dump(value, root, bound, names, abstract_constants))
+    return f"{type(node).__name__}({','.join(fields)})"
+
+
+def parse_source(code, tree=None):
+    """Kodu bir kez ayrıştırır; fonksiyonlar, sınıflar, importlar ve satır sayısını döndürür.
+
+    Daha önce ayrıştırılmış ağaç tree ile verilirse yeniden ayrıştırılmaz.
+    Sözdizimi hatasında listeler boş kalır ve "error" alanı doldurulur.
+    """
+    parsed = {
+        "functions": [],
+        "classes": [],
+        "imports": [],
+        "line_count": len(code.splitlines()),
+        "error": None,
+    }
+    if tree is None:
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError) as e:
+            parsed["error"] = f"{type(e).__name__}: {e}"
+            return parsed
+
+    visitor = SourceVisitor(code)
+    visitor.visit(tree)
+    parsed["functions"] = visitor.functions
+    parsed["classes"] = visitor.classes
+    parsed["imports"] = visitor.imports
+    return parsed
 
 
 def extract_modules_from_code(code):
     """Koddan kullanılan modülleri çıkarır"""
-    modules = []
-    try:
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    modules.append(alias.name.split(".")[0])
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    modules.append(node.module.split(".")[0])
-    except:
-        pass
-    return modules
-
-
-def extract_functions_code(code):
-    functions = []
-    try:
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                name = node.name
-                args = [arg.arg for arg in node.args.args]
-                docstring = ast.get_docstring(node)
-                func_code = astor.to_source(node)
+    return parse_source(code)["imports"]
 
-                # Fonksiyon karmaşıklığını hesapla (basit metrik)
-                complexity = len(func_code.split("\n"))
-
-                functions.append(
-                    {
-                        "name": name,
-                        "args": args,
-                        "docstring": docstring,
-                        "lineno": node.lineno,
-                        "length": getattr(node, "end_lineno", None) - node.lineno
-                        if hasattr(node, "end_lineno")
-                        else None,
-                        "code": func_code,
-                        "complexity": complexity,
-                    }
-                )
-    except SyntaxError as e:
-        st.error(f"SyntaxError: {e}")
-    return functions
+
+def extract_functions_code(code, progress=None):
+    parsed = parse_source(code)
+    if parsed["error"]:
+        resolve_progress(progress).error(parsed["error"])
+    return parsed["functions"]
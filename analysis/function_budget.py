@@ -0,0 +1,176 @@
+import time
+
+from analysis.shared import estimate_tokens
+
+# Repo genelinde fonksiyon analizine ayrılan token (0: yok). Bütçe verilirse
+# fonksiyon işleri tüm dosyalar ayrıştırılana kadar bekler, akış kaybolur.
+FUNCTION_TOKEN_BUDGET = 0
+FUNCTION_TIME_BUDGET = 0  # Saniye; dolunca başlamamış işler iptal edilir (0: yok)
+# Dosya başına LLM'e gönderilecek en fazla yeni fonksiyon (0: sınırsız). Dosya
+# içinde önem sırasıyla uygulanır, bütçenin aksine işleri bekletmez.
+FUNCTION_FILE_LIMIT = 10
+FUNCTION_PROMPT_TOKENS = 60  # Fonksiyon prompt'unun kod dışındaki kısmı
+FUNCTION_RESPONSE_TOKENS = 300  # İstenen her alan (açıklama, öneri, hata) için
+
+# Ucuz statik sinyallerin önem puanındaki ağırlıkları
+IMPORTANCE_WEIGHTS = {
+    "length": 0.2,  # Satır başına (en fazla IMPORTANCE_MAX_LENGTH satır sayılır)
+    "branches": 2.0,
+    "max_depth": 3.0,
+    "no_docstring": 5.0,
+}
+IMPORTANCE_MAX_LENGTH = 200
+
+SKIP_TOKEN_BUDGET = "token_budget"
+SKIP_TIME_BUDGET = "time_budget"
+SKIP_FILE_LIMIT = "file_limit"
+SKIP_REASONS = {
+    SKIP_TOKEN_BUDGET: "token bütçesi aşıldı",
+    SKIP_TIME_BUDGET: "süre bütçesi doldu",
+    SKIP_FILE_LIMIT: "dosya başına fonksiyon sınırı aşıldı",
+}
+
+
+def function_importance(func):
+    """Boyut, dallanma, iç içelik ve eksik docstring'den önem puanı hesaplar.
+
+    Kısa getter/setter'lar sıfıra yakın, uzun ve dallı fonksiyonlar yüksek
+    puan alır. Değerler yalnızca sıralama içindir.
+    """
+    length = func.get("length") or func.get("complexity") or 0
+    score = IMPORTANCE_WEIGHTS["length"] * min(length, IMPORTANCE_MAX_LENGTH)
+    score += IMPORTANCE_WEIGHTS["branches"] * func.get("branches", 0)
+    score += IMPORTANCE_WEIGHTS["max_depth"] * func.get("max_depth", 0)
+    if not func.get("docstring"):
+        score += IMPORTANCE_WEIGHTS["no_docstring"]
+    return round(score, 2)
+
+
+def estimate_function_cost(
+    func, do_optimize=False, do_check_errors=False, combined=False
+):
+    """Fonksiyonun LLM işlerinin tahmini toplam token maliyeti"""
+    answers = 1 + int(do_optimize) + int(do_check_errors)
+    calls = 1 if combined and answers > 1 else answers
+    prompt = estimate_tokens(func["code"]) + FUNCTION_PROMPT_TOKENS
+    return calls * prompt + answers * FUNCTION_RESPONSE_TOKENS
+
+
+class FunctionBudget:
+    """Repo genelindeki fonksiyonları önem sırasına göre LLM bütçesine yerleştirir.
+
+    Bütçe etkinse dosyalar ayrıştırılırken fonksiyon işleri gönderilmez;
+    add() ile aday olarak toplanır. Tüm dosyalar ayrıştırıldıktan sonra
+    select() adayları önem puanına göre sıralar ve token bütçesine sığanları
+    seçer; sığmayanlar atlanır (daha küçük ama sığan fonksiyonlar seçilmeye
+    devam eder). Süre bütçesi analiz başlangıcından itibaren sayılır;
+    süresi dolduğunda henüz başlamamış fonksiyon işleri iptal edilir.
+    file_limit, her dosyada önem sırasına göre LLM'e gönderilecek en fazla
+    yeni fonksiyon sayısıdır; dosya ayrıştırılır ayrıştırılmaz uygulanır.
+    """
+
+    def __init__(
+        self,
+        token_budget=FUNCTION_TOKEN_BUDGET,
+        time_budget=FUNCTION_TIME_BUDGET,
+        do_optimize=False,
+        do_check_errors=False,
+        combined=False,
+        file_limit=FUNCTION_FILE_LIMIT,
+    ):
+        self.token_budget = token_budget or 0
+        self.file_limit = file_limit or 0
+        self.time_budget = time_budget or 0
+        self.do_optimize = do_optimize
+        self.do_check_errors = do_check_errors
+        self.combined = combined
+        self.deadline = (
+            time.monotonic() + self.time_budget if self.time_budget else None
+        )
+        self.candidates = []
+        self.stats = {
+            "functions_selected": 0,
+            "functions_skipped": 0,
+            "functions_cancelled": 0,
+            "budget_tokens_planned": 0,
+        }
+
+    @property
+    def active(self):
+        return bool(self.token_budget or self.time_budget)
+
+    def add(self, pending, func, futures):
+        """Fonksiyonu aday olarak kaydeder; futures seçilirse doldurulacak sözlüktür"""
+        self.candidates.append(
+            {
+                "pending": pending,
+                "func": func,
+                "futures": futures,
+                "score": function_importance(func),
+                "cost": estimate_function_cost(
+                    func, self.do_optimize, self.do_check_errors, self.combined
+                ),
+            }
+        )
+
+    def limit_file(self, pending, entries):
+        """Dosyanın (fonksiyon, futures) listesini file_limit'e indirir.
+
+        En önemli fonksiyonlar kaynak sırasıyla döner, kalanlar atlanır.
+        """
+        if not self.file_limit or len(entries) <= self.file_limit:
+            return entries
+        ranked = sorted(
+            entries, key=lambda e: (-function_importance(e[0]), e[0]["lineno"])
+        )
+        for func, _ in ranked[self.file_limit :]:
+            self.skip(pending, func, SKIP_FILE_LIMIT)
+        kept = {id(func) for func, _ in ranked[: self.file_limit]}
+        return [entry for entry in entries if id(entry[0]) in kept]
+
+    def select(self):
+        """Adayları önem sırasıyla bütçeye yerleştirir, seçilenleri döndürür.
+
+        Atlananlar bekleyen dosyanın "skipped" sözlüğüne nedeniyle yazılır.
+        Seçilenler önem sırasıyla döner; aynı öncelikteki LLM işleri FIFO
+        çalıştığından süre bütçesi önce en önemli fonksiyonlara harcanır.
+        """
+        ranked = sorted(
+            self.candidates,
+            key=lambda c: (-c["score"], c["pending"]["path"], c["func"]["lineno"]),
+        )
+        remaining = self.token_budget
+        selected = []
+        for candidate in ranked:
+            if self.token_budget and candidate["cost"] > remaining:
+                self.skip(candidate["pending"], candidate["func"], SKIP_TOKEN_BUDGET)
+                continue
+            remaining -= candidate["cost"]
+            self.stats["budget_tokens_planned"] += candidate["cost"]
+            selected.append(candidate)
+        self.stats["functions_selected"] += len(selected)
+        self.candidates = []
+        return selected
+
+    def skip(self, pending, func, reason):
+        pending.setdefault("skipped", {})[id(func)] = reason
+        self.stats["functions_skipped"] += 1
+
+    def count_cancelled(self, file_analysis):
+        """Süre bütçesi dolduğu için iptal edilen fonksiyonları sayar"""
+        self.stats["functions_cancelled"] += sum(
+            1
+            for entry in file_analysis.get("skipped_functions", [])
+            if entry["reason"] == SKIP_TIME_BUDGET
+        )
+
+
+def skipped_function_entry(func, reason):
+    """Sonuç dosyasına yazılan atlanan fonksiyon kaydı"""
+    return {
+        "name": func["name"],
+        "lineno": func["lineno"],
+        "length": func.get("length"),
+        "importance": function_importance(func),
+        "reason": reason,
+    }
@@ -1,109 +1,973 @@
+import os
+import queue
+import tarfile
+import warnings
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
 import requests
-from analysis.function_analysis import extract_functions_code
+from analysis.chunked_summary import (
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_TOKEN_THRESHOLD,
+    group_by_tokens,
+    is_failed_summary,
+    needs_chunked_summary,
+    reduce_file_summaries,
+    split_top_level_chunks,
+    summarize_file_chunk,
+)
+from analysis.duplicates import DUPLICATE_MATCH, DuplicateIndex, duplicate_of_entry
+from analysis.function_budget import (
+    FUNCTION_FILE_LIMIT,
+    FUNCTION_TIME_BUDGET,
+    FUNCTION_TOKEN_BUDGET,
+    SKIP_TIME_BUDGET,
+    FunctionBudget,
+    skipped_function_entry,
+)
+from analysis.github_client import (
+    GITHUB_API_URL,
+    GITHUB_HEADERS,
+    GITHUB_RAW_URL,
+    GitHubError,
+    GitHubRateLimitError,
+    create_github_client,
+)
+from analysis.incremental import IncrementalIndex
+from analysis.local_source import iter_local_py_files, local_revision
+from analysis.progress import resolve_progress
+from analysis.telemetry import stage, timed_iter
+from analysis.parse_stage import (
+    PARSE_CHUNK_SIZE,
+    PARSE_MAX_WORKERS,
+    ParseStage,
+    parse_file,
+)
 from analysis.shared import (
+    PRIORITY_ERROR_CHECK,
+    PRIORITY_EXPLAIN,
+    PRIORITY_OPTIMIZE,
+    PRIORITY_REDUCE,
+    PRIORITY_SUMMARY,
+    analyze_function_combined,
     analyze_function_with_llama,
     check_errors_in_function,
+    explain_functions_batch,
+    get_llm_scheduler,
     optimize_function_with_llama,
+    pack_functions,
     summarize_full_file,
 )
-import streamlit as st
+
+FETCH_MAX_WORKERS = 8  # Aynı anda indirilecek en fazla dosya sayısı
+FETCH_POOL_SIZE = 8  # Host başına açık tutulacak bağlantı sayısı
+FETCH_TIMEOUT = 10
+ARCHIVE_TIMEOUT = 60
+
+# Dosya listesinin ve içeriklerinin nasıl alınacağı
+INGESTION_ARCHIVE = "archive"  # Tek istekte tarball (varsayılan)
+INGESTION_CONTENTS = "contents"  # Contents API + raw dosyalar
+
+
+@dataclass
+class AnalysisOptions:
+    """analyze_github_repository ayarları.
+
+    Kaynak: local_path verilirse dosyalar GitHub yerine yerel dizinden veya
+    çıplak git deposundan okunur. Aksi halde ingestion (archive: tek
+    tarball, contents: Contents API + raw dosyalar) ile, max_workers
+    paralel indirme ve pool_size bağlantıyla alınır. GitHub istekleri
+    github_token (verilmezse GITHUB_TOKEN ortam değişkeni) ile yapılır.
+
+    LLM işleri: do_optimize ve do_check_errors açıklamaya ek analizleri
+    ister. combined True ise bunlar fonksiyon başına tek JSON isteğinde
+    alınır. batch_token_budget > 0 ise aynı dosyadaki küçük fonksiyonlar
+    bu bütçeye sığacak şekilde tek prompt'ta açıklatılır. llm_parallel
+    paylaşılan zamanlayıcının paralel iş sınırını değiştirir.
+
+    Ayrıştırma ve özet: radon metrikleri parse_workers süreçlik havuzda,
+    parse_chunk_size dosyalık gruplarla hesaplanır. Tahmini boyutu
+    summary_token_threshold token'ı aşan dosyalar summary_chunk_tokens'lık
+    parçalar halinde özetlenir (0: kapalı).
+
+    Bütçe ve kopyalar: fonksiyonlar önem puanına göre sıralanır; tahmini
+    maliyeti function_token_budget token'ı aşanlar ve function_time_budget
+    saniye dolduğunda başlamamış olanlar atlanır (0: sınır yok). Token
+    bütçesi verilirse fonksiyon işleri tüm dosyalar ayrıştırıldıktan sonra
+    gönderilir. Her dosyadan en fazla function_file_limit yeni fonksiyon
+    (önem sırasıyla) LLM'e gider; bu sınır işleri bekletmez.
+    duplicate_match "exact" (varsayılan) birebir kopyaları, "near"
+    sabitleri farklı yakın kopyaları da tek analizle paylaştırır, "off"
+    paylaştırmaz.
+
+    Geri çağrılar: on_partial(path, func_name, text) verilirse dosya
+    özetleri (func_name None) ve açıklamalar akış halinde alınır ve
+    geldikçe çağıran thread'de çağrılır. on_file_done(file_analysis) her
+    dosya tamamlandığında çağrılır.
+    """
+
+    # Kaynak
+    ingestion: str = INGESTION_ARCHIVE
+    local_path: Optional[str] = None
+    github_token: Optional[str] = None
+    max_workers: int = FETCH_MAX_WORKERS
+    pool_size: int = FETCH_POOL_SIZE
+    # LLM işleri
+    do_optimize: bool = False
+    do_check_errors: bool = False
+    combined: bool = False
+    batch_token_budget: int = 0
+    llm_parallel: Optional[int] = None
+    # Ayrıştırma ve özet
+    parse_workers: int = PARSE_MAX_WORKERS
+    parse_chunk_size: int = PARSE_CHUNK_SIZE
+    summary_token_threshold: int = SUMMARY_TOKEN_THRESHOLD
+    summary_chunk_tokens: int = SUMMARY_CHUNK_TOKENS
+    # Bütçe ve kopyalar
+    function_token_budget: int = FUNCTION_TOKEN_BUDGET
+    function_time_budget: float = FUNCTION_TIME_BUDGET
+    function_file_limit: int = FUNCTION_FILE_LIMIT
+    duplicate_match: str = DUPLICATE_MATCH
+    # Geri çağrılar
+    on_partial: Optional[Callable] = None
+    on_file_done: Optional[Callable] = None
+
+
+# analyze_github_repository'nin ayar olmayan, çalıştırmaya özgü argümanları
+RUN_ARGUMENTS = (
+    "source_store",
+    "previous_results",
+    "stats",
+    "file_records",
+    "progress",
+)
+# Eski imzada repo adından sonra konumla verilebilen ayarlar
+LEGACY_POSITIONAL_OPTIONS = ("do_optimize", "do_check_errors")
+
+
+def resolve_options(options=None, legacy_args=(), legacy_kwargs=None):
+    """options'ı AnalysisOptions'a çevirir; eski çağrı biçimini de kabul eder.
+
+    Eski imza analyze_github_repository(kullanıcı, repo, do_optimize,
+    do_check_errors, ayar=değer, ...) idi. Bu biçim DeprecationWarning ile
+    çalışmaya devam eder; ayarlar AnalysisOptions alanlarına aktarılır.
+    """
+    legacy_kwargs = legacy_kwargs or {}
+    if isinstance(options, AnalysisOptions):
+        base, positional = options, list(legacy_args)
+    else:
+        # Üçüncü konumdaki değer eski do_optimize argümanıdır
+        base = AnalysisOptions()
+        positional = [options, *legacy_args]
+        if options is None and not legacy_args:
+            positional = []
+    if not positional and not legacy_kwargs:
+        return base
+
+    warnings.warn(
+        "analyze_github_repository(kullanıcı, repo, do_optimize, do_check_errors, "
+        "ayar=değer) kullanımı eskidi; ayarları AnalysisOptions ile verin",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    if len(positional) > len(LEGACY_POSITIONAL_OPTIONS):
+        raise TypeError("Konumla en fazla do_optimize ve do_check_errors verilebilir")
+    values = dict(zip(LEGACY_POSITIONAL_OPTIONS, positional))
+    repeated = values.keys() & legacy_kwargs.keys()
+    if repeated:
+        raise TypeError(f"Ayar iki kez verildi: {', '.join(sorted(repeated))}")
+    values.update(legacy_kwargs)
+    # Bilinmeyen ayar adları dataclass tarafından TypeError ile reddedilir
+    return replace(base, **values)
 
 
 def analyze_github_repository(
-    username, repo_name, do_optimize=False, do_check_errors=False
+    username,
+    repo_name,
+    options=None,
+    *legacy_args,
+    source_store=None,
+    previous_results=None,
+    stats=None,
+    file_records=None,
+    progress=None,
+    **legacy_options,
 ):
-    """Fixed version with better error handling"""
-    api_url = f"https://api.github.com/repos/{username}/{repo_name}/contents"
-    raw_base = f"https://raw.githubusercontent.com/{username}/{repo_name}/master/"
-    headers = {"Accept": "application/vnd.github.v3+json"}
+    """Bir reponun Python dosyalarını indirir, ayrıştırır ve LLM ile analiz eder.
 
-    py_files = get_all_py_files(api_url, raw_base, headers)
+    Dosya başına bir sonuç sözlüğü listesi döndürür; hiç Python dosyası
+    bulunamazsa boş liste. İndirme, ayrıştırma ve LLM işleri dosyalar
+    geldikçe birlikte ilerler. Ayarlar options (AnalysisOptions) ile verilir;
+    eski do_optimize, do_check_errors ve ayar=değer biçimi uyarıyla
+    desteklenir (bkz. resolve_options).
 
-    if not py_files:
-        st.error("Bu repository'de Python dosyası bulunamadı!")
-        return []
+    source_store verilirse alınan kaynaklar grafikler gibi sonraki
+    tüketiciler için oraya yazılır. previous_results önceki bir
+    çalıştırmanın kayıtlı sonucuysa blob SHA'sı değişmeyen dosyalar ve
+    hash'i değişmeyen fonksiyonlar LLM'e gönderilmez. stats sözlüğüne
+    GitHub istek sayaçları, artımlı analiz, bütçe ve kopya istatistikleri
+    ile ayrıştırma işçilerinin tepe belleği yazılır. file_records bir listeyse, fonksiyonu olmayan veya
+    ayrıştırılamayan dosyalar dahil ayrıştırılan her dosyanın
+    {"path", "metrics"} kaydı eklenir (proje puanı için).
 
-    analysis_results = []
+    progress info/warning/error/success metotları olan bir ilerleme
+    hedefidir (bkz. analysis.progress); verilmezse mesajlar Streamlit'e
+    yazılır. Telemetry.activate() içinde çağrılırsa list, fetch, parse ve
+    collect aşamalarının süreleri ile tüm LLM çağrıları o telemetriye
+    kaydedilir.
+    """
+    options = resolve_options(options, legacy_args, legacy_options)
+    progress = resolve_progress(progress)
+    scheduler = get_llm_scheduler(options.llm_parallel)
+    relay = StreamRelay(options.on_partial) if options.on_partial else None
+    parse_stage = ParseStage(options.parse_workers, options.parse_chunk_size)
+    incremental = IncrementalIndex(
+        previous_results, options.do_optimize, options.do_check_errors
+    )
+    budget = FunctionBudget(
+        options.function_token_budget,
+        options.function_time_budget,
+        options.do_optimize,
+        options.do_check_errors,
+        options.combined,
+        options.function_file_limit,
+    )
+    duplicates = DuplicateIndex(options.duplicate_match)
+    pending_files = []
+    found_files = 0
 
-    for raw_url in py_files:
-        file_name = raw_url.split("/")[-1]
+    client = None
+    if options.local_path:
+        source = iter_local_py_files(options.local_path)
+    else:
+        client = create_github_client(options.github_token, options.pool_size)
+        source = iter_repository_files(
+            username,
+            repo_name,
+            client,
+            options.ingestion,
+            options.max_workers,
+            progress,
+        )
 
-        try:
-            code_response = requests.get(raw_url, timeout=10)
-            if code_response.status_code != 200:
-                st.warning(
-                    f"Dosya alınamadı: {file_name} (HTTP {code_response.status_code})"
-                )
-                continue
+    def accepted_files():
+        """İndirilen dosyaları eler, ayrıştırma aşamasına (path, code) verir"""
+        nonlocal found_files
+        for path, status_code, code in timed_iter("fetch", source):
+            found_files += 1
+            file_name = path.split("/")[-1]
 
-            code = code_response.text
+            if status_code is None:
+                progress.warning(f"Dosya alınamadı: {file_name} ({code})")
+                continue
+            if status_code != 200:
+                progress.warning(f"Dosya alınamadı: {file_name} (HTTP {status_code})")
+                continue
 
             # Boş dosya kontrolü
             if len(code.strip()) < 10:
-                st.info(f"Çok küçük dosya atlandı: {file_name}")
+                progress.info(f"Çok küçük dosya atlandı: {file_name}")
                 continue
 
-            st.info(f"İşleniyor: {file_name} ({len(code)} karakter)")
+            progress.info(f"İşleniyor: {file_name} ({len(code)} karakter)")
 
-            # Timeout ile LLM çağrıları
-            file_summary = summarize_full_file(code)
-            functions = extract_functions_code(code)
+            if source_store is not None:
+                source_store.put(path, code)
+            yield path, code
 
-            if not functions:
-                st.warning(f"{file_name}: Fonksiyon bulunamadı")
-                continue
+    # İndirme, ayrıştırma ve LLM aşamaları dosyalar geldikçe ilerler
+    for path, code, record in timed_iter("parse", parse_stage.parse(accepted_files())):
+        if file_records is not None:
+            file_records.append(
+                {
+                    "path": path,
+                    "metrics": {
+                        key: value
+                        for key, value in record["metrics"].items()
+                        if key != "functions"
+                    },
+                }
+            )
+        try:
+            pending = submit_file_analysis(
+                path,
+                code,
+                scheduler,
+                options.do_optimize,
+                options.do_check_errors,
+                incremental=incremental,
+                batch_token_budget=options.batch_token_budget,
+                relay=relay,
+                combined=options.combined,
+                record=record,
+                progress=progress,
+                summary_token_threshold=options.summary_token_threshold,
+                summary_chunk_tokens=options.summary_chunk_tokens,
+                budget=budget,
+                duplicates=duplicates,
+            )
+            if pending:
+                pending_files.append(pending)
+            if relay:
+                relay.drain()
+
+        except Exception as e:
+            progress.error(f"Dosya işleme hatası ({path.split('/')[-1]}): {e}")
+            continue
 
-            func_results = []
+    if client is not None and stats is not None:
+        stats.update(client.stats)
+    if not found_files:
+        progress.error("Bu repository'de Python dosyası bulunamadı!")
+        return []
 
-            for func in functions[:10]:  # İlk 10 fonksiyonu analiz et (performans için)
-                try:
-                    explanation = analyze_function_with_llama(func["code"])
-                    optimization = (
-                        optimize_function_with_llama(func["code"])
-                        if do_optimize
-                        else ""
-                    )
-                    error_check = (
-                        check_errors_in_function(func["code"])
-                        if do_check_errors
-                        else ""
-                    )
-
-                    func_results.append(
-                        {
-                            "name": func["name"],
-                            "lineno": func["lineno"],
-                            "length": func["length"],
-                            "complexity": func["complexity"],
-                            "docstring": func.get("docstring"),
-                            "explanation": explanation,
-                            "optimization": optimization,
-                            "error_check": error_check,
-                        }
-                    )
-                except Exception as e:
-                    st.warning(f"Fonksiyon analiz hatası ({func['name']}): {e}")
-                    continue
-
-            file_analysis = {
-                "source_file": file_name,
-                "file_summary": file_summary,
-                "functions": func_results,
-            }
+    if budget.active:
+        submit_budgeted_functions(
+            budget,
+            scheduler,
+            options.do_optimize,
+            options.do_check_errors,
+            batch_token_budget=options.batch_token_budget,
+            relay=relay,
+            combined=options.combined,
+            progress=progress,
+        )
+
+    analysis_results = []
+    for pending in pending_files:
+        try:
+            with stage("collect"):
+                file_analysis = collect_file_analysis(pending, relay, progress)
+            budget.count_cancelled(file_analysis)
             analysis_results.append(file_analysis)
+            if options.on_file_done:
+                options.on_file_done(file_analysis)
+        except Exception as e:
+            progress.error(f"Dosya işleme hatası ({pending['source_file']}): {e}")
+
+    if previous_results:
+        run_stats = incremental.stats
+        progress.info(
+            f"♻️ Artımlı analiz: {run_stats['files_reused']} dosya ve "
+            f"{run_stats['functions_reused']} fonksiyon yeniden kullanıldı, "
+            f"{run_stats['files_recomputed']} dosya ve "
+            f"{run_stats['functions_recomputed']} fonksiyon yeniden analiz edildi."
+        )
+    if duplicates.stats["functions_deduplicated"]:
+        progress.info(
+            f"🔁 {duplicates.stats['functions_deduplicated']} kopya fonksiyon "
+            "temsilcisinin sonucunu paylaştı."
+        )
+    if budget.stats["functions_skipped"] and not budget.active:
+        progress.info(
+            f"⏭️ Dosya başına {options.function_file_limit} fonksiyon sınırı: "
+            f"{budget.stats['functions_skipped']} fonksiyon atlandı."
+        )
+    if budget.stats["functions_cancelled"]:
+        progress.info(
+            f"⏭️ Süre bütçesi doldu: {budget.stats['functions_cancelled']} "
+            "fonksiyon analiz edilmeden atlandı."
+        )
+    if stats is not None:
+        stats.update(incremental.stats)
+        stats.update(budget.stats)
+        stats.update(duplicates.stats)
+        if parse_stage.worker_peak_rss_mb is not None:
+            stats["parse_worker_peak_rss_mb"] = parse_stage.worker_peak_rss_mb
+
+    return analysis_results
+
+
+def analyze_local_repository(local_path, options=None, *legacy_args, **kwargs):
+    """Yerel bir dizini veya git deposunu GitHub reposu gibi analiz eder"""
+    repo_name = os.path.basename(os.path.normpath(local_path))
+    run_kwargs = {name: kwargs.pop(name) for name in RUN_ARGUMENTS if name in kwargs}
+    options = resolve_options(options, legacy_args, kwargs)
+    return analyze_github_repository(
+        "local", repo_name, replace(options, local_path=local_path), **run_kwargs
+    )
+
+
+def iter_repository_files(
+    username,
+    repo_name,
+    client,
+    ingestion=INGESTION_ARCHIVE,
+    max_workers=FETCH_MAX_WORKERS,
+    progress=None,
+):
+    """Repodaki .py dosyalarını (path, status_code, code) olarak verir.
+
+    Arşiv modu tüm repoyu birkaç istekte indirir; arşiv alınamazsa
+    Contents API ile dosya dosya indirmeye geri dönülür. İstek limiti
+    dolarsa veya dosya listesi alınamazsa hata bildirilir ve eksik bir
+    listeyle devam edilmez.
+    """
+    progress = resolve_progress(progress)
+    try:
+        with stage("list"):
+            branch = get_default_branch(username, repo_name, client)
+
+        if ingestion == INGESTION_ARCHIVE:
+            archive = open_repository_archive(username, repo_name, branch, client)
+            if archive is not None:
+                try:
+                    yield from iter_archive_py_files(archive)
+                except (tarfile.TarError, OSError, requests.RequestException) as e:
+                    progress.error(f"Repo arşivi okunamadı: {e}")
+                return
+            progress.warning("Repo arşivi alınamadı, dosyalar tek tek indirilecek.")
+
+        api_url = f"{GITHUB_API_URL}/repos/{username}/{repo_name}/contents"
+        raw_base = f"{GITHUB_RAW_URL}/{username}/{repo_name}/{branch}/"
+        with stage("list"):
+            py_files = get_all_py_files(api_url, raw_base, GITHUB_HEADERS, client)
+    except (GitHubRateLimitError, GitHubError) as e:
+        progress.error(f"GitHub dosya listesi alınamadı: {e}")
+        return
+
+    # Dosyalar paralel indirilir ve geldikçe analiz aşamasına aktarılır
+    for raw_url, status_code, code in fetch_files_concurrently(
+        py_files, client, max_workers
+    ):
+        yield raw_url[len(raw_base) :], status_code, code
+
+
+def get_repository_revision(username, repo_name, local_path=None, client=None):
+    """Sonuç önbelleği için reponun sürümünü (commit SHA'sı) döndürür, bilinemezse None"""
+    if local_path:
+        return local_revision(local_path)
+    client = client or create_github_client()
+    try:
+        branch = get_default_branch(username, repo_name, client)
+        response = client.get(
+            f"{GITHUB_API_URL}/repos/{username}/{repo_name}/commits/{branch}",
+            # Yalnızca SHA istenir, commit ayrıntıları indirilmez
+            headers={**GITHUB_HEADERS, "Accept": "application/vnd.github.sha"},
+            timeout=FETCH_TIMEOUT,
+        )
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.text.strip() or None
+
+
+def get_default_branch(username, repo_name, client):
+    """Reponun varsayılan dalını döndürür, bilinemezse 'master' kabul eder.
+
+    İstek limiti dolduysa GitHubRateLimitError yükseltilir.
+    """
+    try:
+        response = client.get(
+            f"{GITHUB_API_URL}/repos/{username}/{repo_name}",
+            headers=GITHUB_HEADERS,
+            timeout=FETCH_TIMEOUT,
+        )
+        if response.status_code == 200:
+            return response.json().get("default_branch") or "master"
+    except GitHubRateLimitError:
+        raise
+    except Exception:
+        pass
+    return "master"
+
+
+def open_repository_archive(username, repo_name, branch, client):
+    """Repo tarball'u için akış halinde bir yanıt açar, başarısızsa None"""
+    try:
+        response = client.get(
+            f"{GITHUB_API_URL}/repos/{username}/{repo_name}/tarball/{branch}",
+            headers=GITHUB_HEADERS,
+            timeout=ARCHIVE_TIMEOUT,
+            stream=True,
+        )
+    except GitHubRateLimitError:
+        raise
+    except Exception:
+        return None
+    if response.status_code != 200:
+        response.close()
+        return None
+    return response
+
+
+def iter_archive_py_files(response):
+    """Tarball'u diske yazmadan akış halinde okuyup .py üyelerini verir"""
+    with response, tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(".py"):
+                continue
+            # İlk dizin "<kullanıcı>-<repo>-<commit>/" önekidir
+            path = member.name.split("/", 1)[-1]
+            data = archive.extractfile(member).read()
+            yield path, 200, data.decode("utf-8", errors="replace")
+
+
+def submit_file_analysis(
+    path,
+    code,
+    scheduler,
+    do_optimize=False,
+    do_check_errors=False,
+    incremental=None,
+    batch_token_budget=0,
+    relay=None,
+    combined=False,
+    record=None,
+    summary_token_threshold=SUMMARY_TOKEN_THRESHOLD,
+    summary_chunk_tokens=SUMMARY_CHUNK_TOKENS,
+    progress=None,
+    budget=None,
+    duplicates=None,
+):
+    """Dosyanın LLM işlerini zamanlayıcıya gönderir, bekleyen işleri döndürür.
+
+    record, ParseStage'in ürettiği ayrıştırma kaydıdır; verilmezse dosya
+    burada ayrıştırılır. budget etkin bir FunctionBudget ise fonksiyon
+    işleri gönderilmez, bütçe adayı olarak kaydedilir. duplicates bir
+    DuplicateIndex ise daha önce görülen bir fonksiyonun kopyası için iş
+    gönderilmez, temsilcinin sonucu paylaşılır.
+    """
+    progress = resolve_progress(progress)
+    file_name = path.split("/")[-1]
+    # Kod bir kez ayrıştırılır, sonuç tüm sonraki adımlarda kullanılır
+    if record is None:
+        record = parse_file(path, code)
+    blob_sha = record["blob_sha"]
+    parsed = record["parsed"]
+    if parsed["error"]:
+        progress.error(f"{file_name}: {parsed['error']}")
+    functions = parsed["functions"]
+
+    if not functions:
+        progress.warning(f"{file_name}: Fonksiyon bulunamadı")
+        return None
+
+    pending = {
+        "source_file": file_name,
+        "path": path,
+        "blob_sha": blob_sha,
+        "modules": parsed["imports"],
+        "metrics": record["metrics"],
+    }
+
+    # Dosya değişmediyse önceki sonuç olduğu gibi kullanılır
+    previous_file = incremental and incremental.reusable_file(path, blob_sha)
+    if previous_file:
+        incremental.count_file(True, len(previous_file.get("functions", [])))
+        pending["reused_file"] = previous_file
+        return pending
+    if incremental:
+        incremental.stats["files_recomputed"] += 1
+
+    if needs_chunked_summary(code, summary_token_threshold):
+        # Map adımı: parçalar paralel özetlenir, birleştirme toplama sırasında
+        chunks = split_top_level_chunks(code, summary_chunk_tokens)
+        pending["summary_chunk_tokens"] = summary_chunk_tokens
+        pending["summary_chunks"] = [
+            scheduler.submit(
+                summarize_file_chunk,
+                chunk,
+                index,
+                len(chunks),
+                priority=PRIORITY_SUMMARY,
+            )
+            for index, chunk in enumerate(chunks, 1)
+        ]
+    else:
+        pending["summary_future"] = scheduler.submit(
+            summarize_full_file,
+            code,
+            on_token=relay.callback(path) if relay else None,
+            priority=PRIORITY_SUMMARY,
+        )
+
+    pending_functions = []
+    new_functions = []
+    to_submit = []
+    for func in functions:
+        previous = incremental and incremental.reusable_function(func["source_hash"])
+        if incremental:
+            incremental.count_function(bool(previous))
+        if previous:
+            pending_functions.append((func, None, previous))
+            if duplicates:
+                duplicates.register(pending, func, previous=previous)
+            continue
+
+        # Aynı gövdenin kopyaları temsilcinin sonucunu paylaşır
+        duplicate = duplicates and duplicates.find(func)
+        if duplicate:
+            representative, match = duplicate
+            duplicates.link(pending, func, representative, match)
+            pending_functions.append(
+                (func, representative["futures"], representative["previous"])
+            )
+            continue
+
+        futures = {}
+        pending_functions.append((func, futures, None))
+        if duplicates:
+            duplicates.register(pending, func, futures)
+        new_functions.append((func, futures))
+
+    if budget is not None:
+        new_functions = budget.limit_file(pending, new_functions)
+    for func, futures in new_functions:
+        if budget is not None and budget.active:
+            # İşler tüm repo ayrıştırıldıktan sonra önem sırasıyla gönderilir
+            budget.add(pending, func, futures)
+        else:
+            to_submit.append((func, futures))
+
+    pending["functions"] = pending_functions
+    submit_function_jobs(
+        path,
+        to_submit,
+        scheduler,
+        do_optimize,
+        do_check_errors,
+        batch_token_budget=batch_token_budget,
+        relay=relay,
+        combined=combined,
+    )
+    return pending
+
+
+def submit_function_jobs(
+    path,
+    entries,
+    scheduler,
+    do_optimize=False,
+    do_check_errors=False,
+    batch_token_budget=0,
+    relay=None,
+    combined=False,
+    deadline=None,
+):
+    """Bir dosyanın (func, futures) çiftleri için LLM işlerini gönderir.
+
+    futures sözlükleri açıklama, optimizasyon ve hata analizi işleriyle
+    doldurulur. deadline verilirse o ana kadar başlamamış işler iptal edilir.
+    """
+    to_explain = []
+    for func, futures in entries:
+        if combined and (do_optimize or do_check_errors):
+            # Üç ayrı istek yerine tek yapılandırılmış istek
+            combined_future = scheduler.submit(
+                analyze_function_combined,
+                func["code"],
+                do_optimize,
+                do_check_errors,
+                priority=PRIORITY_EXPLAIN,
+                deadline=deadline,
+            )
+            for key in ("explanation", "optimization", "error_check"):
+                futures[key] = (combined_future, key)
+            continue
+
+        if do_optimize:
+            futures["optimization"] = scheduler.submit(
+                optimize_function_with_llama,
+                func["code"],
+                priority=PRIORITY_OPTIMIZE,
+                deadline=deadline,
+            )
+        if do_check_errors:
+            futures["error_check"] = scheduler.submit(
+                check_errors_in_function,
+                func["code"],
+                priority=PRIORITY_ERROR_CHECK,
+                deadline=deadline,
+            )
+        to_explain.append((func, futures))
+
+    # Açıklamalar tek tek ya da token bütçesine göre paketlenerek istenir
+    if batch_token_budget > 0:
+        futures_by_func = {id(func): futures for func, futures in to_explain}
+        for batch in pack_functions(
+            [func for func, _ in to_explain], batch_token_budget
+        ):
+            batch_future = scheduler.submit(
+                explain_functions_batch,
+                batch,
+                priority=PRIORITY_EXPLAIN,
+                deadline=deadline,
+            )
+            for func in batch:
+                futures_by_func[id(func)]["explanation"] = (batch_future, func["name"])
+    else:
+        for func, futures in to_explain:
+            futures["explanation"] = scheduler.submit(
+                analyze_function_with_llama,
+                func["code"],
+                on_token=relay.callback(path, func["name"]) if relay else None,
+                priority=PRIORITY_EXPLAIN,
+                deadline=deadline,
+            )
+
+
+def submit_budgeted_functions(
+    budget,
+    scheduler,
+    do_optimize=False,
+    do_check_errors=False,
+    batch_token_budget=0,
+    relay=None,
+    combined=False,
+    progress=None,
+):
+    """Bütçeye seçilen fonksiyonların işlerini dosya dosya gönderir.
+
+    Dosyalar en önemli seçilmiş fonksiyonlarına göre sıralanır; böylece
+    toplu açıklama paketleri dosya içinde kalırken süre bütçesi önce en
+    önemli fonksiyonlara harcanır.
+    """
+    by_file = {}
+    for candidate in budget.select():
+        pending = candidate["pending"]
+        by_file.setdefault(id(pending), (pending, []))[1].append(
+            (candidate["func"], candidate["futures"])
+        )
+    for pending, entries in by_file.values():
+        entries.sort(key=lambda entry: entry[0]["lineno"])
+        submit_function_jobs(
+            pending["path"],
+            entries,
+            scheduler,
+            do_optimize,
+            do_check_errors,
+            batch_token_budget=batch_token_budget,
+            relay=relay,
+            combined=combined,
+            deadline=budget.deadline,
+        )
+    if budget.stats["functions_skipped"]:
+        resolve_progress(progress).info(
+            f"⏭️ LLM bütçesi: {budget.stats['functions_selected']} fonksiyon "
+            f"seçildi, {budget.stats['functions_skipped']} fonksiyon atlandı."
+        )
+
+
+def collect_file_analysis(pending, relay=None, progress=None):
+    """Bekleyen LLM işlerinin sonuçlarını toplayıp dosya analizini oluşturur"""
+    file_info = {
+        "source_file": pending["source_file"],
+        "path": pending["path"],
+        "blob_sha": pending["blob_sha"],
+        "modules": pending["modules"],
+    }
+
+    metrics = dict(pending["metrics"])
+    function_metrics = metrics.pop("functions", {})
+    file_info["metrics"] = metrics
+
+    if "reused_file" in pending:
+        reused = {**pending["reused_file"], **file_info}
+        reused["functions"] = [
+            _with_metrics(func, function_metrics)
+            for func in reused.get("functions", [])
+        ]
+        return reused
+
+    func_results = []
+    skipped = []
 
+    for func, futures, previous in pending["functions"]:
+        reason = pending.get("skipped", {}).get(id(func))
+        duplicate = pending.get("duplicates", {}).get(id(func))
+        if duplicate:
+            # Temsilci bütçe yüzünden atlandıysa kopyaları da atlanır
+            representative = duplicate[0]
+            reason = (
+                representative["pending"]
+                .get("skipped", {})
+                .get(id(representative["func"]))
+            )
+        if reason:
+            skipped.append(skipped_function_entry(func, reason))
+            continue
+        try:
+            if previous:
+                results = previous
+            else:
+                results = {
+                    key: _resolve(future, relay) for key, future in futures.items()
+                }
+
+            func_result = {
+                "name": func["name"],
+                "lineno": func["lineno"],
+                "length": func["length"],
+                "complexity": func["complexity"],
+                "docstring": func.get("docstring"),
+                "source_hash": func["source_hash"],
+                "fingerprint": func.get("fingerprint"),
+                "near_fingerprint": func.get("near_fingerprint"),
+                "explanation": results["explanation"],
+                "optimization": results.get("optimization", ""),
+                "error_check": results.get("error_check", ""),
+            }
+            if duplicate:
+                func_result["duplicate_of"] = duplicate_of_entry(*duplicate)
+            func_results.append(_with_metrics(func_result, function_metrics))
+        except CancelledError:
+            # Süre bütçesi dolduğunda başlamamış işler iptal edilir
+            skipped.append(skipped_function_entry(func, SKIP_TIME_BUDGET))
         except Exception as e:
-            st.error(f"Dosya işleme hatası ({file_name}): {e}")
+            resolve_progress(progress).warning(
+                f"Fonksiyon analiz hatası ({func['name']}): {e}"
+            )
             continue
 
-    return analysis_results
+    if "summary_chunks" in pending:
+        file_summary = _reduce_chunk_summaries(pending, relay)
+    else:
+        file_summary = _resolve(pending["summary_future"], relay)
+
+    file_analysis = {
+        **file_info,
+        "file_summary": file_summary,
+        "functions": func_results,
+    }
+    if skipped:
+        file_analysis["skipped_functions"] = skipped
+    return file_analysis
+
+
+def _reduce_chunk_summaries(pending, relay=None):
+    """Parça özetlerini bekleyip tek dosya özetine indirger.
+
+    Reduce işleri toplayan thread'den gönderilir; zamanlayıcı işçileri
+    başka işleri beklemediği için kilitlenme olmaz. Özetler tek prompt'a
+    sığmıyorsa önce gruplar halinde ara özetler çıkarılır. Bir parça
+    başarısızsa hata döndürülür, böylece özet sonraki çalıştırmada
+    yeniden hesaplanır.
+    """
+    scheduler = get_llm_scheduler()
+    max_tokens = pending["summary_chunk_tokens"]
+    summaries = [_resolve(future, relay) for future in pending["summary_chunks"]]
+
+    while True:
+        failed = next((s for s in summaries if is_failed_summary(s)), None)
+        if failed is not None:
+            return failed or "❌ LLM Hatası: Boş parça özeti"
+        groups = group_by_tokens(summaries, max_tokens)
+        if len(groups) == 1 or len(groups) == len(summaries):
+            break
+        futures = [
+            scheduler.submit(reduce_file_summaries, group, priority=PRIORITY_REDUCE)
+            for group in groups
+        ]
+        summaries = [_resolve(future, relay) for future in futures]
+
+    final = scheduler.submit(
+        reduce_file_summaries,
+        summaries,
+        on_token=relay.callback(pending["path"]) if relay else None,
+        priority=PRIORITY_REDUCE,
+    )
+    return _resolve(final, relay)
+
+
+def _with_metrics(func_result, function_metrics):
+    """Fonksiyon sonucuna radon metriklerini ekler (complexity = cyclomatic complexity)"""
+    measured = function_metrics.get(func_result["lineno"])
+    if not measured:
+        return func_result
+    return {
+        **func_result,
+        "complexity": measured["cyclomatic_complexity"],
+        "complexity_rank": measured["rank"],
+        "halstead": measured.get("halstead"),
+    }
+
+
+def _resolve(future, relay=None):
+    """Future sonucunu döndürür; (future, anahtar) çifti toplu yanıttan seçer"""
+    if isinstance(future, tuple):
+        batch_future, name = future
+        return _resolve(batch_future, relay)[name]
+    if relay:
+        return relay.wait(future)
+    return future.result()
+
+
+class StreamRelay:
+    """LLM işçi thread'lerinden gelen token'ları Streamlit thread'ine taşır.
+
+    Streamlit öğeleri yalnızca betik thread'inden güncellenebildiği için
+    token'lar bir kuyrukta biriktirilir ve drain() ile aktarılır.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, on_partial):
+        self.on_partial = on_partial
+        self.events = queue.Queue()
+        self.texts = {}
+
+    def callback(self, path, func_name=None):
+        key = (path, func_name)
+        return lambda chunk: self.events.put((key, chunk))
+
+    def drain(self):
+        updated = {}
+        while True:
+            try:
+                key, chunk = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.texts[key] = self.texts.get(key, "") + chunk
+            updated[key] = self.texts[key]
+        for (path, func_name), text in updated.items():
+            self.on_partial(path, func_name, text)
+
+    def wait(self, future):
+        """Future tamamlanana kadar gelen token'ları aktarır"""
+        while not future.done():
+            wait([future], timeout=self.POLL_INTERVAL)
+            self.drain()
+        self.drain()
+        return future.result()
+
+
+def fetch_files_concurrently(
+    urls, client, max_workers=FETCH_MAX_WORKERS, timeout=FETCH_TIMEOUT
+):
+    """Dosyaları paralel indirir ve geldikleri sırayla bir kuyruk üzerinden verir.
+
+    Her eleman (url, status_code, text) üçlüsüdür; bağlantı hatasında
+    status_code None, text ise hata mesajıdır.
+    """
+    downloaded = queue.Queue()
+
+    def fetch(url):
+        try:
+            response = client.get(url, timeout=timeout)
+            downloaded.put((url, response.status_code, response.text))
+        except Exception as e:
+            downloaded.put((url, None, str(e)))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for url in urls:
+            executor.submit(fetch, url)
+        for _ in range(len(urls)):
+            yield downloaded.get()
+
 
+def get_all_py_files(api_url, raw_base, headers, client):
+    """Contents API ile .py dosyalarının raw adreslerini toplar.
 
-def get_all_py_files(api_url, raw_base, headers):
+    Herhangi bir dizin listelenemezse GitHubError yükseltilir; böylece
+    yarım bir dosya listesiyle sessizce devam edilmez.
+    """
     py_files = []
-    response = requests.get(api_url, headers=headers)
+    response = client.get(api_url, headers=headers, timeout=FETCH_TIMEOUT)
     if response.status_code != 200:
-        return py_files
+        raise GitHubError(f"{api_url}: HTTP {response.status_code}")
 
     items = response.json()
     for item in items:
@@ -111,5 +975,5 @@ def get_all_py_files(api_url, raw_base, headers):
             py_files.append(raw_base + item["path"])
         elif item["type"] == "dir":
             sub_api_url = item["url"]
-            py_files.extend(get_all_py_files(sub_api_url, raw_base, headers))
+            py_files.extend(get_all_py_files(sub_api_url, raw_base, headers, client))
     return py_files
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Ortam değişkenleriyle değiştirilebilir (ör. kurumsal GitHub veya benchmark sunucusu)
+GITHUB_API_URL = os.environ.get("GITTEXTLAB_GITHUB_API_URL", "https://api.github.com")
+GITHUB_RAW_URL = os.environ.get(
+    "GITTEXTLAB_GITHUB_RAW_URL", "https://raw.githubusercontent.com"
+)
+GITHUB_TOKEN = os.environ.get("GITTEXTLAB_GITHUB_TOKEN") or os.environ.get(
+    "GITHUB_TOKEN"
+)
+GITHUB_HEADERS = {"Accept": "application/vnd.github.v3+json"}
+
+GITHUB_POOL_SIZE = 8  # Host başına açık tutulacak bağlantı sayısı
+GITHUB_TIMEOUT = 10
+GITHUB_MAX_RETRIES = 3
+GITHUB_RETRY_BACKOFF = 1.0  # Saniye; her denemede iki katına çıkar
+GITHUB_RETRY_STATUSES = {500, 502, 503, 504}
+# İstek limiti bundan uzun süre sonra sıfırlanacaksa beklemek yerine hata verilir
+GITHUB_MAX_RATE_LIMIT_WAIT = 90
+
+ETAG_CACHE_PATH = os.environ.get(
+    "GITTEXTLAB_GITHUB_CACHE",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "gittextlab", "github_cache.sqlite3"
+    ),
+)
+ETAG_CACHE_MAX_BYTES = 256 * 1024 * 1024
+EVICT_CHECK_INTERVAL = 100  # Kaç yazmada bir boyut sınırı kontrol edilir
+
+
+class GitHubRateLimitError(requests.RequestException):
+    """GitHub istek limiti doldu ve sıfırlanması beklenemeyecek kadar uzak.
+
+    authenticated, isteği yapan istemcinin token kullanıp kullanmadığıdır;
+    token yoksa mesaj daha yüksek limit için token tanımlamayı önerir.
+    """
+
+    def __init__(self, reset_at=None, limit=None, authenticated=False):
+        self.reset_at = reset_at
+        if reset_at:
+            when = time.strftime("%H:%M:%S", time.localtime(reset_at))
+            message = f"GitHub istek limiti doldu ({limit or '?'} istek), {when} sonrası yeniden deneyin"
+        else:
+            message = "GitHub istek limiti doldu"
+        if not authenticated:
+            message += "; daha yüksek limit için GITHUB_TOKEN tanımlayın"
+        super().__init__(message)
+
+
+class GitHubError(requests.RequestException):
+    """GitHub API isteği başarısız oldu (ör. repo bulunamadı)"""
+
+
+def create_http_session(pool_size=GITHUB_POOL_SIZE):
+    """Bağlantıları yeniden kullanan (keep-alive) bir requests oturumu oluşturur"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ETagCache:
+    """GitHub yanıtlarını ETag'leriyle SQLite'ta saklar.
+
+    Kayıtlı ETag If-None-Match ile gönderilir; 304 yanıtında gövde buradan
+    döner. Kimlik doğrulamalı isteklerde 304 yanıtları istek limitinden
+    düşülmez. Boyut sınırı aşıldığında en uzun süredir okunmayan kayıtlar
+    silinir.
+    """
+
+    def __init__(self, path=ETAG_CACHE_PATH, max_bytes=ETAG_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access "
+                "ON responses (last_access)"
+            )
+
+    @staticmethod
+    def make_key(url, accept=None):
+        return hashlib.sha256(f"{accept}\0{url}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        return {"etag": row[0], "headers": json.loads(row[1]), "body": row[2]}
+
+    def set(self, key, etag, headers, body):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, etag, json.dumps(headers), body, len(body), time.time()),
+                )
+            self._writes += 1
+            if self._writes % EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+
+    def _evict(self):
+        (total_bytes,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total_bytes <= self.max_bytes:
+            return
+        to_delete = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ):
+            if freed >= total_bytes - self.max_bytes:
+                break
+            to_delete.append((key,))
+            freed += size
+        with self._conn:
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+
+class GitHubClient:
+    """GitHub API ve raw dosya istekleri için paylaşılan bağlantılı istemci.
+
+    requests.Session gibi get() ile kullanılır. Token verilirse yalnızca
+    GitHub adreslerine gönderilir. Akış olmayan GET'ler ETag önbelleğiyle
+    koşullu yapılır. Geçici hatalarda üstel bekleme ile tekrar denenir;
+    istek limiti dolduğunda Retry-After veya X-RateLimit-Reset başlığına
+    göre beklenir. Sayaçlar stats sözlüğündedir (istemci başına, yani
+    çalıştırma başına).
+    """
+
+    def __init__(
+        self,
+        token=GITHUB_TOKEN,
+        pool_size=GITHUB_POOL_SIZE,
+        etag_cache=None,
+        max_retries=GITHUB_MAX_RETRIES,
+        backoff=GITHUB_RETRY_BACKOFF,
+        max_rate_limit_wait=GITHUB_MAX_RATE_LIMIT_WAIT,
+    ):
+        self.token = token
+        self.session = create_http_session(pool_size)
+        self.etag_cache = etag_cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self._lock = threading.Lock()
+        self.stats = {
+            "github_requests": 0,
+            "github_not_modified": 0,
+            "github_retries": 0,
+            "github_rate_limited": 0,
+            "github_rate_limit_remaining": None,
+        }
+
+    def get(self, url, headers=None, timeout=GITHUB_TIMEOUT, stream=False):
+        headers = dict(headers or {})
+        if self.token and url.startswith((GITHUB_API_URL, GITHUB_RAW_URL)):
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        cache_key = cached = None
+        if self.etag_cache is not None and not stream:
+            cache_key = self.etag_cache.make_key(url, headers.get("Accept"))
+            cached = self.etag_cache.get(cache_key)
+            if cached:
+                headers["If-None-Match"] = cached["etag"]
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(
+                    url, headers=headers, timeout=timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._count("github_retries")
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+
+            self._count("github_requests")
+            self._track_rate_limit(response)
+            if response.status_code == 304 and cached:
+                self._count("github_not_modified")
+                return self._cached_response(url, cached)
+            wait = self._retry_wait(response, attempt)
+            if wait is None:
+                break
+            response.close()
+            attempt += 1
+            self._count("github_retries")
+            time.sleep(wait)
+
+        etag = response.headers.get("ETag")
+        if cache_key and response.status_code == 200 and etag:
+            self.etag_cache.set(
+                cache_key,
+                etag,
+                {
+                    "Content-Type": response.headers.get("Content-Type", ""),
+                    "encoding": response.encoding,
+                },
+                response.content,
+            )
+        return response
+
+    def _retry_wait(self, response, attempt):
+        """Tekrar denemeden önce beklenecek süre; tekrar denenmeyecekse None"""
+        status = response.status_code
+        headers = response.headers
+        rate_limited = status == 429 or (
+            status == 403
+            and (
+                headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers
+            )
+        )
+        if rate_limited:
+            self._count("github_rate_limited")
+            reset_at = _int_header(headers, "X-RateLimit-Reset")
+            if "Retry-After" in headers:
+                wait = _int_header(headers, "Retry-After") or 0
+            elif reset_at:
+                wait = max(0, reset_at - time.time()) + 1
+            else:
+                wait = self.backoff * 2**attempt
+            if attempt >= self.max_retries or wait > self.max_rate_limit_wait:
+                response.close()
+                raise GitHubRateLimitError(
+                    reset_at,
+                    headers.get("X-RateLimit-Limit"),
+                    authenticated=bool(self.token),
+                )
+            return wait
+        if status in GITHUB_RETRY_STATUSES and attempt < self.max_retries:
+            return self.backoff * 2**attempt
+        return None
+
+    def _track_rate_limit(self, response):
+        remaining = _int_header(response.headers, "X-RateLimit-Remaining")
+        if remaining is not None:
+            with self._lock:
+                self.stats["github_rate_limit_remaining"] = remaining
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _cached_response(url, cached):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = cached["body"]
+        response.encoding = cached["headers"].get("encoding")
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": cached["headers"].get("Content-Type", "")}
+        )
+        response.from_cache = True
+        return response
+
+
+def _int_header(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+_etag_cache = None
+_etag_cache_disabled = os.environ.get("GITTEXTLAB_GITHUB_CACHE_DISABLED") == "1"
+_etag_cache_lock = threading.Lock()
+
+
+def get_etag_cache():
+    """Paylaşılan ETag önbelleğini döndürür; devre dışıysa veya açılamazsa None"""
+    global _etag_cache, _etag_cache_disabled
+    with _etag_cache_lock:
+        if _etag_cache is None and not _etag_cache_disabled:
+            try:
+                _etag_cache = ETagCache()
+            except sqlite3.Error as e:
+                logger.warning("GitHub önbelleği açılamadı: %s", e)
+                _etag_cache_disabled = True
+        return _etag_cache
+
+
+def create_github_client(token=None, pool_size=GITHUB_POOL_SIZE):
+    """Paylaşılan ETag önbelleğini kullanan yeni bir istemci (yeni sayaçlar) döndürür"""
+    return GitHubClient(
+        token=token or GITHUB_TOKEN, pool_size=pool_size, etag_cache=get_etag_cache()
+    )
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+LLM_ERROR_PREFIX = "❌ LLM Hatası"
+
+
+def git_blob_sha(code):
+    """Metnin git blob SHA'sını hesaplar (GitHub'ın Trees/Contents API'si ile aynı)"""
+    data = code.encode("utf-8")
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def load_previous_results(json_path):
+    """Kayıtlı analiz sonucunu okur; yoksa veya okunamazsa None döner.
+
+    Arayüzün yazdığı dosya listesi ve CLI'nin {"files": [...]} biçimi
+    desteklenir.
+    """
+    if not os.path.exists(json_path):
+        return None
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(data, dict):
+        data = data.get("files")
+    return data if isinstance(data, list) else None
+
+
+def _is_usable(text):
+    return bool(text) and not str(text).startswith(LLM_ERROR_PREFIX)
+
+
+class IncrementalIndex:
+    """Önceki analiz sonuçlarını dosya blob SHA'sı ve fonksiyon hash'i ile indeksler.
+
+    Değişmemiş dosyalar tümüyle, değişen dosyalardaki değişmemiş
+    fonksiyonlar tek tek yeniden kullanılır. Yalnızca istenen alanları
+    hatasız içeren kayıtlar yeniden kullanılabilir sayılır.
+    """
+
+    def __init__(self, previous_results=None, do_optimize=False, do_check_errors=False):
+        self.do_optimize = do_optimize
+        self.do_check_errors = do_check_errors
+        self.files = {}
+        self.functions = {}
+        self.stats = {
+            "files_reused": 0,
+            "files_recomputed": 0,
+            "functions_reused": 0,
+            "functions_recomputed": 0,
+        }
+
+        for file in previous_results or []:
+            self.files[file.get("path", file.get("source_file"))] = file
+            for func in file.get("functions", []):
+                if func.get("source_hash") and self._covers_options(func):
+                    self.functions.setdefault(func["source_hash"], func)
+
+    def _covers_options(self, func):
+        if not _is_usable(func.get("explanation")):
+            return False
+        if self.do_optimize and not _is_usable(func.get("optimization")):
+            return False
+        if self.do_check_errors and not _is_usable(func.get("error_check")):
+            return False
+        return True
+
+    def reusable_file(self, path, blob_sha):
+        """Blob SHA'sı aynı ve tüm fonksiyonları kullanılabilir olan önceki sonucu döndürür.
+
+        Bütçe yüzünden fonksiyonları atlanmış dosyalar yeniden işlenir;
+        analiz edilmiş fonksiyonları tek tek yeniden kullanılır, atlananlar
+        bütçeye yeniden aday olur.
+        """
+        previous = self.files.get(path)
+        if not previous or previous.get("blob_sha") != blob_sha:
+            return None
+        if previous.get("skipped_functions"):
+            return None
+        if not _is_usable(previous.get("file_summary")):
+            return None
+        if not all(self._covers_options(f) for f in previous.get("functions", [])):
+            return None
+        return previous
+
+    def reusable_function(self, source_hash):
+        return self.functions.get(source_hash)
+
+    def count_file(self, reused, function_count):
+        key = "reused" if reused else "recomputed"
+        self.stats[f"files_{key}"] += 1
+        self.stats[f"functions_{key}"] += function_count
+
+    def count_function(self, reused):
+        key = "reused" if reused else "recomputed"
+        self.stats[f"functions_{key}"] += 1
@@ -0,0 +1,371 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LLM_URL = os.environ.get(
+    "GITTEXTLAB_LLM_URL", "http://localhost:1234/v1/chat/completions"
+)  # LM Studio API
+LLM_MODEL = "local-model"  # LM Studio sunucusu model ismine çok takılmaz
+OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_MODEL = "deepseek-coder:6.7b"  # Ollama gerçek model ismi ister
+# Virgülle ayrılmış uç listesi: "url[#model],url[#model]". /api/generate veya
+# /api/chat ile biten adresler Ollama, diğerleri OpenAI uyumlu kabul edilir.
+LLM_BACKENDS = os.environ.get("GITTEXTLAB_LLM_BACKENDS", "")
+
+LLM_MAX_PARALLEL = 4  # Sunucu başına aynı anda gönderilecek en fazla istek
+LLM_MAX_RETRIES = 2  # Bağlantı hatası ve geçici HTTP durumlarında tekrar sayısı
+LLM_RETRY_BACKOFF = 0.5  # İlk tekrar öncesi bekleme (s), her tekrarda iki katına çıkar
+LLM_RETRY_STATUSES = (429, 502, 503, 504)
+LLM_BACKEND_COOLDOWN = 15  # Hata veren sunucuya bu kadar saniye istek gönderilmez
+LLM_HEALTH_TIMEOUT = 2
+LLM_CONNECT_TIMEOUT = 5
+# Akışsız istekte sunucu yanıtın tamamını üretene kadar bayt göndermez;
+# bu süre tüm üretimin üst sınırıdır
+LLM_READ_TIMEOUT = 300
+# Akışta iki parça (ilk token dahil) arasında beklenecek en uzun süre
+LLM_STREAM_IDLE_TIMEOUT = 60
+
+BACKEND_OPENAI = "openai"
+BACKEND_OLLAMA = "ollama"
+
+
+class LLMBackend(ABC):
+    """Tek bir çıkarım sunucusu; istek gövdesini kurar ve yanıtı çözer.
+
+    Sağlık durumu ve açık istek sayısı LLMPool tarafından güncellenir.
+    """
+
+    kind = None
+
+    def __init__(self, url, model, max_parallel=LLM_MAX_PARALLEL):
+        self.url = url
+        self.model = model
+        self.max_parallel = max(1, max_parallel)
+        self.outstanding = 0
+        self.healthy = True
+        self.retry_at = 0.0
+        self.probing = False
+        self.stats = {"requests": 0, "errors": 0, "failovers": 0}
+
+    @property
+    def name(self):
+        return f"{self.kind}:{urlsplit(self.url).netloc}/{self.model}"
+
+    @property
+    @abstractmethod
+    def health_url(self):
+        """Sunucunun canlı olduğunu doğrulamak için yoklanan adres"""
+
+    @abstractmethod
+    def payload(self, prompt, temperature, stream=False):
+        """İstek gövdesini (JSON) döndürür"""
+
+    @abstractmethod
+    def parse(self, response):
+        """Akış olmayan yanıtın metnini döndürür"""
+
+    @abstractmethod
+    def iter_chunks(self, response):
+        """Akış yanıtının metin parçalarını geldikçe verir"""
+
+
+class OpenAIBackend(LLMBackend):
+    """LM Studio, llama.cpp, vLLM gibi /v1/chat/completions sunan sunucular"""
+
+    kind = BACKEND_OPENAI
+
+    @property
+    def health_url(self):
+        return self.url.replace("/chat/completions", "/models")
+
+    def payload(self, prompt, temperature, stream=False):
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def parse(self, response):
+        return response.json()["choices"][0]["message"]["content"]
+
+    def iter_chunks(self, response):
+        # OpenAI uyumlu SSE akışı
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {})
+            chunk = delta.get("content")
+            if chunk:
+                yield chunk
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama'nın kendi /api/generate veya /api/chat ucu"""
+
+    kind = BACKEND_OLLAMA
+
+    @property
+    def chat(self):
+        return self.url.rstrip("/").endswith("/api/chat")
+
+    @property
+    def health_url(self):
+        parts = urlsplit(self.url)
+        return urlunsplit((parts.scheme, parts.netloc, "/api/tags", "", ""))
+
+    def payload(self, prompt, temperature, stream=False):
+        payload = {
+            "model": self.model,
+            "stream": stream,
+            "options": {"temperature": temperature},
+        }
+        if self.chat:
+            payload["messages"] = [{"role": "user", "content": prompt}]
+        else:
+            payload["prompt"] = prompt
+        return payload
+
+    def _text(self, data):
+        if "error" in data:
+            raise ValueError(data["error"])
+        if self.chat:
+            return data.get("message", {}).get("content", "")
+        return data.get("response", "")
+
+    def parse(self, response):
+        return self._text(response.json())
+
+    def iter_chunks(self, response):
+        # Ollama akışı satır başına bir JSON nesnesidir (NDJSON)
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            data = json.loads(line)
+            chunk = self._text(data)
+            if chunk:
+                yield chunk
+            if data.get("done"):
+                break
+
+
+def create_backend(spec, max_parallel=LLM_MAX_PARALLEL):
+    """url[#model] biçimindeki tanımdan uygun adaptörü oluşturur.
+
+    Adres yerine "ollama" veya "openai" yazılırsa varsayılan yerel adres kullanılır.
+    """
+    url, _, model = spec.strip().partition("#")
+    url = {BACKEND_OLLAMA: OLLAMA_URL, BACKEND_OPENAI: LLM_URL}.get(url, url)
+    path = urlsplit(url).path.rstrip("/")
+    if path.endswith(("/api/generate", "/api/chat")):
+        return OllamaBackend(url, model or OLLAMA_MODEL, max_parallel)
+    return OpenAIBackend(url, model or LLM_MODEL, max_parallel)
+
+
+def parse_backend_specs(text):
+    return [spec.strip() for spec in text.split(",") if spec.strip()]
+
+
+class LLMPool:
+    """İstekleri birden fazla çıkarım sunucusuna dağıtır.
+
+    Her istek, kapasitesine göre en az açık isteği olan sağlıklı sunucuya
+    gider (least outstanding requests). Bağlantı hatası veya 5xx veren
+    sunucu LLM_BACKEND_COOLDOWN saniye devre dışı kalır ve istek sıradaki
+    sunucuyla tekrarlanır; 429 sunucuyu devre dışı bırakmaz, yalnızca başka
+    sunucuya geçilir. Süresi dolan sunucuya gerçek istek göndermeden önce
+    sağlık ucu yoklanır. Tüm sunucular denendiyse üstel beklemeyle baştan
+    denenir.
+    """
+
+    def __init__(self, backends, max_retries=LLM_MAX_RETRIES):
+        if not backends:
+            raise ValueError("En az bir LLM sunucusu gerekli")
+        self.backends = list(backends)
+        # Her sunucu en az bir kez denenebilmeli
+        self.max_retries = max_retries + len(self.backends) - 1
+        self._lock = threading.Lock()
+        self._session_size = 0
+        self.session = None
+        self.resize(self.capacity)
+
+    @property
+    def capacity(self):
+        """Tüm sunucuların toplam paralel istek sınırı"""
+        return sum(backend.max_parallel for backend in self.backends)
+
+    @property
+    def cache_model(self):
+        """LLM önbellek anahtarındaki model adı; sunucular aynı modeli sunmalıdır"""
+        return ",".join(sorted({backend.model for backend in self.backends}))
+
+    def resize(self, pool_size):
+        """Bağlantı havuzu paralel istek sayısından küçük kalmamalı"""
+        with self._lock:
+            if pool_size <= self._session_size:
+                return
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=len(self.backends), pool_maxsize=pool_size
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.session = session
+            self._session_size = pool_size
+
+    @contextmanager
+    def request(self, prompt, temperature, stream=False):
+        """(sunucu, yanıt, tekrar sayısı) verir; blok bitince sunucu serbest kalır.
+
+        Son denemenin hatası, tekrar sayısı retries özniteliğine eklenerek
+        yükseltilir. Akışta tekrar denemeler yalnızca yanıt başlamadan yapılır.
+        """
+        tried = set()
+        retries = 0
+        while True:
+            backend = self._acquire(tried)
+            try:
+                response = self.session.post(
+                    backend.url,
+                    headers={"Content-Type": "application/json"},
+                    json=backend.payload(prompt, temperature, stream),
+                    stream=stream,
+                    # Akışta okuma süresi parçalar arası boşta kalma sınırıdır
+                    timeout=(
+                        LLM_CONNECT_TIMEOUT,
+                        LLM_STREAM_IDLE_TIMEOUT if stream else LLM_READ_TIMEOUT,
+                    ),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._release(backend, failed=True)
+                if retries >= self.max_retries:
+                    e.retries = retries
+                    raise
+            else:
+                status = response.status_code
+                retryable = status in LLM_RETRY_STATUSES or status >= 500
+                if not retryable or retries >= self.max_retries:
+                    try:
+                        yield backend, response, retries
+                    finally:
+                        response.close()
+                        self._release(backend, failed=retryable)
+                    return
+                response.close()
+                # Meşgul (429) sunucu sağlıklıdır, yalnızca başkasına geçilir
+                self._release(backend, failed=status != 429)
+
+            tried.add(backend)
+            retries += 1
+            if len(tried) >= len(self.backends):
+                tried.clear()
+                time.sleep(LLM_RETRY_BACKOFF * 2 ** (retries - len(self.backends)))
+            else:
+                with self._lock:
+                    backend.stats["failovers"] += 1
+
+    def _acquire(self, exclude):
+        with self._lock:
+            now = time.monotonic()
+            candidates = [b for b in self.backends if b not in exclude] or list(
+                self.backends
+            )
+            # Bekleme süresi dolmamış sunucular yalnızca başka seçenek yoksa kullanılır
+            ready = [b for b in candidates if b.healthy or b.retry_at <= now]
+            probe = next((b for b in ready if not b.healthy and not b.probing), None)
+            if probe is not None:
+                probe.probing = True
+        # Sağlık yoklaması kilit dışında yapılır; aynı anda tek thread yoklar
+        if probe is not None:
+            alive = self._probe(probe)
+            with self._lock:
+                probe.probing = False
+                if alive:
+                    probe.healthy = True
+                else:
+                    probe.retry_at = time.monotonic() + LLM_BACKEND_COOLDOWN
+                    ready.remove(probe)
+        with self._lock:
+            pool = [b for b in ready if b.healthy] or ready or candidates
+            backend = min(
+                pool,
+                key=lambda b: (b.outstanding / b.max_parallel, b.stats["requests"]),
+            )
+            backend.outstanding += 1
+            backend.stats["requests"] += 1
+            return backend
+
+    def _release(self, backend, failed=False):
+        with self._lock:
+            backend.outstanding -= 1
+            if failed:
+                backend.stats["errors"] += 1
+                backend.healthy = False
+                backend.retry_at = time.monotonic() + LLM_BACKEND_COOLDOWN
+
+    def _probe(self, backend):
+        try:
+            response = self.session.get(backend.health_url, timeout=LLM_HEALTH_TIMEOUT)
+            response.close()
+            return response.status_code < 500
+        except requests.RequestException:
+            return False
+
+    def check_health(self):
+        """Tüm sunucuları yoklar, sağlık durumlarını günceller ve döndürür"""
+        results = {}
+        for backend in self.backends:
+            alive = self._probe(backend)
+            with self._lock:
+                backend.healthy = alive
+                if not alive:
+                    backend.retry_at = time.monotonic() + LLM_BACKEND_COOLDOWN
+            results[backend.name] = alive
+        return results
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {
+                    "name": backend.name,
+                    "url": backend.url,
+                    "healthy": backend.healthy,
+                    "outstanding": backend.outstanding,
+                    **backend.stats,
+                }
+                for backend in self.backends
+            ]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_llm_backends(specs, max_parallel=LLM_MAX_PARALLEL):
+    """Paylaşılan havuzu verilen "url[#model]" listesiyle yeniden kurar"""
+    global _pool
+    with _pool_lock:
+        _pool = LLMPool([create_backend(spec, max_parallel) for spec in specs])
+        return _pool
+
+
+def get_llm_pool():
+    """Paylaşılan havuzu döndürür; ilk çağrıda GITTEXTLAB_LLM_BACKENDS'ten kurulur"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            specs = parse_backend_specs(LLM_BACKENDS) or [LLM_URL]
+            _pool = LLMPool([create_backend(spec) for spec in specs])
+        return _pool
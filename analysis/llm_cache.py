@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.environ.get(
+    "GITTEXTLAB_LLM_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "gittextlab", "llm_cache.sqlite3"),
+)
+CACHE_MAX_ENTRIES = 50000
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # Yanıt metinlerinin toplam boyutu
+EVICT_CHECK_INTERVAL = 100  # Kaç yazmada bir sınırlar kontrol edilir
+
+
+class LLMCache:
+    """LLM yanıtlarını SQLite'ta saklayan, içerik adresli ve LRU tahliyeli önbellek.
+
+    Anahtar; prompt, model adı ve sıcaklığın SHA-256 özetidir. Sınırlar
+    aşıldığında en uzun süredir okunmayan kayıtlar silinir.
+    """
+
+    def __init__(
+        self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access "
+                "ON responses (last_access)"
+            )
+
+    @staticmethod
+    def make_key(prompt, model, temperature):
+        digest = hashlib.sha256()
+        for part in (model, repr(float(temperature)), prompt):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            return row[0]
+
+    def set(self, key, response):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), time.time()),
+                )
+            self._writes += 1
+            if self._writes % EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+
+    def _evict(self):
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Her iki sınırın da altına inene kadar en eski kayıtları sil
+        excess_entries = max(0, entries - self.max_entries)
+        excess_bytes = max(0, total_bytes - self.max_bytes)
+        to_delete = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ):
+            if len(to_delete) >= excess_entries and freed >= excess_bytes:
+                break
+            to_delete.append((key,))
+            freed += size
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def stats(self):
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+
+_cache = None
+_cache_disabled = os.environ.get("GITTEXTLAB_LLM_CACHE_DISABLED") == "1"
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Paylaşılan önbelleği döndürür; devre dışıysa veya açılamazsa None"""
+    global _cache, _cache_disabled
+    with _cache_lock:
+        if _cache is None and not _cache_disabled:
+            try:
+                _cache = LLMCache()
+            except sqlite3.Error as e:
+                logger.warning("LLM önbelleği açılamadı: %s", e)
+                _cache_disabled = True
+        return _cache
+
+
+def set_llm_cache(cache):
+    """Paylaşılan önbelleği değiştirir; None verilirse önbellek kapatılır"""
+    global _cache, _cache_disabled
+    with _cache_lock:
+        _cache = cache
+        _cache_disabled = cache is None
@@ -0,0 +1,220 @@
+import fnmatch
+import hashlib
+import mmap
+import os
+import shutil
+import subprocess
+
+# Her zaman atlanan dizinler (.gitignore olmasa bile)
+SKIPPED_DIRS = {".git", "__pycache__", ".venv", "venv", ".tox", ".nox"}
+
+
+def iter_local_py_files(root):
+    """Yerel bir dizindeki veya git deposundaki .py dosyalarını verir.
+
+    Elemanlar uzak kaynaklarla aynı (path, status_code, code) biçimindedir,
+    böylece aynı dosya analiz hattına beslenebilir.
+    """
+    root = os.path.abspath(os.path.expanduser(root))
+
+    if is_bare_git_repo(root):
+        yield from iter_git_blobs(root)
+        return
+
+    tracked = list_git_files(root)
+    if tracked is not None:
+        paths = tracked
+    else:
+        paths = walk_py_files(root)
+
+    for path in paths:
+        try:
+            code = read_file_mmap(os.path.join(root, path))
+        except OSError as e:
+            yield path, None, str(e)
+            continue
+        yield path, 200, code
+
+
+def local_revision(root):
+    """Analiz edilecek yerel içeriğin sürümünü döndürür, bilinemezse None.
+
+    Çıplak depoda HEAD commit'idir. Çalışma kopyası ve düz dizinlerde
+    dosyalar diskten okunduğu için .py dosyalarının yol, boyut ve
+    değişiklik zamanlarının özetidir; kaydedilmemiş değişiklikler de
+    sürümü değiştirir.
+    """
+    root = os.path.abspath(os.path.expanduser(root))
+    if is_bare_git_repo(root):
+        output = _run_git(["--git-dir", root, "rev-parse", "HEAD"])
+        return output.decode().strip() if output else None
+
+    paths = list_git_files(root)
+    if paths is None:
+        paths = walk_py_files(root)
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(os.path.join(root, path))
+        except OSError:
+            continue
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def read_file_mmap(path):
+    """Dosyayı mmap ile okuyup metne çevirir"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(memoryview(mapped), "utf-8", "replace")
+
+
+def is_bare_git_repo(root):
+    return (
+        os.path.isfile(os.path.join(root, "HEAD"))
+        and os.path.isdir(os.path.join(root, "objects"))
+        and os.path.isdir(os.path.join(root, "refs"))
+    )
+
+
+def _run_git(args):
+    if shutil.which("git") is None:
+        return None
+    try:
+        result = subprocess.run(
+            ["git", *args], capture_output=True, check=True, timeout=60
+        )
+    except (subprocess.SubprocessError, OSError):
+        return None
+    return result.stdout
+
+
+def list_git_files(root):
+    """Çalışma kopyasında .gitignore'a uyan .py dosyalarını git ile listeler.
+
+    Dizin bir git deposu değilse None döner.
+    """
+    if not os.path.exists(os.path.join(root, ".git")):
+        return None
+    output = _run_git(
+        ["-C", root, "ls-files", "-z", "--cached", "--others", "--exclude-standard"]
+    )
+    if output is None:
+        return None
+    paths = output.decode("utf-8", errors="replace").split("\0")
+    return sorted(
+        p for p in paths if p.endswith(".py") and os.path.isfile(os.path.join(root, p))
+    )
+
+
+def iter_git_blobs(git_dir, rev="HEAD"):
+    """Çıplak (bare) depodaki .py dosyalarını blob olarak okur"""
+    listing = _run_git(["--git-dir", git_dir, "ls-tree", "-r", "-z", rev])
+    if not listing:
+        return
+
+    blobs = []
+    for entry in listing.decode("utf-8", errors="replace").split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        _, obj_type, sha = meta.split()
+        if obj_type == "blob" and path.endswith(".py"):
+            blobs.append((path, sha))
+
+    # Tüm blob'lar tek bir cat-file --batch süreci üzerinden okunur
+    process = subprocess.Popen(
+        ["git", "--git-dir", git_dir, "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    try:
+        for path, sha in blobs:
+            process.stdin.write(f"{sha}\n".encode())
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                yield path, None, f"blob okunamadı: {sha}"
+                continue
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)  # Blob sonundaki satır sonu
+            yield path, 200, data.decode("utf-8", errors="replace")
+    finally:
+        process.stdin.close()
+        process.stdout.close()
+        process.wait()
+
+
+def walk_py_files(root):
+    """git kullanılamadığında dizini gezer ve .gitignore kurallarını uygular"""
+    paths = []
+    ignore_rules = {}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+
+        rules = list(ignore_rules.get(os.path.dirname(dirpath), []))
+        rules.extend(_read_gitignore(dirpath, rel_dir))
+        ignore_rules[dirpath] = rules
+
+        dirnames[:] = sorted(
+            d
+            for d in dirnames
+            if d not in SKIPPED_DIRS and not _is_ignored(_join(rel_dir, d), True, rules)
+        )
+        for name in sorted(filenames):
+            rel_path = _join(rel_dir, name)
+            if name.endswith(".py") and not _is_ignored(rel_path, False, rules):
+                paths.append(rel_path)
+    return paths
+
+
+def _join(rel_dir, name):
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _read_gitignore(dirpath, rel_dir):
+    """Dizindeki .gitignore'u (taban, desen, olumsuz, yalnız-dizin) kurallarına çevirir"""
+    rules = []
+    try:
+        with open(os.path.join(dirpath, ".gitignore"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        rules.append((rel_dir, line, negated, dir_only))
+    return rules
+
+
+def _is_ignored(rel_path, is_dir, rules):
+    ignored = False
+    for base, pattern, negated, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            candidate = rel_path[len(base) + 1 :]
+        else:
+            candidate = rel_path
+
+        # "/" içeren desenler tabana göre, diğerleri her seviyede eşleşir
+        if "/" in pattern:
+            matched = fnmatch.fnmatchcase(candidate, pattern.lstrip("/"))
+        else:
+            matched = fnmatch.fnmatchcase(candidate.rsplit("/", 1)[-1], pattern)
+        if matched:
+            ignored = not negated
+    return ignored
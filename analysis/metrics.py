@@ -0,0 +1,85 @@
+import ast
+
+from radon.complexity import cc_rank
+from radon.metrics import h_visit_ast, mi_compute, mi_rank
+from radon.raw import analyze
+from radon.visitors import ComplexityVisitor
+
+
+def compute_file_metrics(code, tree=None):
+    """Radon ile dosya ve fonksiyon metriklerini hesaplar.
+
+    Sonuç JSON'a yazılabilir bir sözlüktür; fonksiyon metrikleri
+    tanım satırı (lineno) ile anahtarlanır. Daha önce ayrıştırılmış ağaç
+    tree ile verilirse yeniden ayrıştırılmaz; kod yalnızca raw metrikler
+    için bir kez tokenize edilir. Ayrıştırılamayan kodda yalnızca "error"
+    alanı döner.
+    """
+    try:
+        if tree is None:
+            tree = ast.parse(code)
+        raw = analyze(code)
+    except (SyntaxError, ValueError) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    # mi_visit kodu yeniden ayrıştırıp tokenize eder; aynı parametreler
+    # zaten elimizdeki ağaç ve raw analizinden hesaplanır
+    complexity_visitor = ComplexityVisitor.from_ast(tree)
+    halstead = h_visit_ast(tree).total
+    comment_lines = raw.comments + raw.multi
+    comment_percent = comment_lines / raw.sloc * 100 if raw.sloc else 0
+    maintainability = mi_compute(
+        halstead.volume,
+        complexity_visitor.total_complexity,
+        raw.lloc,
+        comment_percent,
+    )
+    blocks = complexity_visitor.blocks
+
+    functions = {}
+    for block in _iter_function_blocks(blocks):
+        functions[block.lineno] = {
+            "cyclomatic_complexity": block.complexity,
+            "rank": cc_rank(block.complexity),
+        }
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.lineno in functions:
+                functions[node.lineno]["halstead"] = _halstead_dict(
+                    h_visit_ast(node).total
+                )
+
+    complexities = [f["cyclomatic_complexity"] for f in functions.values()]
+    return {
+        "loc": raw.loc,
+        "sloc": raw.sloc,
+        "comments": raw.comments,
+        "blank": raw.blank,
+        "maintainability_index": round(maintainability, 2),
+        "mi_rank": mi_rank(maintainability),
+        "average_complexity": (
+            round(sum(complexities) / len(complexities), 2) if complexities else 0
+        ),
+        "max_complexity": max(complexities, default=0),
+        "halstead": _halstead_dict(halstead),
+        "functions": functions,
+    }
+
+
+def _iter_function_blocks(blocks):
+    """cc_visit_ast sonucundaki fonksiyon, metot ve iç fonksiyonları düzleştirir"""
+    for block in blocks:
+        if hasattr(block, "closures"):
+            yield block
+            yield from _iter_function_blocks(block.closures)
+
+
+def _halstead_dict(report):
+    return {
+        "vocabulary": report.vocabulary,
+        "length": report.length,
+        "volume": round(report.volume, 2),
+        "difficulty": round(report.difficulty, 2),
+        "effort": round(report.effort, 2),
+        "bugs": round(report.bugs, 4),
+    }
@@ -0,0 +1,149 @@
+import ast
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis.function_analysis import parse_source
+from analysis.incremental import git_blob_sha
+from analysis.metrics import compute_file_metrics
+
+PARSE_MAX_WORKERS = None  # None: işlemci sayısı kadar süreç
+PARSE_CHUNK_SIZE = 8  # Bir süreç görevine düşen dosya sayısı
+# fork, LLM zamanlayıcısı ve indirme thread'lerinin tuttuğu kilitleri çocuk
+# sürece kopyalar; işçiler temiz bir süreçten başlatılır
+PARSE_START_METHOD = "forkserver" if os.name == "posix" else "spawn"
+
+
+def parse_file(path, code):
+    """Tek dosyayı ayrıştırıp metriklerini hesaplar.
+
+    Kod bir kez ayrıştırılır; aynı ağaç fonksiyon çıkarımı ve metrikler
+    için kullanılır. Sonuç AST nesnesi içermez; yalnızca düz sözlük ve
+    listelerden oluşur, bu yüzden süreçler arasında ucuzca taşınabilir
+    (pickle).
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError) as e:
+        error = f"{type(e).__name__}: {e}"
+        return {
+            "path": path,
+            "blob_sha": git_blob_sha(code),
+            "parsed": {
+                "functions": [],
+                "classes": [],
+                "imports": [],
+                "line_count": len(code.splitlines()),
+                "error": error,
+            },
+            "metrics": {"error": error},
+        }
+    return {
+        "path": path,
+        "blob_sha": git_blob_sha(code),
+        "parsed": parse_source(code, tree),
+        "metrics": compute_file_metrics(code, tree),
+    }
+
+
+def parse_chunk(chunk):
+    return [parse_file(path, code) for path, code in chunk]
+
+
+class ParseStage:
+    """ast.parse, fonksiyon çıkarımı ve metrikleri bir süreç havuzuna dağıtır.
+
+    Dosyalar chunk_size'lık gruplar halinde işçilere gönderilir. Kaynak tek
+    gruba sığıyorsa havuz hiç açılmaz ve iş aynı süreçte yapılır. Sonuçlar
+    giriş sırasıyla verilir; aynı anda işlenen grup sayısı sınırlıdır.
+    İşçiler her grupla kendi tepe belleklerini bildirir; en büyüğü
+    worker_peak_rss_mb'dedir (havuz açılmadıysa None).
+    """
+
+    def __init__(self, max_workers=PARSE_MAX_WORKERS, chunk_size=PARSE_CHUNK_SIZE):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.worker_peak_rss_mb = None
+
+    def parse(self, files):
+        """(path, code) çiftlerini alır, (path, code, kayıt) üçlülerini verir"""
+        files = iter(files)
+        first_chunk = self._take_chunk(files)
+        next_chunk = self._take_chunk(files)
+
+        if self.max_workers <= 1 or not next_chunk:
+            # Küçük repo: süreç başlatma maliyetine değmez
+            yield from self._parse_inline(first_chunk)
+            while next_chunk:
+                yield from self._parse_inline(next_chunk)
+                next_chunk = self._take_chunk(files)
+            return
+
+        in_flight = deque()
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+        ) as pool:
+            chunk = first_chunk
+            while chunk:
+                try:
+                    future = pool.submit(_parse_chunk_in_worker, chunk)
+                except BrokenProcessPool:
+                    future = None
+                in_flight.append((chunk, future))
+                # Bellek için en fazla iki tur grup beklemede tutulur
+                if len(in_flight) >= self.max_workers * 2:
+                    yield from self._finish(*in_flight.popleft())
+                chunk, next_chunk = next_chunk, self._take_chunk(files)
+            while in_flight:
+                yield from self._finish(*in_flight.popleft())
+
+    def _take_chunk(self, files):
+        chunk = []
+        for item in files:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                break
+        return chunk
+
+    def _parse_inline(self, chunk):
+        for (path, code), record in zip(chunk, parse_chunk(chunk)):
+            yield path, code, record
+
+    def _finish(self, chunk, future):
+        try:
+            if future:
+                records, peak_rss_mb = future.result()
+                if peak_rss_mb is not None:
+                    self.worker_peak_rss_mb = max(
+                        self.worker_peak_rss_mb or 0, peak_rss_mb
+                    )
+            else:
+                records = parse_chunk(chunk)
+        except BrokenProcessPool:
+            # İşçi süreç çöktüyse bu grup aynı süreçte yeniden işlenir
+            records = parse_chunk(chunk)
+        for (path, code), record in zip(chunk, records):
+            yield path, code, record
+
+
+def _parse_chunk_in_worker(chunk):
+    """İşçi süreçte grubu ayrıştırır, kayıtları sürecin tepe belleğiyle döndürür.
+
+    Havuz işçileri forkserver'ın çocuklarıdır; ana süreç RUSAGE_CHILDREN ile
+    onları göremez, bu yüzden her işçi kendi değerini bildirir.
+    """
+    return parse_chunk(chunk), _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
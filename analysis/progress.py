@@ -0,0 +1,78 @@
+import sys
+import threading
+
+
+class StreamlitProgress:
+    """İlerleme mesajlarını Streamlit bileşenleriyle gösterir (varsayılan).
+
+    streamlit yalnızca bu sınıf oluşturulduğunda içe aktarılır; analiz
+    modülleri arayüz olmadan da kullanılabilir.
+    """
+
+    def __init__(self):
+        import streamlit as st
+
+        self._st = st
+
+    def info(self, message):
+        self._st.info(message)
+
+    def warning(self, message):
+        self._st.warning(message)
+
+    def error(self, message):
+        self._st.error(message)
+
+    def success(self, message):
+        self._st.success(message)
+
+
+class ConsoleProgress:
+    """İlerleme mesajlarını satır satır bir akışa (varsayılan stderr) yazar.
+
+    prefix, aynı anda birden fazla repo analiz edilirken satırları ayırt
+    etmek içindir. verbose False ise bilgi mesajları yazılmaz.
+    """
+
+    LEVELS = {"info": "ℹ️", "warning": "⚠️", "error": "❌", "success": "✅"}
+
+    _lock = threading.Lock()  # Farklı thread'lerin satırları karışmasın
+
+    def __init__(self, prefix="", stream=None, verbose=True):
+        self.prefix = prefix
+        self.stream = stream or sys.stderr
+        self.verbose = verbose
+
+    def _write(self, level, message):
+        prefix = f"[{self.prefix}] " if self.prefix else ""
+        with self._lock:
+            print(
+                f"{self.LEVELS[level]} {prefix}{message}", file=self.stream, flush=True
+            )
+
+    def info(self, message):
+        if self.verbose:
+            self._write("info", message)
+
+    def warning(self, message):
+        self._write("warning", message)
+
+    def error(self, message):
+        self._write("error", message)
+
+    def success(self, message):
+        self._write("success", message)
+
+
+class NullProgress:
+    """Tüm mesajları yok sayar"""
+
+    def info(self, message):
+        pass
+
+    warning = error = success = info
+
+
+def resolve_progress(progress=None):
+    """progress verilmemişse Streamlit'e yazan varsayılan hedefi döndürür"""
+    return progress if progress is not None else StreamlitProgress()
@@ -0,0 +1,316 @@
+import math
+
+from radon.complexity import cc_rank
+
+from analysis.chunked_summary import is_failed_summary
+from analysis.duplicates import duplicate_report
+from analysis.progress import resolve_progress
+from analysis.shared import (
+    analyze_function_with_llama,
+    estimate_tokens,
+    extract_json_object,
+)
+
+# Bileşen ağırlıkları; verisi olmayan bileşenler çıkarılıp kalanlar yeniden ölçeklenir
+SCORE_WEIGHTS = {
+    "maintainability": 0.30,
+    "complexity": 0.25,
+    "documentation": 0.20,
+    "function_size": 0.15,
+    "duplication": 0.10,
+}
+SCORE_COMPONENT_LABELS = {
+    "maintainability": "Bakım kolaylığı",
+    "complexity": "Karmaşıklık",
+    "documentation": "Dokümantasyon",
+    "function_size": "Fonksiyon boyutu",
+    "duplication": "Tekrar",
+}
+RANK_POINTS = {"A": 100, "B": 85, "C": 65, "D": 45, "E": 25, "F": 0}
+MAINTAINABILITY_GOOD = 65  # Bu maintainability index ve üstü tam puan alır
+FUNCTION_LENGTH_GOOD = 30  # Bu uzunluğa kadar tam puan
+FUNCTION_LENGTH_MAX = 150  # Bu uzunluktan itibaren sıfır puan
+COMMENT_RATIO_GOOD = 0.15  # Yorum satırı / kod satırı
+DOCSTRING_WEIGHT = 0.7  # Dokümantasyonun geri kalanı yorum oranıdır
+DUPLICATION_PENALTY = 2  # Fonksiyonların %50'si kopyaysa bileşen sıfırlanır
+
+SCORE_MAX_ADJUSTMENT = 10  # LLM'in temel puana ekleyip çıkarabileceği en fazla puan
+SCORE_PROMPT_TOKEN_BUDGET = 1200  # Düzeltme prompt'undaki dosya özetleri için
+SCORE_SUMMARY_CHARS = 200
+SCORE_HOTSPOTS = 5
+
+
+def project_metrics(analysis_results, file_records=None):
+    """Tüm dosya ve fonksiyon sonuçlarından repo geneli yerel metrikleri toplar.
+
+    file_records, analyze_github_repository'nin ayrıştırılan her dosya için
+    doldurduğu {"path", "metrics"} listesidir; fonksiyonu olmayan ve
+    ayrıştırılamayan dosyalar yalnızca burada bulunur. Verilmezse dosya
+    metrikleri sonuçlardan alınır.
+    """
+    if file_records is None:
+        file_records = analysis_results
+    files = len(file_records)
+    parsed = sloc = comments = 0
+    weighted_mi = mi_weight = 0.0
+    ranks = []
+    lengths = []
+    documented = analyzed = 0
+
+    for record in file_records:
+        metrics = record.get("metrics") or {}
+        if metrics and "error" not in metrics:
+            parsed += 1
+            sloc += metrics.get("sloc") or 0
+            comments += metrics.get("comments") or 0
+            # Büyük dosyalar ortalamada daha fazla ağırlık taşır
+            weight = max(metrics.get("sloc") or 0, 1)
+            weighted_mi += metrics["maintainability_index"] * weight
+            mi_weight += weight
+
+    for file in analysis_results:
+        metrics = file.get("metrics") or {}
+        file_ranks = []
+        for func in file.get("functions", []):
+            analyzed += 1
+            documented += bool(func.get("docstring"))
+            if func.get("complexity_rank"):
+                file_ranks.append(func["complexity_rank"])
+            lengths.append(func.get("length") or 0)
+        # Bütçe yüzünden LLM'e gönderilmeyen fonksiyonlar da boyuta sayılır
+        for func in file.get("skipped_functions", []):
+            lengths.append(func.get("length") or 0)
+        if not file_ranks and metrics.get("average_complexity"):
+            file_ranks.append(cc_rank(metrics["average_complexity"]))
+        ranks.extend(file_ranks)
+
+    redundant = redundant_functions(duplicate_report(analysis_results))
+    return {
+        "files": files,
+        "parsed_files": parsed,
+        "sloc": sloc,
+        "functions": len(lengths),
+        "maintainability_index": (
+            round(weighted_mi / mi_weight, 2) if mi_weight else None
+        ),
+        "complexity_ranks": ranks,
+        "function_lengths": lengths,
+        "docstring_coverage": documented / analyzed if analyzed else None,
+        "comment_ratio": comments / sloc if sloc else None,
+        "duplicate_ratio": min(redundant / analyzed, 1) if analyzed else None,
+    }
+
+
+def redundant_functions(groups):
+    """Kopya gruplarında temsilci dışında kalan fonksiyon sayısı.
+
+    Birebir ve yakın gruplar aynı fonksiyonları içerebilir; ortak üyesi
+    olan gruplar birleştirilir ve her birleşik gruptan bir temsilci düşülür.
+    """
+    parent = {}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for group in groups:
+        keys = [(member["path"], member["lineno"]) for member in group["functions"]]
+        for key in keys:
+            parent.setdefault(key, key)
+        for key in keys[1:]:
+            parent[find(key)] = find(keys[0])
+    roots = {find(key) for key in parent}
+    return len(parent) - len(roots)
+
+
+def score_components(metrics):
+    """Metrikleri 0-100 arası bileşen puanlarına çevirir; verisi olmayan None olur"""
+    components = dict.fromkeys(SCORE_WEIGHTS)
+    if metrics["maintainability_index"] is not None:
+        components["maintainability"] = min(
+            100, metrics["maintainability_index"] * 100 / MAINTAINABILITY_GOOD
+        )
+    if metrics["complexity_ranks"]:
+        ranks = metrics["complexity_ranks"]
+        components["complexity"] = sum(RANK_POINTS[r] for r in ranks) / len(ranks)
+    if metrics["function_lengths"]:
+        span = FUNCTION_LENGTH_MAX - FUNCTION_LENGTH_GOOD
+        components["function_size"] = sum(
+            100 * min(1, max(0, FUNCTION_LENGTH_MAX - length) / span)
+            for length in metrics["function_lengths"]
+        ) / len(metrics["function_lengths"])
+    if metrics["comment_ratio"] is not None:
+        comments = 100 * min(1, metrics["comment_ratio"] / COMMENT_RATIO_GOOD)
+        if metrics["docstring_coverage"] is None:
+            components["documentation"] = comments
+        else:
+            components["documentation"] = (
+                DOCSTRING_WEIGHT * 100 * metrics["docstring_coverage"]
+                + (1 - DOCSTRING_WEIGHT) * comments
+            )
+    if metrics["duplicate_ratio"] is not None:
+        components["duplication"] = 100 * max(
+            0, 1 - DUPLICATION_PENALTY * metrics["duplicate_ratio"]
+        )
+    return {
+        name: round(value, 1) if value is not None else None
+        for name, value in components.items()
+    }
+
+
+def baseline_score(components, metrics):
+    """Bileşenlerin ağırlıklı ortalaması; ayrıştırılamayan dosyalar oranında düşer"""
+    weights = {
+        name: weight
+        for name, weight in SCORE_WEIGHTS.items()
+        if components.get(name) is not None
+    }
+    if not weights:
+        return 0
+    score = sum(components[name] * w for name, w in weights.items()) / sum(
+        weights.values()
+    )
+    if metrics["files"]:
+        score *= metrics["parsed_files"] / metrics["files"]
+    return round(score)
+
+
+def score_project(analysis_results, file_records=None, use_llm=True, progress=None):
+    """Projeyi yerel metriklerden puanlar, isteğe bağlı tek bir LLM düzeltmesi ekler.
+
+    Temel puan tüm repodaki radon metrikleri, docstring ve yorum oranı,
+    fonksiyon boyutları ve kopya oranından deterministik olarak hesaplanır;
+    file_records verilirse (bkz. project_metrics) fonksiyonu olmayan ve
+    ayrıştırılamayan dosyalar da hesaba katılır.
+    use_llm ise model temel puanı ve özet bilgileri görüp en fazla
+    ±SCORE_MAX_ADJUSTMENT puanlık bir düzeltmeyi JSON olarak önerir;
+    yanıt geçersizse düzeltme yapılmaz. Dönen sözlükte puanın dökümü de
+    bulunur. LLM hataları progress'e uyarı olarak yazılır.
+    """
+    metrics = project_metrics(analysis_results, file_records)
+    components = score_components(metrics)
+    baseline = baseline_score(components, metrics)
+    details = {
+        "score": baseline,
+        "baseline": baseline,
+        "adjustment": 0,
+        "reason": None,
+        "llm": False,
+        "fast": not use_llm,
+        "components": components,
+        "files": metrics["files"],
+        "parsed_files": metrics["parsed_files"],
+        "functions": metrics["functions"],
+    }
+    if not use_llm or not analysis_results:
+        return details
+
+    prompt = _adjustment_prompt(analysis_results, metrics, components, baseline)
+    # analyze_function_with_llama hata yükseltmez, hata metni döndürür
+    response = analyze_function_with_llama("", prompt, kind="score")
+    parsed = None
+    if is_failed_summary(response):
+        resolve_progress(progress).warning(f"Puan düzeltmesi alınamadı ({response})")
+    else:
+        parsed = extract_json_object(response)
+    adjustment = _validate_adjustment(parsed)
+    if adjustment is not None:
+        reason = parsed.get("reason")
+        details.update(
+            {
+                "score": max(0, min(100, baseline + adjustment)),
+                "adjustment": adjustment,
+                "reason": str(reason).strip() if reason else None,
+                "llm": True,
+            }
+        )
+    return details
+
+
+def _validate_adjustment(parsed):
+    if not parsed:
+        return None
+    value = parsed.get("adjustment")
+    if isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    # "Infinity" / "NaN" json.loads ile geçerli sayıdır ama round() edilemez
+    if not math.isfinite(value):
+        return None
+    value = round(value)
+    return max(-SCORE_MAX_ADJUSTMENT, min(SCORE_MAX_ADJUSTMENT, value))
+
+
+def _adjustment_prompt(analysis_results, metrics, components, baseline):
+    component_lines = "\n".join(
+        f"- {SCORE_COMPONENT_LABELS[name]}: {value}/100"
+        for name, value in components.items()
+        if value is not None
+    )
+
+    measured = [
+        file
+        for file in analysis_results
+        if file.get("metrics") and "error" not in file["metrics"]
+    ]
+    worst_files = sorted(measured, key=lambda f: f["metrics"]["maintainability_index"])[
+        :SCORE_HOTSPOTS
+    ]
+    functions = [
+        (file.get("source_file", file.get("path")), func)
+        for file in analysis_results
+        for func in file.get("functions", [])
+    ]
+    complex_functions = sorted(
+        functions, key=lambda item: -(item[1].get("complexity") or 0)
+    )[:SCORE_HOTSPOTS]
+    hotspot_lines = [
+        f"- {f.get('source_file', f.get('path'))}: maintainability "
+        f"{f['metrics']['maintainability_index']}"
+        for f in worst_files
+    ] + [
+        f"- {path}::{func['name']}: karmaşıklık {func.get('complexity')}, "
+        f"{func.get('length')} satır"
+        for path, func in complex_functions
+    ]
+
+    # Özetler büyük dosyalardan başlayarak token bütçesi dolana kadar eklenir
+    summary_lines = []
+    budget = SCORE_PROMPT_TOKEN_BUDGET
+    by_size = sorted(
+        analysis_results,
+        key=lambda f: -((f.get("metrics") or {}).get("sloc") or 0),
+    )
+    for file in by_size:
+        summary = file.get("file_summary")
+        if not isinstance(summary, str) or is_failed_summary(summary):
+            continue
+        line = (
+            f"- {file.get('source_file', file.get('path'))}: "
+            f"{' '.join(summary.split())[:SCORE_SUMMARY_CHARS]}"
+        )
+        budget -= estimate_tokens(line)
+        if budget < 0:
+            break
+        summary_lines.append(line)
+
+    hotspots = "\n".join(hotspot_lines)
+    summaries = "\n".join(summary_lines)
+    return (
+        f"Bir Python projesi yerel metriklerle {baseline}/100 temel puan aldı.\n"
+        f"Proje: {metrics['files']} dosya, {metrics['functions']} fonksiyon, "
+        f"{metrics['sloc']} kod satırı.\n\n"
+        f"Bileşen puanları:\n{component_lines}\n\n"
+        f"Sorunlu noktalar:\n{hotspots}\n\n"
+        f"Dosya özetleri:\n{summaries}\n\n"
+        f"Metriklerin göremediği konuları (doğruluk, hata kontrolü, güvenlik, "
+        f"tasarım) değerlendirerek temel puana -{SCORE_MAX_ADJUSTMENT} ile "
+        f"+{SCORE_MAX_ADJUSTMENT} arasında bir düzeltme öner. Yanıtı YALNIZCA şu "
+        f'JSON nesnesi olarak ver: {{"adjustment": <tam sayı>, "reason": '
+        f'"<tek cümlelik gerekçe>"}}'
+    )
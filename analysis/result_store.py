@@ -0,0 +1,381 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DB_PATH = os.environ.get("GITTEXTLAB_RESULTS_DB", "gittextlab_results.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    score INTEGER,
+    score_details TEXT,
+    file_records TEXT,
+    options TEXT,
+    stats TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    blob_sha TEXT,
+    function_count INTEGER NOT NULL,
+    loc INTEGER,
+    maintainability_index REAL,
+    average_complexity REAL,
+    max_complexity INTEGER,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    run_id INTEGER NOT NULL,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    lineno INTEGER,
+    length INTEGER,
+    complexity INTEGER,
+    complexity_rank TEXT,
+    halstead_volume REAL,
+    source_hash TEXT,
+    fingerprint TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_repo ON runs (repo, completed, id);
+CREATE INDEX IF NOT EXISTS idx_files_run_path ON files (run_id, path);
+CREATE INDEX IF NOT EXISTS idx_files_repo_path ON files (repo, path);
+CREATE INDEX IF NOT EXISTS idx_files_mi ON files (maintainability_index);
+CREATE INDEX IF NOT EXISTS idx_functions_file ON functions (file_id);
+CREATE INDEX IF NOT EXISTS idx_functions_run ON functions (run_id);
+CREATE INDEX IF NOT EXISTS idx_functions_repo ON functions (repo, path);
+CREATE INDEX IF NOT EXISTS idx_functions_name ON functions (name);
+CREATE INDEX IF NOT EXISTS idx_functions_complexity ON functions (complexity);
+CREATE INDEX IF NOT EXISTS idx_functions_hash ON functions (source_hash);
+CREATE INDEX IF NOT EXISTS idx_functions_fingerprint ON functions (fingerprint);
+"""
+
+# Her reponun tamamlanmış son çalıştırması; sorgular varsayılan olarak bunlara bakar
+LATEST_RUNS = """
+SELECT MAX(id) FROM runs WHERE completed = 1 GROUP BY repo
+"""
+
+
+class ResultStore:
+    """Analiz sonuçlarını SQLite'ta repo, dosya ve fonksiyon bazında saklar.
+
+    Her dosya analizi tamamlandığında add_file() ile ayrı bir işlemde
+    yazılır; sonuçların tamamını bellekte tutmak gerekmez. Sıkça sorgulanan
+    alanlar (karmaşıklık, maintainability index, isim) indeksli sütunlarda,
+    kaydın tamamı ise JSON olarak "data" sütunundadır.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Yazma
+
+    def start_run(self, repo, options=None):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (repo, started_at, options) VALUES (?, ?, ?)",
+                (repo, time.time(), json.dumps(options or {}, sort_keys=True)),
+            )
+            return cursor.lastrowid
+
+    def add_file(self, run_id, file_analysis):
+        """Tek dosyanın analizini ve fonksiyonlarını yazar"""
+        functions = file_analysis.get("functions", [])
+        file_data = {k: v for k, v in file_analysis.items() if k != "functions"}
+        metrics = file_analysis.get("metrics") or {}
+        path = file_analysis.get("path", file_analysis.get("source_file"))
+
+        with self._lock, self._conn:
+            repo = self._conn.execute(
+                "SELECT repo FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()["repo"]
+            # Aynı çalıştırmada tekrar yazılan dosya öncekinin yerine geçer
+            self._conn.execute(
+                "DELETE FROM files WHERE run_id = ? AND path = ?", (run_id, path)
+            )
+            cursor = self._conn.execute(
+                "INSERT INTO files (run_id, repo, path, blob_sha, function_count, loc, "
+                "maintainability_index, average_complexity, max_complexity, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    repo,
+                    path,
+                    file_analysis.get("blob_sha"),
+                    len(functions),
+                    metrics.get("loc"),
+                    metrics.get("maintainability_index"),
+                    metrics.get("average_complexity"),
+                    metrics.get("max_complexity"),
+                    json.dumps(file_data, ensure_ascii=False),
+                ),
+            )
+            file_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO functions (file_id, run_id, repo, path, name, lineno, "
+                "length, complexity, complexity_rank, halstead_volume, source_hash, "
+                "fingerprint, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        file_id,
+                        run_id,
+                        repo,
+                        path,
+                        func.get("name", ""),
+                        func.get("lineno"),
+                        func.get("length"),
+                        func.get("complexity"),
+                        func.get("complexity_rank"),
+                        (func.get("halstead") or {}).get("volume"),
+                        func.get("source_hash"),
+                        func.get("fingerprint"),
+                        json.dumps(func, ensure_ascii=False),
+                    )
+                    for func in functions
+                ],
+            )
+        return file_id
+
+    def finish_run(
+        self, run_id, stats=None, score=None, score_details=None, file_records=None
+    ):
+        """Çalıştırmayı tamamlandı işaretler.
+
+        file_records, proje puanının yeniden hesaplanabilmesi için her
+        dosyanın metrik kaydıdır (bkz. project_metrics).
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, completed = 1, stats = ?, "
+                "score = COALESCE(?, score), "
+                "score_details = COALESCE(?, score_details), "
+                "file_records = COALESCE(?, file_records) WHERE id = ?",
+                (
+                    time.time(),
+                    json.dumps(stats or {}),
+                    score,
+                    _dumps_or_none(score_details),
+                    _dumps_or_none(file_records),
+                    run_id,
+                ),
+            )
+
+    def set_score(self, run_id, score, score_details=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET score = ?, score_details = ? WHERE id = ?",
+                (score, _dumps_or_none(score_details), run_id),
+            )
+
+    def delete_run(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def discard_incomplete_runs(self, repo):
+        """Yarıda kalmış çalıştırmaları siler (ör. kesilen bir CLI çalıştırması)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM runs WHERE repo = ? AND completed = 0", (repo,)
+            )
+
+    # Okuma
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def latest_run_id(self, repo, completed=True):
+        sql = "SELECT MAX(id) AS id FROM runs WHERE repo = ?"
+        if completed:
+            sql += " AND completed = 1"
+        return self._query(sql, (repo,))[0]["id"]
+
+    def find_run(self, repo, options):
+        """Aynı seçeneklerle (sürüm dahil) tamamlanmış son çalıştırmayı bulur"""
+        rows = self._query(
+            "SELECT id, score, score_details, file_records FROM runs WHERE repo = ? "
+            "AND options = ? AND completed = 1 ORDER BY id DESC LIMIT 1",
+            (repo, json.dumps(options, sort_keys=True)),
+        )
+        if not rows:
+            return None
+        run = rows[0]
+        for column in ("score_details", "file_records"):
+            if run[column]:
+                run[column] = json.loads(run[column])
+        return run
+
+    def iter_run_files(self, run_id):
+        """Çalıştırmanın dosya analizlerini JSON çıktısıyla aynı biçimde, tek tek verir"""
+        with self._lock:
+            file_ids = [
+                row["id"]
+                for row in self._conn.execute(
+                    "SELECT id FROM files WHERE run_id = ? ORDER BY id", (run_id,)
+                )
+            ]
+        for file_id in file_ids:
+            with self._lock:
+                file_data = self._conn.execute(
+                    "SELECT data FROM files WHERE id = ?", (file_id,)
+                ).fetchone()["data"]
+                function_rows = self._conn.execute(
+                    "SELECT data FROM functions WHERE file_id = ? ORDER BY id",
+                    (file_id,),
+                ).fetchall()
+            file_analysis = json.loads(file_data)
+            file_analysis["functions"] = [json.loads(r["data"]) for r in function_rows]
+            yield file_analysis
+
+    def load_run(self, run_id):
+        return list(self.iter_run_files(run_id))
+
+    def load_latest(self, repo):
+        """Reponun tamamlanmış son analizini döndürür, yoksa None"""
+        run_id = self.latest_run_id(repo)
+        return self.load_run(run_id) if run_id else None
+
+    def export_json(self, run_id, path):
+        """Çalıştırmayı eski <kullanıcı>_<repo>_analysis.json biçiminde yazar.
+
+        Dosyalar veritabanından tek tek okunup yazılır, tamamı belleğe
+        alınmaz.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for index, file_analysis in enumerate(self.iter_run_files(run_id)):
+                f.write(",\n" if index else "\n")
+                json.dump(file_analysis, f, ensure_ascii=False)
+            f.write("\n]\n")
+
+    def top_complex_functions(self, limit=50, repo=None, all_runs=False):
+        """En yüksek cyclomatic complexity'ye sahip fonksiyonlar.
+
+        Varsayılan olarak her reponun tamamlanmış son çalıştırmasına bakılır.
+        """
+        sql = (
+            "SELECT repo, path, name, lineno, length, complexity, complexity_rank, "
+            "halstead_volume, run_id FROM functions WHERE complexity IS NOT NULL"
+        )
+        params = []
+        if not all_runs:
+            sql += f" AND run_id IN ({LATEST_RUNS})"
+        if repo:
+            sql += " AND repo = ?"
+            params.append(repo)
+        sql += " ORDER BY complexity DESC, halstead_volume DESC LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def least_maintainable_files(self, limit=50, repo=None):
+        sql = (
+            "SELECT repo, path, loc, maintainability_index, average_complexity, "
+            "max_complexity, function_count, run_id FROM files "
+            f"WHERE maintainability_index IS NOT NULL AND run_id IN ({LATEST_RUNS})"
+        )
+        params = []
+        if repo:
+            sql += " AND repo = ?"
+            params.append(repo)
+        sql += " ORDER BY maintainability_index ASC LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def find_functions(self, name, repo=None, limit=100):
+        """İsmi name ile eşleşen fonksiyonlar (SQL LIKE kalıbı kullanılabilir)"""
+        sql = (
+            "SELECT repo, path, name, lineno, complexity, complexity_rank, run_id "
+            f"FROM functions WHERE name LIKE ? AND run_id IN ({LATEST_RUNS})"
+        )
+        params = [name]
+        if repo:
+            sql += " AND repo = ?"
+            params.append(repo)
+        sql += " ORDER BY repo, path, lineno LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+    def duplicate_functions(self, min_count=2, repo=None, limit=50):
+        """Birebir kopya fonksiyon grupları (isim ve biçim farkları hariç).
+
+        Her reponun son çalıştırmasına bakılır; repo verilmezse repolar
+        arası kopyalar da bulunur.
+        """
+        sql = (
+            "SELECT fingerprint, COUNT(*) AS count, COUNT(DISTINCT repo) AS repos, "
+            "SUM(length) AS total_lines, "
+            "GROUP_CONCAT(repo || ':' || path || ':' || name, '\n') AS functions "
+            f"FROM functions WHERE fingerprint IS NOT NULL AND run_id IN ({LATEST_RUNS})"
+        )
+        params = []
+        if repo:
+            sql += " AND repo = ?"
+            params.append(repo)
+        sql += " GROUP BY fingerprint HAVING COUNT(*) >= ? "
+        sql += "ORDER BY count DESC, total_lines DESC LIMIT ?"
+        params.extend([min_count, limit])
+        return [
+            {**row, "functions": row["functions"].split("\n")}
+            for row in self._query(sql, params)
+        ]
+
+    def repo_summaries(self):
+        """Her reponun son çalıştırması için dosya/fonksiyon sayısı, karmaşıklık ve puan"""
+        return self._query(f"""
+            SELECT r.repo, r.id AS run_id, r.score, r.finished_at,
+                   COUNT(DISTINCT f.id) AS files,
+                   COALESCE(SUM(f.function_count), 0) AS functions,
+                   AVG(f.maintainability_index) AS average_maintainability,
+                   MAX(f.max_complexity) AS max_complexity
+            FROM runs r LEFT JOIN files f ON f.run_id = r.id
+            WHERE r.id IN ({LATEST_RUNS})
+            GROUP BY r.id ORDER BY r.repo
+            """)
+
+
+def _dumps_or_none(value):
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Paylaşılan sonuç deposunu döndürür; açılamazsa None"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ResultStore()
+            except sqlite3.Error as e:
+                logger.warning("Sonuç veritabanı açılamadı: %s", e)
+                return None
+        return _store
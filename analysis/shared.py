@@ -1,35 +1,235 @@
+import contextvars
+import itertools
 import json
-import re
-import requests
+import queue
+import threading
+import time
+from concurrent.futures import Future
 
+from analysis.llm_backends import LLM_MAX_PARALLEL, get_llm_pool
+from analysis.llm_cache import get_llm_cache
+from analysis.telemetry import record_llm_call
 
-def analyze_function_with_llama(function_code, prompt=None):
+LLM_TEMPERATURE = 0.1
+
+# Küçük değer önce çalışır: önce dosya özetleri, sonra açıklamalar.
+# Parçalı özetin birleştirme adımını çağıran thread beklediği için en öndedir.
+PRIORITY_REDUCE = -1
+PRIORITY_SUMMARY = 0
+PRIORITY_EXPLAIN = 1
+PRIORITY_OPTIMIZE = 2
+PRIORITY_ERROR_CHECK = 2
+
+CHARS_PER_TOKEN = 4  # Kaba token tahmini için
+BATCH_TOKEN_BUDGET = 1500  # Toplu açıklama prompt'u için varsayılan bütçe
+BATCH_MAX_FUNCTION_TOKENS = 300  # Bundan büyük fonksiyonlar tek başına gönderilir
+
+
+def analyze_function_with_llama(
+    function_code, prompt=None, on_token=None, kind="explain"
+):
+    """LLM yanıtını döndürür.
+
+    on_token verilirse yanıt akış halinde alınır ve her parça geldikçe
+    on_token(parça) çağrılır. kind, telemetride çağrının türüdür.
+    """
     if prompt is None:
         prompt = f"Aşağıdaki Python fonksiyonunu açıkla:\n\n{function_code}"
 
-    payload = {
-        "model": "local-model",  # LM Studio sunucusu model ismine çok takılmaz
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-    }
+    if on_token is not None:
+        parts = []
+        for chunk in stream_function_with_llama(function_code, prompt, kind):
+            parts.append(chunk)
+            on_token(chunk)
+        return "".join(parts)
 
+    # Aynı prompt daha önce yanıtlandıysa modele tekrar gitme
+    pool = get_llm_pool()
+    cache = get_llm_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(prompt, pool.cache_model, LLM_TEMPERATURE)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_llm_call(kind, cached=True)
+            return cached
+
+    started = time.perf_counter()
+    retries = 0
     try:
-        response = requests.post(
-            "http://localhost:1234/v1/chat/completions",  # LM Studio API
-            headers={"Content-Type": "application/json"},
-            json=payload,
-        )
-        return response.json()["choices"][0]["message"]["content"]
+        with pool.request(prompt, LLM_TEMPERATURE) as (backend, response, retries):
+            content = backend.parse(response)
     except Exception as e:
+        record_llm_call(
+            kind,
+            latency=time.perf_counter() - started,
+            prompt_chars=len(prompt),
+            retries=getattr(e, "retries", retries),
+            error=True,
+        )
         return f"❌ LLM Hatası: {e}"
 
+    record_llm_call(
+        kind,
+        latency=time.perf_counter() - started,
+        prompt_chars=len(prompt),
+        response_chars=len(content),
+        retries=retries,
+    )
+    # Hata yanıtları önbelleğe alınmaz
+    if cache is not None:
+        cache.set(cache_key, content)
+    return content
+
+
+def stream_function_with_llama(function_code, prompt=None, kind="explain"):
+    """Yanıtı sunucunun akış modunda alır, token'ları geldikçe verir"""
+    if prompt is None:
+        prompt = f"Aşağıdaki Python fonksiyonunu açıkla:\n\n{function_code}"
+
+    pool = get_llm_pool()
+    cache = get_llm_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(prompt, pool.cache_model, LLM_TEMPERATURE)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_llm_call(kind, cached=True)
+            yield cached
+            return
+
+    parts = []
+    started = time.perf_counter()
+    retries = 0
+    try:
+        # Tekrar denemeler yalnızca ilk token'dan önce yapılır
+        with pool.request(prompt, LLM_TEMPERATURE, stream=True) as (
+            backend,
+            response,
+            retries,
+        ):
+            for chunk in backend.iter_chunks(response):
+                parts.append(chunk)
+                yield chunk
+    except Exception as e:
+        record_llm_call(
+            kind,
+            latency=time.perf_counter() - started,
+            prompt_chars=len(prompt),
+            response_chars=sum(len(part) for part in parts),
+            retries=getattr(e, "retries", retries),
+            error=True,
+            streamed=True,
+        )
+        yield f"❌ LLM Hatası: {e}"
+        return
+
+    content = "".join(parts)
+    record_llm_call(
+        kind,
+        latency=time.perf_counter() - started,
+        prompt_chars=len(prompt),
+        response_chars=len(content),
+        retries=retries,
+        streamed=True,
+    )
+    if cache is not None and parts:
+        cache.set(cache_key, content)
+
+
+class LLMScheduler:
+    """LLM işlerini öncelik sırasıyla, sınırlı sayıda paralel istekle çalıştırır.
+
+    submit() hemen bir Future döndürür; sonuçlar Streamlit döngüsünde
+    future.result() ile toplanabilir. İşler gönderildikleri bağlamda
+    (contextvars) çalışır; böylece etkin telemetri işçi thread'lerine taşınır.
+    deadline (time.monotonic() değeri) geçtiğinde henüz başlamamış iş
+    çalıştırılmaz, Future'ı iptal edilir.
+    """
+
+    def __init__(self, max_parallel=LLM_MAX_PARALLEL):
+        self.max_parallel = max(1, max_parallel)
+        self._jobs = queue.PriorityQueue()
+        self._order = itertools.count()  # Aynı öncelikte FIFO sırası
+        self._workers = []
+        self._retiring = 0  # Kuyruğa konmuş, henüz alınmamış durdurma işaretleri
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, priority=PRIORITY_EXPLAIN, deadline=None, **kwargs):
+        future = Future()
+        context = contextvars.copy_context()
+        self._jobs.put(
+            (priority, next(self._order), future, deadline, context, func, args, kwargs)
+        )
+        self._ensure_workers()
+        return future
+
+    def resize(self, max_parallel):
+        """Paralel iş sınırını kuyruktaki işleri kaybetmeden değiştirir.
+
+        Fazla işçiler en yüksek öncelikli bir durdurma işaretiyle, ellerindeki
+        işi bitirdikten sonra çıkar.
+        """
+        with self._lock:
+            self.max_parallel = max(1, max_parallel)
+            excess = len(self._workers) - self._retiring - self.max_parallel
+            for _ in range(excess):
+                self._retiring += 1
+                self._jobs.put((float("-inf"), next(self._order)) + (None,) * 6)
+            started = bool(self._workers)
+        if started:
+            self._ensure_workers()
+
+    def _ensure_workers(self):
+        with self._lock:
+            while len(self._workers) - self._retiring < self.max_parallel:
+                worker = threading.Thread(target=self._run, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _run(self):
+        while True:
+            _, _, future, deadline, context, func, args, kwargs = self._jobs.get()
+            if future is None:
+                with self._lock:
+                    self._retiring -= 1
+                    self._workers.remove(threading.current_thread())
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                future.cancel()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(func, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler(max_parallel=None):
+    """Paylaşılan zamanlayıcıyı döndürür; max_parallel verilirse sınırını günceller"""
+    global _scheduler
+    pool = get_llm_pool()
+    with _scheduler_lock:
+        if _scheduler is None:
+            # Varsayılan sınır tüm sunucuların toplam kapasitesidir
+            _scheduler = LLMScheduler(max_parallel or pool.capacity)
+        elif max_parallel and max_parallel != _scheduler.max_parallel:
+            # Bekleyen işler ve çalışan işçiler korunur
+            _scheduler.resize(max_parallel)
+        pool.resize(_scheduler.max_parallel)
+        return _scheduler
+
 
 def optimize_function_with_llama(function_code):
     prompt = (
         f"Aşağıdaki Python fonksiyonunu daha verimli ve optimize bir şekilde yeniden yaz. "
         f"Eğer birden fazla alternatif varsa birkaç farklı çözüm öner:\n\n{function_code}"
     )
-    return analyze_function_with_llama(function_code, prompt)
+    return analyze_function_with_llama(function_code, prompt, kind="optimize")
 
 
 def check_errors_in_function(function_code):
@@ -37,99 +237,152 @@ def check_errors_in_function(function_code):
         f"Aşağıdaki Python fonksiyonunda herhangi bir hata, kötü uygulama veya potansiyel sorun var mı? "
         f"Syntax hatası, edge case eksikliği, kötü pratik gibi her türlü sorunu belirt:\n\n{function_code}"
     )
-    return analyze_function_with_llama(function_code, prompt)
+    return analyze_function_with_llama(function_code, prompt, kind="error_check")
 
 
-def summarize_full_file(code):
+def summarize_full_file(code, on_token=None):
     prompt = (
         f"Aşağıdaki Python dosyasının genel yapısını açıkla. Dosyada hangi modüller var, hangi işlemleri yapıyor? "
         f"Önemli sınıflar, fonksiyonlar ve dosyanın amacı nedir? Güvenlik, verimlilik ya da okunabilirlik açısından genel bir değerlendirme yap:\n\n{code}"
     )
-    return analyze_function_with_llama(code, prompt)
+    return analyze_function_with_llama(code, prompt, on_token, kind="summary")
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def extract_json_object(text):
+    """Model yanıtındaki ilk JSON nesnesini çözer, bulunamazsa None döner"""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(text[start : end + 1])
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
 
 
-def score_project_with_llama(analysis_results):
-    total_functions = sum(len(file.get("functions", [])) for file in analysis_results)
-    total_files = len(analysis_results)
+def pack_functions(functions, token_budget=BATCH_TOKEN_BUDGET):
+    """Küçük fonksiyonları token bütçesini aşmayacak gruplara ayırır.
 
-    project_summary = f"""
-    Proje Özeti:
-    - Toplam {total_files} Python dosyası
-    - Toplam {total_functions} fonksiyon
-    
-    Dosya Özetleri:
+    Büyük fonksiyonlar ve aynı grupta tekrar eden isimler ayrı gruba düşer.
     """
+    batches = []
+    current, current_tokens, names = [], 0, set()
 
-    for file in analysis_results[:5]:  # İlk 5 dosyayı özetle
-        file_summary = file.get("file_summary", "Özet bulunamadı")
-        # Ensure file_summary is a string and handle None case
-        summary_text = (
-            str(file_summary) if file_summary is not None else "Özet bulunamadı"
-        )
-        truncated_summary = (
-            summary_text[:300] if len(summary_text) > 300 else summary_text
+    for func in functions:
+        tokens = estimate_tokens(func["code"])
+        if tokens > min(BATCH_MAX_FUNCTION_TOKENS, token_budget):
+            batches.append([func])
+            continue
+        if current and (
+            current_tokens + tokens > token_budget or func["name"] in names
+        ):
+            batches.append(current)
+            current, current_tokens, names = [], 0, set()
+        current.append(func)
+        current_tokens += tokens
+        names.add(func["name"])
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def explain_functions_batch(functions):
+    """Birden fazla fonksiyonu tek prompt'ta açıklatır; {isim: açıklama} döndürür.
+
+    Yanıt beklenen JSON biçiminde değilse her fonksiyon tek tek açıklatılır.
+    """
+    if len(functions) == 1:
+        func = functions[0]
+        return {func["name"]: analyze_function_with_llama(func["code"])}
+
+    code_blocks = "\n\n".join(
+        f"### {func['name']}\n{func['code']}" for func in functions
+    )
+    prompt = (
+        f"Aşağıdaki {len(functions)} Python fonksiyonunun her birini ayrı ayrı açıkla. "
+        f"Yanıtı YALNIZCA bir JSON nesnesi olarak ver: anahtarlar fonksiyon isimleri, "
+        f"değerler o fonksiyonun açıklaması (metin) olsun. Başka bir şey yazma.\n\n"
+        f"{code_blocks}"
+    )
+    response = analyze_function_with_llama("", prompt, kind="explain_batch")
+    parsed = extract_json_object(response)
+
+    if parsed is not None and all(
+        isinstance(parsed.get(func["name"]), str) and parsed[func["name"]].strip()
+        for func in functions
+    ):
+        return {func["name"]: parsed[func["name"]] for func in functions}
+
+    # Yapılandırılmış yanıt çözülemedi, tek tek çağrılara geri dön
+    return {
+        func["name"]: analyze_function_with_llama(func["code"]) for func in functions
+    }
+
+
+def analyze_function_combined(function_code, do_optimize=True, do_check_errors=True):
+    """Açıklama, optimizasyon ve hata analizini tek istekte JSON olarak ister.
+
+    func_results ile aynı anahtarları (explanation, optimization, error_check)
+    döndürür. Yanıt doğrulanamazsa ayrı çağrılara geri dönülür.
+    """
+    fields = {"explanation": "fonksiyonun ne yaptığının açıklaması (metin)"}
+    if do_optimize:
+        fields["optimization"] = (
+            "daha verimli ve optimize yeniden yazılmış kod, alternatifler varsa "
+            "birkaç çözüm (metin)"
         )
-        project_summary += (
-            f"- {file.get('source_file', 'Bilinmeyen dosya')}: {truncated_summary}...\n"
+    if do_check_errors:
+        fields["issues"] = (
+            "hatalar, kötü uygulamalar, eksik edge case'ler ve potansiyel "
+            "sorunların listesi (metin listesi)"
         )
-    # Geliştirilmiş prompt
-    prompt = f"""Aşağıdaki Python kod projesini analiz et ve 0-100 arasında SADECE SAYISAL BİR PUAN ver.
-
-    Değerlendirme Kriterleri:
-    1. Kod Okunabilirliği (25%): Değişken isimleri, yorumlar, docstring kullanımı
-    2. Yapılandırma ve Düzen (20%): Dosya organizasyonu, fonksiyon düzeni
-    3. Fonksiyonel Doğruluk (25%): Kodun çalışabilirliği, mantıksal akış
-    4. Hata Kontrolü ve Güvenlik (15%): Try-catch blokları, input validasyonu
-    5. Modül Kullanımı ve Verimlilik (15%): Uygun kütüphane seçimi, algoritma verimliliği
+    field_lines = "\n".join(f'- "{key}": {desc}' for key, desc in fields.items())
+    prompt = (
+        f"Aşağıdaki Python fonksiyonunu analiz et. Yanıtı YALNIZCA şu alanları "
+        f"içeren bir JSON nesnesi olarak ver, başka bir şey yazma:\n"
+        f"{field_lines}\n\n{function_code}"
+    )
 
-    ÖNEMLI: Sadece 0-100 arasında bir sayı döndür. Açıklama yazma.
-    
-    Örnek çıktı: 73
+    parsed = extract_json_object(
+        analyze_function_with_llama(function_code, prompt, kind="combined")
+    )
+    result = _validate_combined(parsed, fields) if parsed else None
+    if result is not None:
+        return result
 
-    {project_summary}"""
+    # Yapılandırılmış yanıt geçersiz, klasik ayrı çağrılara geri dön
+    return {
+        "explanation": analyze_function_with_llama(function_code),
+        "optimization": (
+            optimize_function_with_llama(function_code) if do_optimize else ""
+        ),
+        "error_check": (
+            check_errors_in_function(function_code) if do_check_errors else ""
+        ),
+    }
 
-    try:
-        response = analyze_function_with_llama("", prompt)
-        print(f"LLM Yanıtı: {response}")  # Debug için
-
-        # Çoklu regex pattern ile sayı çıkarma
-        patterns = [
-            r"\b(\d{1,3})\b",  # Mevcut pattern
-            r"(\d{1,3})/100",  # X/100 formatı
-            r"Puan[:\s]*(\d{1,3})",  # "Puan: X" formatı
-            r"Score[:\s]*(\d{1,3})",  # "Score: X" formatı
-            r"(\d{1,3})(?:\s*puan|\s*point)",  # "X puan" formatı
-        ]
-
-        for pattern in patterns:
-            score_match = re.search(pattern, response, re.IGNORECASE)
-            if score_match:
-                score = int(score_match.group(1))
-                # Geçerli aralıkta olup olmadığını kontrol et
-                if 0 <= score <= 100:
-                    print(f"Bulunan puan: {score}")
-                    return score
-
-        # Eğer hiç sayı bulunamazsa, daha basit bir prompt dene
-        simple_prompt = f"""Bu Python projesine 0-100 arasında puan ver. Sadece sayı yaz:
-        
-        Proje: {total_files} dosya, {total_functions} fonksiyon
-        
-        Puan:"""
-
-        simple_response = analyze_function_with_llama("", simple_prompt)
-        print(f"Basit prompt yanıtı: {simple_response}")
-
-        # Basit yanıttan sayı çıkar
-        numbers = re.findall(r"\b(\d{1,3})\b", simple_response)
-        if numbers:
-            score = int(numbers[0])
-            if 0 <= score <= 100:
-                return score
-
-        print("Hiç geçerli puan bulunamadı, varsayılan döndürülüyor")
-        return 65  # Varsayılan orta puan
 
-    except Exception as e:
-        print(f"Puanlama hatası: {e}")
-        return 65
+def _validate_combined(parsed, fields):
+    values = {}
+    for key in fields:
+        value = parsed.get(key)
+        if isinstance(value, list):
+            value = "\n".join(f"- {item}" for item in value if str(item).strip())
+        if not isinstance(value, str) or not value.strip():
+            # Sorun bulunmaması geçerli bir yanıttır
+            if key == "issues" and value in ([], ""):
+                value = "Belirgin bir sorun bulunamadı."
+            else:
+                return None
+        values[key] = value
+    return {
+        "explanation": values["explanation"],
+        "optimization": values.get("optimization", ""),
+        "error_check": values.get("issues", ""),
+    }
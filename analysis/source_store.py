@@ -0,0 +1,98 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+STORE_MAX_MEMORY_BYTES = 64 * 1024 * 1024  # Bu sınırdan sonra kaynaklar diske yazılır
+
+
+class SourceStore:
+    """Alım sırasında indirilen kaynak dosyaları yol bazında saklar.
+
+    Kaynaklar önce bellekte tutulur; toplam boyut sınırı aşılınca yeni
+    gelenler geçici bir dizine yazılır. Grafikler ve diğer tüketiciler
+    dosyaları yeniden indirmek yerine buradan okur. Geçici dizin close()
+    çağrıldığında ya da nesne çöp toplandığında silinir.
+    """
+
+    def __init__(self, max_memory_bytes=STORE_MAX_MEMORY_BYTES, spill_dir=None):
+        self.max_memory_bytes = max_memory_bytes
+        self._spill_dir = spill_dir
+        self._memory = {}
+        self._spilled = {}
+        self._memory_bytes = 0
+        self._finalizer = None
+        self._lock = threading.Lock()
+
+    def put(self, path, code):
+        size = len(code.encode("utf-8"))
+        with self._lock:
+            self._discard(path)
+            if self._memory_bytes + size <= self.max_memory_bytes:
+                self._memory[path] = code
+                self._memory_bytes += size
+                return
+
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="gittextlab-sources-")
+                self._finalizer = weakref.finalize(
+                    self, shutil.rmtree, self._spill_dir, ignore_errors=True
+                )
+            os.makedirs(self._spill_dir, exist_ok=True)
+            blob_name = hashlib.sha1(path.encode("utf-8")).hexdigest()
+            blob_path = os.path.join(self._spill_dir, blob_name)
+            with open(blob_path, "w", encoding="utf-8") as f:
+                f.write(code)
+            self._spilled[path] = blob_path
+
+    def get(self, path, default=None):
+        with self._lock:
+            if path in self._memory:
+                return self._memory[path]
+            blob_path = self._spilled.get(path)
+        if blob_path is None:
+            return default
+        try:
+            with open(blob_path, encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return default
+
+    def paths(self):
+        with self._lock:
+            return list(self._memory) + list(self._spilled)
+
+    def __contains__(self, path):
+        with self._lock:
+            return path in self._memory or path in self._spilled
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory) + len(self._spilled)
+
+    def _discard(self, path):
+        code = self._memory.pop(path, None)
+        if code is not None:
+            self._memory_bytes -= len(code.encode("utf-8"))
+        blob_path = self._spilled.pop(path, None)
+        if blob_path is not None:
+            try:
+                os.remove(blob_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._spilled.clear()
+            self._memory_bytes = 0
+            if self._finalizer is not None:
+                self._finalizer()
+                self._finalizer = None
+                self._spill_dir = None
+
+    def close(self):
+        """Tüm kaynakları ve oluşturulan geçici dizini siler"""
+        self.clear()
@@ -0,0 +1,288 @@
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Prometheus histogramı için LLM gecikme sınırları (saniye)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TELEMETRY_MAX_CALLS = 10000  # JSON'a tek tek yazılacak en fazla LLM çağrısı
+
+# LLM çağrı türlerinin hangi aşamanın süresine ekleneceği
+LLM_STAGE_BY_KIND = {
+    "summary": "summarize",
+    "summary_chunk": "summarize",
+    "summary_reduce": "summarize",
+    "explain": "function_analysis",
+    "explain_batch": "function_analysis",
+    "optimize": "function_analysis",
+    "error_check": "function_analysis",
+    "combined": "function_analysis",
+    "score": "score",
+}
+
+_current = contextvars.ContextVar("gittextlab_telemetry", default=None)
+
+
+class Telemetry:
+    """Bir analiz çalıştırmasının aşama sürelerini ve LLM çağrılarını toplar.
+
+    Aşama süreleri iç içe ölçümlerde dışlayıcıdır: "parse" içinde geçen
+    "fetch" süresi parse'a yazılmaz. summarize ve function_analysis
+    aşamaları paralel LLM isteklerinin toplam süresidir (duvar saati değil).
+    activate() içinde yapılan ve LLM zamanlayıcısına gönderilen işler
+    kayıtlarını bu nesneye yazar.
+    """
+
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stages = {}
+        self.llm = {}
+        self.calls = []
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def stage(self, name):
+        stack = self._stack()
+        stack.append(0.0)  # İç aşamaların toplam süresi
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.add_stage_time(name, elapsed - nested)
+
+    def timed_iter(self, name, iterable):
+        """Yineleyiciden her elemanı beklerken geçen süreyi name aşamasına yazar"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def add_stage_time(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(
+                name, {"seconds": 0.0, "count": 0, "max_seconds": 0.0}
+            )
+            stage["seconds"] += seconds
+            stage["count"] += 1
+            stage["max_seconds"] = max(stage["max_seconds"], seconds)
+
+    def record_llm_call(
+        self,
+        kind,
+        latency=0.0,
+        prompt_chars=0,
+        response_chars=0,
+        retries=0,
+        error=False,
+        cached=False,
+        streamed=False,
+    ):
+        with self._lock:
+            stats = self.llm.setdefault(
+                kind,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "cache_hits": 0,
+                    "latency_seconds": 0.0,
+                    "max_latency_seconds": 0.0,
+                    "prompt_chars": 0,
+                    "response_chars": 0,
+                    "latency_buckets": [0] * len(LLM_LATENCY_BUCKETS),
+                },
+            )
+            if cached:
+                # Önbellekten dönen yanıt modele gitmez, gecikmesi sayılmaz
+                stats["cache_hits"] += 1
+                return
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["retries"] += retries
+            stats["latency_seconds"] += latency
+            stats["max_latency_seconds"] = max(stats["max_latency_seconds"], latency)
+            stats["prompt_chars"] += prompt_chars
+            stats["response_chars"] += response_chars
+            for index, bound in enumerate(LLM_LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats["latency_buckets"][index] += 1
+            if len(self.calls) < TELEMETRY_MAX_CALLS:
+                self.calls.append(
+                    {
+                        "kind": kind,
+                        "latency": round(latency, 4),
+                        "prompt_chars": prompt_chars,
+                        "response_chars": response_chars,
+                        "retries": retries,
+                        "error": error,
+                        "streamed": streamed,
+                    }
+                )
+        stage = LLM_STAGE_BY_KIND.get(kind)
+        if stage:
+            self.add_stage_time(stage, latency)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "labels": dict(self.labels),
+                "started_at": time.strftime(
+                    "%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)
+                ),
+                "elapsed_seconds": round(time.perf_counter() - self._started, 3),
+                "stages": {
+                    name: {
+                        "seconds": round(stage["seconds"], 3),
+                        "count": stage["count"],
+                        "max_seconds": round(stage["max_seconds"], 3),
+                    }
+                    for name, stage in self.stages.items()
+                },
+                "llm": {
+                    kind: {
+                        **{k: v for k, v in stats.items() if k != "latency_buckets"},
+                        "latency_seconds": round(stats["latency_seconds"], 3),
+                        "max_latency_seconds": round(stats["max_latency_seconds"], 3),
+                    }
+                    for kind, stats in self.llm.items()
+                },
+                "llm_calls": list(self.calls),
+            }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=4, ensure_ascii=False)
+
+    def to_prometheus(self):
+        """Prometheus metin biçimi (node_exporter textfile toplayıcısı için)"""
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            llm = {
+                kind: {**stats, "latency_buckets": list(stats["latency_buckets"])}
+                for kind, stats in self.llm.items()
+            }
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{self._labels(labels)} {value}")
+
+        metric(
+            "gittextlab_run_seconds",
+            "gauge",
+            "Analiz çalıştırmasının toplam süresi",
+            [({}, round(time.perf_counter() - self._started, 3))],
+        )
+        metric(
+            "gittextlab_stage_seconds_total",
+            "counter",
+            "Aşamada geçen toplam süre",
+            [({"stage": n}, round(s["seconds"], 6)) for n, s in stages.items()],
+        )
+        metric(
+            "gittextlab_stage_runs_total",
+            "counter",
+            "Aşamanın ölçülme sayısı",
+            [({"stage": n}, s["count"]) for n, s in stages.items()],
+        )
+        for field, name, help_text in (
+            ("calls", "gittextlab_llm_calls_total", "Modele giden LLM çağrıları"),
+            ("errors", "gittextlab_llm_errors_total", "Hatayla biten LLM çağrıları"),
+            ("retries", "gittextlab_llm_retries_total", "LLM çağrı tekrarları"),
+            ("cache_hits", "gittextlab_llm_cache_hits_total", "Önbellekten yanıtlar"),
+            ("prompt_chars", "gittextlab_llm_prompt_chars_total", "Prompt boyutu"),
+            ("response_chars", "gittextlab_llm_response_chars_total", "Yanıt boyutu"),
+        ):
+            metric(
+                name,
+                "counter",
+                help_text,
+                [({"kind": kind}, stats[field]) for kind, stats in llm.items()],
+            )
+
+        name = "gittextlab_llm_latency_seconds"
+        lines.append(f"# HELP {name} LLM çağrı gecikmesi")
+        lines.append(f"# TYPE {name} histogram")
+        for kind, stats in llm.items():
+            for bound, count in zip(LLM_LATENCY_BUCKETS, stats["latency_buckets"]):
+                labels = self._labels({"kind": kind, "le": str(bound)})
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = self._labels({"kind": kind, "le": "+Inf"})
+            lines.append(f"{name}_bucket{labels} {stats['calls']}")
+            labels = self._labels({"kind": kind})
+            lines.append(f"{name}_sum{labels} {round(stats['latency_seconds'], 6)}")
+            lines.append(f"{name}_count{labels} {stats['calls']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+    def _labels(self, extra):
+        labels = {**self.labels, **extra}
+        if not labels:
+            return ""
+        pairs = (f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+        return "{" + ",".join(pairs) + "}"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def current_telemetry():
+    return _current.get()
+
+
+def stage(name):
+    """Etkin telemetri varsa aşama süresini ölçer, yoksa hiçbir şey yapmaz"""
+    telemetry = _current.get()
+    return telemetry.stage(name) if telemetry else nullcontext()
+
+
+def timed_iter(name, iterable):
+    telemetry = _current.get()
+    return telemetry.timed_iter(name, iterable) if telemetry else iterable
+
+
+def record_llm_call(kind, **kwargs):
+    telemetry = _current.get()
+    if telemetry:
+        telemetry.record_llm_call(kind, **kwargs)
+
+
+def export_telemetry(telemetry, analysis_path):
+    """Telemetriyi analiz dosyasının yanına JSON ve Prometheus olarak yazar"""
+    base = analysis_path.removesuffix(".json").removesuffix("_analysis")
+    json_path = f"{base}_telemetry.json"
+    prom_path = f"{base}_telemetry.prom"
+    telemetry.write_json(json_path)
+    telemetry.write_prometheus(prom_path)
+    return json_path, prom_path
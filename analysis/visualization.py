@@ -1,38 +1,73 @@
+import io
 from collections import Counter
-import numpy as np
-import streamlit as st
-from matplotlib import pyplot as plt
-import requests
+from functools import lru_cache
 
-from analysis.function_analysis import extract_modules_from_code
+import matplotlib
 
+matplotlib.use("Agg")  # Sunucuda ekran yok, etkileşimli arka uç gereksiz
 
-def create_function_chart(analysis_results):
-    """En çok kullanılan fonksiyon isimlerinin pasta grafiği"""
-    function_names = []
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from analysis.function_analysis import extract_modules_from_code
+from analysis.github_client import GITHUB_RAW_URL, create_github_client
+
+CHART_FORMAT = "png"  # "svg" de desteklenir
+CHART_DPI = 100
+CHART_CACHE_SIZE = 64  # Bellekte tutulacak en fazla çizilmiş grafik
+COMPLEXITY_RANKS = ["A", "B", "C", "D", "E", "F"]
+
+
+def aggregate_chart_data(
+    analysis_results, source_store=None, with_modules=True, repo=None
+):
+    """Grafiklerin ihtiyaç duyduğu sayımları sonuçlar üzerinde tek geçişte toplar.
+
+    with_modules=False ise modül listesi olmayan eski sonuçlar için dosya
+    indirilmez. repo ("kullanıcı/repo") yalnızca bu indirme için gereklidir.
+    """
+    functions = Counter()
+    modules = Counter()
+    ranks = Counter()
+    client = None
     for file in analysis_results:
         for func in file.get("functions", []):
-            function_names.append(func["name"])
-
-    if not function_names:
-        return None
-
-    # En çok kullanılan fonksiyon isimlerini say
-    func_counter = Counter(function_names)
-    top_functions = func_counter.most_common(8)
-
-    if len(top_functions) == 0:
-        return None
-
-    fig, ax = plt.subplots(figsize=(10, 8))
-    labels = [f"{name} ({count})" for name, count in top_functions]
-    sizes = [count for name, count in top_functions]
-    colors = plt.cm.Set3(np.linspace(0, 1, len(labels)))
-
-    wedges, texts, autotexts = ax.pie(
+            functions[func["name"]] += 1
+            if func.get("complexity_rank"):
+                ranks[func["complexity_rank"]] += 1
+        if with_modules:
+            if file.get("modules") is None and repo and client is None:
+                client = create_github_client()
+            modules.update(get_file_modules(file, source_store, repo, client))
+    return {"functions": functions, "modules": modules, "ranks": ranks}
+
+
+def render_figure(fig, fmt=CHART_FORMAT):
+    """Figürü bayt olarak çizer ve içeriğini bırakır.
+
+    Figürler pyplot üzerinden oluşturulmadığı için küresel figür listesine
+    girmez; referans kalmadığında bellekten tamamen silinir.
+    """
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=CHART_DPI)
+    fig.clear()
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_pie(items, title, colormap, fmt):
+    fig = Figure(figsize=(10, 8), layout="tight")
+    ax = fig.subplots()
+    labels = [f"{name} ({count})" for name, count in items]
+    sizes = [count for name, count in items]
+    colors = matplotlib.colormaps[colormap](np.linspace(0, 1, len(labels)))
+
+    _, texts, autotexts = ax.pie(
         sizes, labels=labels, autopct="%1.1f%%", startangle=90, colors=colors
     )
-    ax.set_title("En Çok Kullanılan Fonksiyon İsimleri", fontsize=16, fontweight="bold")
+    ax.set_title(title, fontsize=16, fontweight="bold")
 
     # Yazı boyutlarını ayarla
     for text in texts:
@@ -41,55 +76,86 @@ def create_function_chart(analysis_results):
         autotext.set_color("white")
         autotext.set_fontweight("bold")
 
-    plt.tight_layout()
-    return fig
+    return render_figure(fig, fmt)
 
 
-def create_module_chart(analysis_results):
-    """En çok kullanılan modüllerin pasta grafiği"""
-    all_modules = []
-    for file in analysis_results:
-        # Her dosyanın kodundan modülleri çıkar
-        code_response = requests.get(
-            f"https://raw.githubusercontent.com/{st.session_state.get('username', '')}/{st.session_state.get('repo_name', '')}/master/{file['source_file']}"
-        )
-        if code_response.status_code == 200:
-            modules = extract_modules_from_code(code_response.text)
-            all_modules.extend(modules)
-
-    if not all_modules:
+def create_function_chart(chart_data, fmt=CHART_FORMAT):
+    """En çok kullanılan fonksiyon isimlerinin pasta grafiği"""
+    top_functions = tuple(chart_data["functions"].most_common(8))
+    if not top_functions:
         return None
+    return _render_pie(
+        top_functions, "En Çok Kullanılan Fonksiyon İsimleri", "Set3", fmt
+    )
 
-    module_counter = Counter(all_modules)
-    top_modules = module_counter.most_common(10)
 
-    if len(top_modules) == 0:
+def create_module_chart(chart_data, fmt=CHART_FORMAT):
+    """En çok kullanılan modüllerin pasta grafiği"""
+    top_modules = tuple(chart_data["modules"].most_common(10))
+    if not top_modules:
         return None
+    return _render_pie(
+        top_modules, "En Çok Kullanılan Python Modülleri", "Pastel1", fmt
+    )
 
-    fig, ax = plt.subplots(figsize=(10, 8))
-    labels = [f"{module} ({count})" for module, count in top_modules]
-    sizes = [count for module, count in top_modules]
-    colors = plt.cm.Pastel1(np.linspace(0, 1, len(labels)))
 
-    wedges, texts, autotexts = ax.pie(
-        sizes, labels=labels, autopct="%1.1f%%", startangle=90, colors=colors
+def get_file_modules(file, source_store=None, repo=None, client=None):
+    """Dosyanın modüllerini önce analiz sonucundan, sonra kaynak deposundan alır.
+
+    Yalnızca eski (modül listesi içermeyen) sonuçlar için dosya GitHub'dan
+    indirilir; repo bilinmiyorsa boş liste döner.
+    """
+    if file.get("modules") is not None:
+        return file["modules"]
+
+    path = file.get("path", file["source_file"])
+    if source_store is not None and path in source_store:
+        return extract_modules_from_code(source_store.get(path))
+    if not repo:
+        return []
+
+    try:
+        code_response = (client or create_github_client()).get(
+            f"{GITHUB_RAW_URL}/{repo}/HEAD/{path}"
+        )
+    except Exception:
+        return []
+    if code_response.status_code == 200:
+        return extract_modules_from_code(code_response.text)
+    return []
+
+
+def create_complexity_chart(chart_data, fmt=CHART_FORMAT):
+    """Fonksiyonların cyclomatic complexity derecelerinin (A-F) dağılımı"""
+    ranks = chart_data["ranks"]
+    if not ranks:
+        return None
+    return _render_complexity(
+        tuple(ranks.get(label, 0) for label in COMPLEXITY_RANKS), fmt
     )
-    ax.set_title("En Çok Kullanılan Python Modülleri", fontsize=16, fontweight="bold")
 
-    # Yazı boyutlarını ayarla
-    for text in texts:
-        text.set_fontsize(10)
-    for autotext in autotexts:
-        autotext.set_color("white")
-        autotext.set_fontweight("bold")
 
-    plt.tight_layout()
-    return fig
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_complexity(counts, fmt):
+    colors = ["#4CAF50", "#8BC34A", "#FFC107", "#FF9800", "#FF5722", "#F44336"]
+
+    fig = Figure(figsize=(10, 4), layout="tight")
+    ax = fig.subplots()
+    bars = ax.bar(COMPLEXITY_RANKS, counts, color=colors, alpha=0.85)
+    ax.bar_label(bars, fontweight="bold")
+    ax.set_xlabel("Karmaşıklık Derecesi (A: basit, F: çok karmaşık)", fontsize=12)
+    ax.set_ylabel("Fonksiyon Sayısı", fontsize=12)
+    ax.set_title("Cyclomatic Complexity Dağılımı", fontsize=16, fontweight="bold")
+    ax.grid(True, axis="y", alpha=0.3)
+
+    return render_figure(fig, fmt)
 
 
-def create_score_bar(score):
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def create_score_bar(score, fmt=CHART_FORMAT):
     """Proje puanını bar grafiği olarak göster"""
-    fig, ax = plt.subplots(figsize=(12, 2))
+    fig = Figure(figsize=(12, 2), layout="tight")
+    ax = fig.subplots()
 
     # Bar arka planı
     ax.barh(0, 100, height=0.6, color="lightgray", alpha=0.3)
@@ -128,5 +194,4 @@ def create_score_bar(score):
     # Grid
     ax.grid(True, axis="x", alpha=0.3)
 
-    plt.tight_layout()
-    return fig
+    return render_figure(fig, fmt)
@@ -0,0 +1,188 @@
+"""Diskteki bir fixture dizinini GitHub gibi sunan yerel sunucu.
+
+Desteklenen uçlar (her kullanıcı/repo adı aynı fixture'a karşılık gelir):
+    GET /api/repos/<u>/<r>                     varsayılan dal bilgisi
+    GET /api/repos/<u>/<r>/contents[/<yol>]    Contents API dizin listesi
+    GET /api/repos/<u>/<r>/tarball/<dal>       repo arşivi (tar.gz)
+    GET /raw/<u>/<r>/<dal>/<yol>               ham dosya içeriği
+
+GITTEXTLAB_GITHUB_API_URL=<base_url>/api ve
+GITTEXTLAB_GITHUB_RAW_URL=<base_url>/raw ile kullanılır.
+
+Yanıtlar ETag taşır; If-None-Match eşleşirse 304 döner. rate_limit
+verilirse GitHub gibi X-RateLimit-* başlıkları gönderilir ve limit
+dolduğunda 403 döner (304 yanıtları limitten düşülmez).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+DEFAULT_BRANCH = "main"
+
+
+class FakeGitHubServer:
+    def __init__(
+        self, fixture_dir, host="127.0.0.1", port=0, rate_limit=None, reset_after=60
+    ):
+        self.fixture_dir = os.path.abspath(fixture_dir)
+        self.rate_limit = rate_limit
+        self.reset_after = reset_after
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self._used = 0
+        self._reset_at = time.time() + reset_after
+        self._lock = threading.Lock()
+        self._tarball = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/api"
+
+    @property
+    def raw_url(self):
+        return f"{self.base_url}/raw"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.rate_limited = 0
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+
+    def _take_quota(self):
+        """Limit dolmadıysa bir istek düşer; (izin, kalan, sıfırlanma) döndürür"""
+        with self._lock:
+            if self.rate_limit is None:
+                return True, None, None
+            if time.time() >= self._reset_at:
+                self._used = 0
+                self._reset_at = time.time() + self.reset_after
+            if self._used >= self.rate_limit:
+                self.rate_limited += 1
+                return False, 0, self._reset_at
+            self._used += 1
+            return True, self.rate_limit - self._used, self._reset_at
+
+    def tarball(self):
+        """Fixture'ın arşivi bir kez oluşturulup sonraki isteklerde yeniden kullanılır"""
+        with self._lock:
+            if self._tarball is None:
+                buffer = io.BytesIO()
+                with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+                    archive.add(self.fixture_dir, arcname="fixture-repo-0000000")
+                self._tarball = buffer.getvalue()
+            return self._tarball
+
+    def contents(self, owner, repo, rel_path):
+        directory = os.path.join(self.fixture_dir, rel_path)
+        if not os.path.isdir(directory):
+            return None
+        items = []
+        for name in sorted(os.listdir(directory)):
+            item_path = f"{rel_path}/{name}" if rel_path else name
+            is_dir = os.path.isdir(os.path.join(directory, name))
+            items.append(
+                {
+                    "name": name,
+                    "path": item_path,
+                    "type": "dir" if is_dir else "file",
+                    "url": f"{self.api_url}/repos/{owner}/{repo}/contents/{item_path}",
+                    "download_url": (
+                        None
+                        if is_dir
+                        else f"{self.raw_url}/{owner}/{repo}/{DEFAULT_BRANCH}/{item_path}"
+                    ),
+                }
+            )
+        return items
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive bağlantılar
+
+            def do_GET(self):
+                server._count()
+                parts = [unquote(p) for p in self.path.split("?")[0].split("/") if p]
+
+                if parts[:2] == ["api", "repos"] and len(parts) >= 4:
+                    owner, repo, rest = parts[2], parts[3], parts[4:]
+                    if not rest:
+                        return self._send_json({"default_branch": DEFAULT_BRANCH})
+                    if rest[0] == "contents":
+                        items = server.contents(owner, repo, "/".join(rest[1:]))
+                        if items is not None:
+                            return self._send_json(items)
+                    if rest[0] == "tarball":
+                        return self._send(200, server.tarball(), "application/gzip")
+                elif parts[:1] == ["raw"] and len(parts) >= 5:
+                    file_path = os.path.join(server.fixture_dir, *parts[4:])
+                    if os.path.isfile(file_path):
+                        with open(file_path, "rb") as f:
+                            return self._send(200, f.read(), "text/plain")
+
+                self._send_json({"message": "Not Found"}, 404)
+
+            def _send_json(self, data, status=200):
+                self._send(status, json.dumps(data).encode(), "application/json")
+
+            def _send(self, status, body, content_type):
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                allowed, remaining, reset_at = server._take_quota()
+                if not allowed:
+                    status, content_type = 403, "application/json"
+                    body = b'{"message": "API rate limit exceeded"}'
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                if remaining is not None:
+                    self.send_header("X-RateLimit-Limit", str(server.rate_limit))
+                    self.send_header("X-RateLimit-Remaining", str(remaining))
+                    self.send_header("X-RateLimit-Reset", str(int(reset_at)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,202 @@
+"""OpenAI uyumlu /v1/chat/completions ucunu taklit eden yerel sunucu.
+
+Yanıt süresi sabit gecikme (latency), isteğe bağlı prompt işleme hızı
+(prefill_rate) ve üretim hızından (token_rate) hesaplanır; süre uyuyarak
+geçirildiği için CPU kullanmaz. JSON isteyen prompt'lara (birleşik analiz,
+toplu açıklama, puan düzeltmesi) ayrıştırılabilir JSON döner.
+"stream": true istekleri SSE olarak parça parça gönderilir. Ollama'nın
+/api/generate ve /api/chat uçları da (akışta NDJSON) taklit edilir;
+sağlık kontrolü için GET /v1/models ve /api/tags yanıtlanır.
+
+GITTEXTLAB_LLM_URL=<base_url>/v1/chat/completions ile kullanılır.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+STREAM_TOKENS_PER_CHUNK = 8
+
+FIELD_PATTERN = re.compile(r'^- "(\w+)":', re.MULTILINE)
+FUNCTION_PATTERN = re.compile(r"^### (\w+)$", re.MULTILINE)
+
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        latency=0.05,
+        token_rate=200.0,
+        prefill_rate=0.0,
+        response_tokens=60,
+        concurrency=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.prefill_rate = prefill_rate
+        self.response_tokens = response_tokens
+        # Gerçek bir çıkarım sunucusu gibi aynı anda en fazla bu kadar istek işlenir
+        self._slots = threading.Semaphore(concurrency) if concurrency else None
+        self._lock = threading.Lock()
+        self.reset_counters()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    @property
+    def ollama_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def counters(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+    def reply_for(self, prompt):
+        """Prompt türüne göre uygulamanın ayrıştırabileceği bir yanıt üretir"""
+        filler = " ".join(["lorem"] * max(1, self.response_tokens))
+        if '"adjustment"' in prompt:
+            return json.dumps({"adjustment": 3, "reason": filler}, ensure_ascii=False)
+        fields = FIELD_PATTERN.findall(prompt)
+        if fields and "JSON" in prompt:
+            return json.dumps({field: filler for field in fields}, ensure_ascii=False)
+        names = FUNCTION_PATTERN.findall(prompt)
+        if names and "JSON" in prompt:
+            return json.dumps({name: filler for name in names}, ensure_ascii=False)
+        return filler
+
+    def _record(self, prompt, reply):
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN + 1
+        completion_tokens = len(reply) // CHARS_PER_TOKEN + 1
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return prompt_tokens, completion_tokens
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/v1/models":
+                    return self._send_json({"data": [{"id": "fake-model"}]})
+                if path == "/api/tags":
+                    return self._send_json({"models": [{"name": "fake-model"}]})
+                self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body.get("prompt") or "".join(
+                    m.get("content", "") for m in body.get("messages", [])
+                )
+                ollama = self.path.startswith("/api/")
+                if server._slots is None:
+                    return self._respond(body, prompt, ollama)
+                with server._slots:
+                    self._respond(body, prompt, ollama)
+
+            def _respond(self, body, prompt, ollama):
+                reply = server.reply_for(prompt)
+                prompt_tokens, completion_tokens = server._record(prompt, reply)
+
+                # Prompt'un işlenmesi (ilk token'a kadar geçen süre)
+                delay = server.latency
+                if server.prefill_rate > 0:
+                    delay += prompt_tokens / server.prefill_rate
+                time.sleep(delay)
+
+                # Ollama akışı varsayılan olarak açıktır
+                if body.get("stream", ollama):
+                    self._stream(reply, self._ollama_chunk if ollama else None)
+                else:
+                    if server.token_rate > 0:
+                        time.sleep(completion_tokens / server.token_rate)
+                    if ollama:
+                        self._send_json(self._ollama_chunk(reply, done=True))
+                    else:
+                        self._send_json(
+                            {
+                                "choices": [
+                                    {"message": {"role": "assistant", "content": reply}}
+                                ]
+                            }
+                        )
+
+            def _ollama_chunk(self, text, done=False):
+                if self.path.startswith("/api/chat"):
+                    data = {"message": {"role": "assistant", "content": text}}
+                else:
+                    data = {"response": text}
+                return {**data, "done": done}
+
+            def _send_json(self, data, status=200):
+                data = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, reply, ollama_chunk=None):
+                self.send_response(200)
+                if ollama_chunk:
+                    self.send_header("Content-Type", "application/x-ndjson")
+                else:
+                    self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                step = STREAM_TOKENS_PER_CHUNK * CHARS_PER_TOKEN
+                for start in range(0, len(reply), step):
+                    if server.token_rate > 0:
+                        time.sleep(STREAM_TOKENS_PER_CHUNK / server.token_rate)
+                    text = reply[start : start + step]
+                    if ollama_chunk:
+                        self._write_chunk(json.dumps(ollama_chunk(text)) + "\n")
+                    else:
+                        delta = {"choices": [{"delta": {"content": text}}]}
+                        self._write_chunk(f"data: {json.dumps(delta)}\n\n")
+                if ollama_chunk:
+                    self._write_chunk(json.dumps(ollama_chunk("", done=True)) + "\n")
+                else:
+                    self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,266 @@
+"""Uçtan uca benchmark: sahte GitHub ve LLM sunucularıyla analiz hızını ölçer.
+
+Örnek:
+    python -m benchmarks.run --sizes small medium --latency 0.05 --token-rate 200
+
+Her boyut için sentetik bir repo üretilir, sunucular bu süreçte çalışır ve
+analyze_github_repository ayrı bir süreçte ölçülür; böylece tepe bellek
+(peak RSS) yalnızca analizi yansıtır. Sonuçta dosya/sn, fonksiyon/sn,
+fonksiyon başına LLM çağrısı ve tepe bellek raporlanır.
+
+--llm-servers ile birden fazla sahte LLM sunucusu başlatılır ve istekler
+aralarında dağıtılır; --server-concurrency her sunucunun aynı anda
+işleyebildiği istek sayısını sınırlayarak ölçeklenmeyi görünür kılar.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_repo import REPO_SIZES, generate_repo
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb(who):
+    import resource
+
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(args):
+    """Ölçülen süreç: tek bir analiz çalıştırır, sonucu JSON satırı olarak yazar"""
+    import resource
+
+    from analysis.github_analysis import AnalysisOptions, analyze_github_repository
+    from analysis.progress import NullProgress
+    from analysis.telemetry import Telemetry
+
+    telemetry = Telemetry()
+    stats = {}
+    started = time.perf_counter()
+    with telemetry.activate():
+        results = analyze_github_repository(
+            "bench",
+            args.child,
+            AnalysisOptions(
+                ingestion=args.ingestion,
+                do_optimize=args.optimize,
+                do_check_errors=args.check_errors,
+                combined=args.combined,
+                batch_token_budget=args.batch,
+                llm_parallel=args.llm_parallel,
+                on_partial=(lambda *_: None) if args.stream else None,
+            ),
+            stats=stats,
+            progress=NullProgress(),
+        )
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "elapsed": elapsed,
+                "files": len(results),
+                "functions": sum(len(f["functions"]) for f in results),
+                "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+                # Ayrıştırma işçileri torun süreçtir (forkserver); RUSAGE_CHILDREN
+                # onları içermez, değeri işçilerin kendileri bildirir
+                "peak_rss_children_mb": stats.get("parse_worker_peak_rss_mb", "-"),
+                "stages": telemetry.snapshot()["stages"],
+            }
+        )
+    )
+
+
+def llm_counters(llms):
+    totals = {}
+    for llm in llms:
+        for key, value in llm.counters().items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run_size(size, args, llms):
+    with tempfile.TemporaryDirectory(prefix=f"gittextlab-bench-{size}-") as fixture:
+        generate_repo(fixture, size, args.seed)
+        github = FakeGitHubServer(fixture).start()
+        for llm in llms:
+            llm.reset_counters()
+        urls = [llm.ollama_url if args.llm_api == "ollama" else llm.url for llm in llms]
+        env = {
+            **os.environ,
+            "GITTEXTLAB_GITHUB_API_URL": github.api_url,
+            "GITTEXTLAB_GITHUB_RAW_URL": github.raw_url,
+            "GITTEXTLAB_LLM_BACKENDS": ",".join(urls),
+            # Sahte sunucunun yanıtları kullanıcının GitHub önbelleğine yazılmaz
+            "GITTEXTLAB_GITHUB_CACHE_DISABLED": "1",
+            # Önbellek ikinci çalıştırmayı anlamsız kılar
+            "GITTEXTLAB_LLM_CACHE_DISABLED": "1",
+        }
+        child_args = [
+            sys.executable,
+            "-m",
+            "benchmarks.run",
+            "--child",
+            size,
+            "--ingestion",
+            args.ingestion,
+            "--batch",
+            str(args.batch),
+        ]
+        if args.llm_parallel:
+            child_args += ["--llm-parallel", str(args.llm_parallel)]
+        for flag in ("optimize", "check_errors", "stream"):
+            if getattr(args, flag):
+                child_args.append(f"--{flag.replace('_', '-')}")
+        if not args.combined:
+            child_args.append("--no-combined")
+        try:
+            completed = subprocess.run(
+                child_args,
+                cwd=REPO_ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"{size} benchmark'ı başarısız:\n{e.stderr}") from e
+        finally:
+            github.stop()
+
+    measured = json.loads(completed.stdout.strip().splitlines()[-1])
+    counters = llm_counters(llms)
+    elapsed = measured["elapsed"]
+    functions = measured["functions"]
+    return {
+        "size": size,
+        "files": measured["files"],
+        "functions": functions,
+        "elapsed_s": round(elapsed, 2),
+        "files_per_s": round(measured["files"] / elapsed, 2) if elapsed else 0,
+        "functions_per_s": round(functions / elapsed, 2) if elapsed else 0,
+        "llm_calls": counters["calls"],
+        "llm_calls_per_function": (
+            round(counters["calls"] / functions, 2) if functions else 0
+        ),
+        "prompt_tokens": counters["prompt_tokens"],
+        "completion_tokens": counters["completion_tokens"],
+        "github_requests": github.requests,
+        "peak_rss_mb": measured["peak_rss_mb"],
+        "peak_rss_children_mb": measured["peak_rss_children_mb"],
+        "stages": measured["stages"],
+    }
+
+
+def print_table(rows):
+    columns = [
+        ("size", "boyut"),
+        ("files", "dosya"),
+        ("functions", "fonksiyon"),
+        ("elapsed_s", "süre(s)"),
+        ("files_per_s", "dosya/s"),
+        ("functions_per_s", "fonk/s"),
+        ("llm_calls_per_function", "LLM/fonk"),
+        ("github_requests", "GitHub istek"),
+        ("peak_rss_mb", "RSS(MB)"),
+        ("peak_rss_children_mb", "alt süreç RSS(MB)"),
+    ]
+    widths = [
+        max(len(title), *(len(str(row[key])) for row in rows)) for key, title in columns
+    ]
+    print("  ".join(title.rjust(w) for (_, title), w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[key]).rjust(w) for (key, _), w in zip(columns, widths)))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="GitTextLab uçtan uca benchmark")
+    parser.add_argument(
+        "--sizes", nargs="+", choices=list(REPO_SIZES), default=["small", "medium"]
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="İlk token gecikmesi (s)"
+    )
+    parser.add_argument(
+        "--token-rate", type=float, default=200.0, help="Üretim hızı (token/s)"
+    )
+    parser.add_argument(
+        "--prefill-rate",
+        type=float,
+        default=0.0,
+        help="Prompt işleme hızı (token/s, 0: yok)",
+    )
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument(
+        "--llm-parallel",
+        type=int,
+        default=0,
+        help="Toplam eşzamanlı LLM isteği (0: sunucu başına varsayılan)",
+    )
+    parser.add_argument("--llm-servers", type=int, default=1)
+    parser.add_argument("--llm-api", choices=["openai", "ollama"], default="openai")
+    parser.add_argument(
+        "--server-concurrency",
+        type=int,
+        default=0,
+        help="Her sahte sunucunun aynı anda işlediği istek (0: sınırsız)",
+    )
+    parser.add_argument(
+        "--ingestion", choices=["archive", "contents"], default="archive"
+    )
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--check-errors", action="store_true")
+    parser.add_argument("--no-combined", dest="combined", action="store_false")
+    parser.add_argument(
+        "--batch", type=int, default=0, help="Toplu açıklama token bütçesi (0: kapalı)"
+    )
+    parser.add_argument("--stream", action="store_true", help="Akışlı LLM yanıtları")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.child:
+        run_child(args)
+        return 0
+
+    llms = [
+        FakeLLMServer(
+            latency=args.latency,
+            token_rate=args.token_rate,
+            prefill_rate=args.prefill_rate,
+            response_tokens=args.response_tokens,
+            concurrency=args.server_concurrency,
+        ).start()
+        for _ in range(max(1, args.llm_servers))
+    ]
+    rows = []
+    try:
+        for size in args.sizes:
+            print(f"⏱️ {size} repo ölçülüyor...", file=sys.stderr)
+            rows.append(run_size(size, args, llms))
+    finally:
+        for llm in llms:
+            llm.stop()
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Benchmark için deterministik, sentetik Python repoları üretir"""
+
+import os
+import random
+
+# boyut: (dosya sayısı, dosya başına fonksiyon, sınıf başına metot)
+REPO_SIZES = {
+    "small": (10, 6, 4),
+    "medium": (100, 12, 6),
+    "huge": (1000, 20, 10),
+}
+
+FILES_PER_PACKAGE = 25
+MODULES = ["os", "re", "json", "math", "itertools", "collections", "functools"]
+
+
+def _function_source(rng, name, indent=""):
+    args = ", ".join(f"arg{i}" for i in range(rng.randint(1, 4)))
+    if indent:
+        args = f"self, {args}"
+    body = [
+        f"{indent}def {name}({args}):",
+        f'{indent}    """{name} için örnek gövde"""',
+    ]
+    body.append(f"{indent}    total = 0")
+    for i in range(rng.randint(2, 8)):
+        body.append(f"{indent}    for item in range(arg0 + {i}):")
+        body.append(f"{indent}        if item % {rng.randint(2, 9)} == 0:")
+        body.append(f"{indent}            total += item * {rng.randint(1, 99)}")
+        body.append(f"{indent}        else:")
+        body.append(f"{indent}            total -= {rng.randint(1, 9)}")
+    body.append(f"{indent}    return total")
+    return "\n".join(body) + "\n"
+
+
+def generate_module(rng, index, functions, methods):
+    imports = rng.sample(MODULES, 3)
+    parts = [f'"""Sentetik modül {index}"""\n'] + [f"import {m}" for m in imports]
+    parts.append("")
+    for i in range(functions):
+        parts.append(_function_source(rng, f"func_{index}_{i}"))
+    parts.append(f"class Service{index}:")
+    parts.append(f'    """Sentetik sınıf {index}"""\n')
+    for i in range(methods):
+        parts.append(_function_source(rng, f"method_{i}", indent="    "))
+    return "\n".join(parts)
+
+
+def generate_repo(target_dir, size, seed=0):
+    """target_dir altına istenen boyutta bir repo yazar, dosya sayısını döndürür"""
+    file_count, functions, methods = REPO_SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+    for index in range(file_count):
+        package = os.path.join(target_dir, f"pkg{index // FILES_PER_PACKAGE}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"module_{index}.py"), "w") as f:
+            f.write(generate_module(rng, index, functions, methods))
+    # Analize girmeyen dosyalar da gerçek repolardaki gibi bulunur
+    with open(os.path.join(target_dir, "README.md"), "w") as f:
+        f.write(f"# Sentetik {size} repo\n")
+    return file_count
@@ -0,0 +1,400 @@
+"""GitTextLab komut satırı: birden fazla repoyu arayüz olmadan analiz eder.
+
+Örnek:
+    python cli.py --repos-file repolar.txt --output-dir sonuclar --workers 2
+
+Repo listesinde her satır "kullanıcı/repo" ya da yerel bir dizin yoludur;
+boş satırlar ve # ile başlayan satırlar yok sayılır. Her repo için
+<kullanıcı>_<repo>_analysis.json dosyası yazılır. Tamamlanan repolar
+sonraki çalıştırmalarda atlanır; yarıda kesilen bir reponun bitmiş
+dosyaları .partial dosyasından okunup yeniden kullanılır.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from analysis.github_analysis import (
+    INGESTION_ARCHIVE,
+    INGESTION_CONTENTS,
+    AnalysisOptions,
+    analyze_github_repository,
+)
+from analysis.duplicates import (
+    DUPLICATE_MATCH,
+    DUPLICATES_EXACT,
+    DUPLICATES_NEAR,
+    DUPLICATES_OFF,
+    duplicate_report,
+)
+from analysis.function_budget import (
+    FUNCTION_FILE_LIMIT,
+    FUNCTION_TIME_BUDGET,
+    FUNCTION_TOKEN_BUDGET,
+)
+from analysis.incremental import load_previous_results
+from analysis.llm_backends import configure_llm_backends, get_llm_pool
+from analysis.progress import ConsoleProgress
+from analysis.project_score import score_project
+from analysis.result_store import ResultStore
+from analysis.telemetry import Telemetry, export_telemetry
+from analysis.shared import (
+    BATCH_TOKEN_BUDGET,
+    LLM_MAX_PARALLEL,
+    get_llm_scheduler,
+)
+
+CLI_REPO_WORKERS = 2  # Aynı anda analiz edilen repo sayısı
+
+
+def parse_repo_list(lines):
+    """Satırlardan (kullanıcı, repo, yerel_yol) üçlülerini çıkarır"""
+    repos = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if os.path.isdir(line):
+            repo_name = os.path.basename(os.path.normpath(line))
+            repos.append(("local", repo_name, line))
+            continue
+        parts = line.rstrip("/").split("/")
+        if len(parts) < 2:
+            raise ValueError(f"Geçersiz repo satırı: {line!r}")
+        # https://github.com/kullanıcı/repo biçimi de kabul edilir
+        repos.append((parts[-2], parts[-1].removesuffix(".git"), None))
+    return repos
+
+
+def result_path(output_dir, username, repo_name):
+    return os.path.join(output_dir, f"{username}_{repo_name}_analysis.json")
+
+
+def is_completed(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return bool(json.load(f).get("completed"))
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def load_partial(partial_path):
+    """Yarıda kalan çalıştırmada tamamlanan dosya analizlerini okur"""
+    files = []
+    if not os.path.exists(partial_path):
+        return files
+    with open(partial_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                files.append(json.loads(line))
+            except ValueError:
+                # Kesinti anında yarım yazılmış satır; sonrakiler sağlamdır
+                continue
+    return files
+
+
+def open_partial(partial_path):
+    """.partial dosyasını ekleme için açar; yarım kalmış son satırı sonlandırır"""
+    needs_newline = False
+    if os.path.exists(partial_path) and os.path.getsize(partial_path):
+        with open(partial_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    partial_file = open(partial_path, "a", encoding="utf-8")
+    if needs_newline:
+        # Yeni kayıt yarım satırın devamına yazılıp onunla birlikte bozulmasın
+        partial_file.write("\n")
+    return partial_file
+
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def analyze_repo(username, repo_name, local_path, args, store=None):
+    """Tek repoyu analiz edip sonucunu yazar; sonuç dosyasının yolunu döndürür"""
+    label = local_path or f"{username}/{repo_name}"
+    progress = ConsoleProgress(label, verbose=args.verbose)
+    path = result_path(args.output_dir, username, repo_name)
+    partial_path = f"{path}.partial"
+
+    # Önceki tam sonuç ve yarım kalan dosyalar birlikte yeniden kullanılır
+    previous_results = (load_previous_results(path) or []) + load_partial(partial_path)
+
+    # Sonuç veritabanında her repo çalıştırması ayrı bir kayıttır
+    repo_key = f"{username}/{repo_name}"
+    run_id = None
+    if store is not None:
+        store.discard_incomplete_runs(repo_key)
+        run_id = store.start_run(
+            repo_key, {"optimize": args.optimize, "check_errors": args.check_errors}
+        )
+
+    def save_file(file_analysis):
+        partial_file.write(json.dumps(file_analysis, ensure_ascii=False) + "\n")
+        partial_file.flush()
+        if run_id:
+            store.add_file(run_id, file_analysis)
+
+    stats = {}
+    file_records = []
+    started = time.time()
+    telemetry = Telemetry({"repo": label})
+    partial_file = open_partial(partial_path)
+    try:
+        with telemetry.activate():
+            results = analyze_github_repository(
+                username,
+                repo_name,
+                AnalysisOptions(
+                    ingestion=args.ingestion,
+                    local_path=local_path,
+                    github_token=args.github_token,
+                    do_optimize=args.optimize,
+                    do_check_errors=args.check_errors,
+                    combined=args.combined,
+                    batch_token_budget=BATCH_TOKEN_BUDGET if args.batch else 0,
+                    function_token_budget=args.token_budget,
+                    function_time_budget=args.time_budget,
+                    function_file_limit=args.file_limit,
+                    duplicate_match=args.duplicates,
+                    on_file_done=save_file,
+                ),
+                previous_results=previous_results or None,
+                stats=stats,
+                file_records=file_records,
+                progress=progress,
+            )
+    finally:
+        partial_file.close()
+
+    if not results:
+        raise RuntimeError("Analiz sonucu boş")
+
+    score = score_details = None
+    if not args.no_score:
+        with telemetry.activate():
+            score_details = score_project(
+                results, file_records, use_llm=not args.fast_score, progress=progress
+            )
+        score = score_details["score"]
+    write_json_atomic(
+        path,
+        {
+            "repository": label,
+            "completed": True,
+            "analyzed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration_seconds": round(time.time() - started, 2),
+            "score": score,
+            "score_details": score_details,
+            "stats": stats,
+            "duplicates": duplicate_report(results),
+            "files": results,
+        },
+    )
+    os.remove(partial_path)
+    if run_id:
+        store.finish_run(run_id, stats, score, score_details, file_records)
+    export_telemetry(telemetry, path)
+    progress.success(f"Tamamlandı: {len(results)} dosya, puan: {score} -> {path}")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="GitHub repolarını veya yerel dizinleri arayüz olmadan analiz eder."
+    )
+    parser.add_argument("repos", nargs="*", help="kullanıcı/repo veya yerel dizin")
+    parser.add_argument(
+        "-f", "--repos-file", help="Her satırında bir repo bulunan dosya (- : stdin)"
+    )
+    parser.add_argument("-o", "--output-dir", default="results")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=CLI_REPO_WORKERS,
+        help="Aynı anda analiz edilecek repo sayısı",
+    )
+    parser.add_argument(
+        "--llm-parallel",
+        type=int,
+        help="Tüm repolar arasında paylaşılan en fazla eşzamanlı LLM isteği "
+        f"(varsayılan: sunucu başına {LLM_MAX_PARALLEL})",
+    )
+    parser.add_argument(
+        "--llm-backend",
+        action="append",
+        metavar="URL[#MODEL]",
+        help="LLM sunucusu; birden fazla verilirse istekler aralarında dağıtılır. "
+        "/api/generate veya /api/chat ile biten adresler Ollama olarak kullanılır "
+        "(varsayılan: GITTEXTLAB_LLM_BACKENDS veya GITTEXTLAB_LLM_URL)",
+    )
+    parser.add_argument("--optimize", action="store_true")
+    parser.add_argument("--check-errors", action="store_true")
+    parser.add_argument(
+        "--no-combined",
+        dest="combined",
+        action="store_false",
+        help="Açıklama/optimizasyon/hata analizini ayrı isteklerle al",
+    )
+    parser.add_argument("--batch", action="store_true")
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=FUNCTION_TOKEN_BUDGET,
+        help="Fonksiyon analizine ayrılan tahmini token bütçesi (0: sınırsız)",
+    )
+    parser.add_argument(
+        "--file-limit",
+        type=int,
+        default=FUNCTION_FILE_LIMIT,
+        help="Dosya başına LLM'e gönderilecek en fazla yeni fonksiyon; en "
+        "önemliler seçilir (0: sınırsız)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=[DUPLICATES_EXACT, DUPLICATES_NEAR, DUPLICATES_OFF],
+        default=DUPLICATE_MATCH,
+        help="Kopya fonksiyonların sonucunu temsilciden paylaş "
+        "(near: yalnızca sabitleri farklı olanlar da)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=FUNCTION_TIME_BUDGET,
+        help="Saniye; dolduğunda başlamamış fonksiyon analizleri atlanır (0: yok)",
+    )
+    parser.add_argument("--no-score", action="store_true")
+    parser.add_argument(
+        "--fast-score",
+        action="store_true",
+        help="Puanı yalnızca yerel metriklerden hesapla (LLM düzeltmesi yok)",
+    )
+    parser.add_argument(
+        "--ingestion",
+        choices=[INGESTION_ARCHIVE, INGESTION_CONTENTS],
+        default=INGESTION_ARCHIVE,
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Tamamlanmış repoları da yeniden analiz et (değişmeyenler yeniden kullanılır)",
+    )
+    parser.add_argument(
+        "--db",
+        help="Sonuç veritabanı (varsayılan: <output-dir>/gittextlab_results.sqlite3)",
+    )
+    parser.add_argument(
+        "--no-db", action="store_true", help="Sonuçları veritabanına yazma"
+    )
+    parser.add_argument(
+        "--github-token",
+        help="GitHub token (varsayılan: GITHUB_TOKEN ortam değişkeni)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    lines = list(args.repos)
+    if args.repos_file:
+        if args.repos_file == "-":
+            lines.extend(sys.stdin)
+        else:
+            with open(args.repos_file, encoding="utf-8") as f:
+                lines.extend(f)
+    try:
+        repos = parse_repo_list(lines)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if not repos:
+        print("Analiz edilecek repo verilmedi.", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    store = None
+    if not args.no_db:
+        store = ResultStore(
+            args.db or os.path.join(args.output_dir, "gittextlab_results.sqlite3")
+        )
+    if args.llm_backend:
+        configure_llm_backends(args.llm_backend)
+    pool = get_llm_pool()
+    for name, alive in pool.check_health().items():
+        if not alive:
+            print(f"⚠️ LLM sunucusuna erişilemiyor: {name}", file=sys.stderr)
+    # Tüm repolar aynı LLM zamanlayıcısını ve eşzamanlılık sınırını paylaşır
+    get_llm_scheduler(args.llm_parallel)
+
+    todo = []
+    for username, repo_name, local_path in repos:
+        path = result_path(args.output_dir, username, repo_name)
+        if not args.refresh and is_completed(path):
+            print(f"Atlandı (tamamlanmış): {path}", file=sys.stderr)
+            continue
+        todo.append((username, repo_name, local_path))
+
+    failures = 0
+    jobs = queue.Queue()
+    for repo in todo:
+        jobs.put(repo)
+    done = queue.Queue()
+
+    def repo_worker():
+        while True:
+            try:
+                repo = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                analyze_repo(*repo, args, store)
+                done.put((repo, None))
+            except Exception as e:
+                done.put((repo, e))
+
+    # Repo thread'leri daemon'dır (LLM zamanlayıcısının işçileri gibi);
+    # Ctrl-C'de süren analizler beklenmeden çıkılır
+    for _ in range(min(max(1, args.workers), len(todo))):
+        threading.Thread(target=repo_worker, daemon=True).start()
+    try:
+        for _ in todo:
+            (username, repo_name, local_path), error = done.get()
+            if error is not None:
+                failures += 1
+                label = local_path or f"{username}/{repo_name}"
+                print(f"❌ [{label}] Analiz başarısız: {error}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(
+            "Kesildi. Tamamlanan dosyalar sonraki çalıştırmada yeniden kullanılacak.",
+            file=sys.stderr,
+        )
+        return 130
+
+    if len(pool.backends) > 1:
+        for backend in pool.snapshot():
+            print(
+                f"🖥️ {backend['name']}: {backend['requests']} istek, "
+                f"{backend['errors']} hata, {backend['failovers']} yönlendirme",
+                file=sys.stderr,
+            )
+    print(
+        f"{len(todo) - failures}/{len(todo)} repo analiz edildi, "
+        f"{len(repos) - len(todo)} repo atlandı.",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
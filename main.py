@@ -1,20 +1,36 @@
 import json
 import streamlit as st
-from analysis.github_analysis import analyze_github_repository
+from analysis.chunked_summary import SUMMARY_TOKEN_THRESHOLD
+from analysis.github_analysis import (
+    AnalysisOptions,
+    analyze_github_repository,
+    get_repository_revision,
+)
 from analysis.visualization import (
+    aggregate_chart_data,
+    create_complexity_chart,
     create_function_chart,
     create_module_chart,
     create_score_bar,
 )
-from analysis.shared import score_project_with_llama
+from analysis.project_score import SCORE_COMPONENT_LABELS, score_project
+from analysis.shared import BATCH_TOKEN_BUDGET
+from analysis.duplicates import DUPLICATE_MATCH, DUPLICATES_OFF, duplicate_report
+from analysis.github_client import create_github_client
+from analysis.function_budget import FUNCTION_TOKEN_BUDGET, SKIP_REASONS
+from analysis.incremental import load_previous_results
+from analysis.llm_backends import get_llm_pool
+from analysis.llm_cache import get_llm_cache
+from analysis.result_store import get_result_store
+from analysis.source_store import SourceStore
+from analysis.telemetry import Telemetry, export_telemetry
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-OLLAMA_MODEL = "deepseek-coder:6.7b"
+DUPLICATE_GROUPS_SHOWN = 20
 
 
 # --- Streamlit Arayüzü ---
@@ -223,11 +239,28 @@ st.markdown(
 with st.form("analyze_form"):
     st.markdown("### 🔍 Analiz Bilgileri")
 
+    source = st.radio(
+        "Kaynak",
+        ["GitHub", "Yerel dizin"],
+        horizontal=True,
+        help="Yerel dizin: makinede bulunan bir klasör, git çalışma kopyası veya bare repo",
+    )
+
     col1, col2 = st.columns(2)
     with col1:
         username = st.text_input("GitHub Kullanıcı Adı", placeholder="örnek: microsoft")
     with col2:
         repo_name = st.text_input("Repo Adı", placeholder="örnek: vscode")
+    local_path = st.text_input(
+        "Yerel Dizin Yolu",
+        placeholder="örnek: /srv/repos/proje veya /srv/git/proje.git",
+    )
+    github_token = st.text_input(
+        "GitHub Token (opsiyonel)",
+        type="password",
+        help="Saatlik istek limitini 60'tan 5000'e çıkarır ve özel repolara erişim sağlar; "
+        "boş bırakılırsa GITHUB_TOKEN ortam değişkeni kullanılır",
+    )
 
     st.markdown("### ⚙️ Analiz Seçenekleri")
 
@@ -242,6 +275,39 @@ with st.form("analyze_form"):
         do_check_errors = st.checkbox(
             "🐛 Hata analizi yap", help="Potansiyel hataları ve riskleri tespit edin"
         )
+        do_combined = st.checkbox(
+            "🧩 Birleşik analiz",
+            value=True,
+            help="Açıklama, optimizasyon ve hata analizini fonksiyon başına tek istekte alır",
+        )
+        do_batch = st.checkbox(
+            "📦 Küçük fonksiyonları toplu açıkla",
+            help="Aynı dosyadaki küçük fonksiyonları tek LLM isteğinde açıklatır",
+        )
+        do_chunked_summary = st.checkbox(
+            "✂️ Büyük dosyaları parça parça özetle",
+            value=True,
+            help="Model bağlamını aşan dosyaları tanım sınırlarından bölüp parçaları paralel özetler",
+        )
+        do_stream = st.checkbox(
+            "⚡ Sonuçları canlı göster",
+            value=True,
+            help="Dosya özetlerini ve açıklamaları model yazdıkça gösterir",
+        )
+        do_dedupe = st.checkbox(
+            "🔁 Kopya fonksiyonları bir kez analiz et",
+            value=True,
+            help="Gövdesi aynı fonksiyonlardan birini analiz edip sonucu diğerlerine kopyalar",
+        )
+        token_budget = st.number_input(
+            "🎯 Fonksiyon analizi token bütçesi",
+            min_value=0,
+            value=FUNCTION_TOKEN_BUDGET,
+            step=50_000,
+            help="Fonksiyonlar önem sırasına göre bu tahmini token bütçesine yerleştirilir, "
+            "sığmayanlar atlanır. Bütçe verilirse fonksiyon analizi tüm dosyalar "
+            "ayrıştırıldıktan sonra başlar (0: sınırsız)",
+        )
 
     with col2:
         st.markdown("**📊 Görselleştirme Seçenekleri**")
@@ -255,166 +321,521 @@ with st.form("analyze_form"):
             value=True,
             help="En çok kullanılan Python modüllerini göster",
         )
+        show_complexity_chart = st.checkbox(
+            "🧮 Karmaşıklık Dağılımı Grafiği",
+            value=True,
+            help="Radon ile hesaplanan cyclomatic complexity derecelerini göster",
+        )
         show_score_bar = st.checkbox(
-            "🏆 Proje Puanlama Barı", value=True, help="AI tabanlı proje kalite puanı"
+            "🏆 Proje Puanlama Barı",
+            value=True,
+            help="Yerel metriklerden hesaplanan, AI ile düzeltilen proje kalite puanı",
+        )
+        fast_score = st.checkbox(
+            "⚡ Hızlı puanlama (LLM'siz)",
+            value=False,
+            help="Puan yalnızca yerel metriklerden hesaplanır, LLM düzeltmesi istenmez",
         )
 
     st.markdown("---")
     submitted = st.form_submit_button("🚀 Analizi Başlat", use_container_width=True)
 
+
+def run_analysis(
+    username, repo_name, local_path, options, cache_key, github_token=None
+):
+    """Analizi çalıştırır (ya da veritabanındaki aynı sürüm ve seçenekli
+    sonucu yükler) ve sonraki yeniden çalıştırmalarda kullanılacak kaydı
+    döndürür. Sonuç alınamazsa None döner."""
+    repo_key = f"{username}/{repo_name}"
+    json_path = f"{username}_{repo_name}_analysis.json"
+    result_store = get_result_store()
+    revision = cache_key[1]
+    # Akış yalnızca gösterimi etkiler, sonucu değiştirmez
+    store_options = {k: v for k, v in options.items() if k != "stream"}
+    store_options["revision"] = revision
+
+    analysis = {
+        "key": cache_key,
+        # Yerel kaynaklar için GitHub'dan dosya indirilmez
+        "github_repo": None if local_path else repo_key,
+        "json_path": json_path,
+        "options": options,
+        "run_id": None,
+        "score": None,
+        "score_details": None,
+        # Fonksiyonu olmayanlar dahil her dosyanın metrikleri; puan için
+        "file_records": None,
+        "charts": {},
+        "notices": [],
+        # Alınan kaynaklar grafikler için bellekte tutulur, tekrar indirilmez
+        "source_store": SourceStore(),
+        # Aşama süreleri ve LLM çağrıları analiz dosyasının yanına yazılır
+        "telemetry": Telemetry({"repo": repo_key}),
+        "record_telemetry": True,
+        "telemetry_dirty": True,
+    }
+
+    # Aynı sürüm aynı seçeneklerle daha önce analiz edildiyse yeniden kullan
+    if result_store is not None and revision:
+        previous_run = result_store.find_run(repo_key, store_options)
+        if previous_run:
+            analysis["run_id"] = previous_run["id"]
+            analysis["score"] = previous_run["score"]
+            analysis["score_details"] = previous_run.get("score_details")
+            analysis["results"] = result_store.load_run(previous_run["id"])
+            analysis["file_records"] = previous_run.get("file_records")
+            analysis["record_telemetry"] = False
+            analysis["notices"].append(
+                (
+                    "info",
+                    "♻️ Bu sürüm aynı seçeneklerle daha önce analiz edilmiş, "
+                    "kayıtlı sonuç gösteriliyor.",
+                )
+            )
+            return analysis if analysis["results"] else None
+
+    # Önceki analiz varsa değişmeyen dosya ve fonksiyonlar yeniden kullanılır
+    previous_results = None
+    if result_store is not None:
+        previous_results = result_store.load_latest(repo_key)
+    if previous_results is None:
+        previous_results = load_previous_results(json_path)
+
+    # Sonuçlar her dosya bittiğinde veritabanına yazılır
+    run_id = None
+    if result_store is not None:
+        run_id = result_store.start_run(repo_key, store_options)
+    run_stats = {}
+    file_records = []
+
+    # Canlı akış: özetler ve açıklamalar model yazdıkça burada görünür
+    live_slot = st.empty()
+    live_area = live_slot.container()
+    live_boxes = {}
+    live_placeholders = {}
+
+    def show_partial(path, func_name, text):
+        key = (path, func_name)
+        if key not in live_placeholders:
+            if path not in live_boxes:
+                live_boxes[path] = live_area.expander(f"📄 **{path}**", expanded=True)
+            live_placeholders[key] = live_boxes[path].empty()
+        title = "📝 Dosya Özeti" if func_name is None else f"🔧 {func_name}"
+        live_placeholders[key].markdown(f"**{title}**\n\n{text}")
+
+    telemetry = analysis["telemetry"]
+    with st.spinner("Analiz yapılıyor, lütfen bekleyin..."), telemetry.activate():
+        results = analyze_github_repository(
+            username,
+            repo_name,
+            AnalysisOptions(
+                local_path=local_path,
+                github_token=github_token,
+                do_optimize=options["optimize"],
+                do_check_errors=options["check_errors"],
+                combined=options["combined"],
+                batch_token_budget=BATCH_TOKEN_BUDGET if options["batch"] else 0,
+                summary_token_threshold=(
+                    SUMMARY_TOKEN_THRESHOLD if options["chunked_summary"] else 0
+                ),
+                function_token_budget=options["token_budget"],
+                duplicate_match=options["duplicate_match"],
+                on_partial=show_partial if options["stream"] else None,
+                on_file_done=(
+                    (lambda file: result_store.add_file(run_id, file))
+                    if run_id
+                    else None
+                ),
+            ),
+            source_store=analysis["source_store"],
+            previous_results=previous_results,
+            stats=run_stats,
+            file_records=file_records,
+        )
+    # Tam sonuçlar aşağıda gösterileceği için canlı alan temizlenir
+    live_slot.empty()
+
+    if not results:
+        if run_id:
+            result_store.delete_run(run_id)
+        return None
+
+    # JSON dosyası eski araçlarla uyumluluk için yazılmaya devam eder
+    if run_id:
+        result_store.finish_run(run_id, run_stats, file_records=file_records)
+        result_store.export_json(run_id, json_path)
+    else:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False)
+    analysis["run_id"] = run_id
+    analysis["results"] = results
+    analysis["file_records"] = file_records
+    analysis["notices"].append(
+        ("success", f"Analiz tamamlandı ve '{json_path}' dosyasına kaydedildi.")
+    )
+
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        cache_stats = llm_cache.stats()
+        analysis["notices"].append(
+            (
+                "caption",
+                f"🗄️ LLM önbelleği: {cache_stats['hits']} isabet, "
+                f"{cache_stats['misses']} ıska, {cache_stats['entries']} kayıt",
+            )
+        )
+
+    # Birden fazla sunucu varsa isteklerin dağılımı gösterilir (süreç başından beri)
+    backends = get_llm_pool().snapshot()
+    if len(backends) > 1:
+        analysis["notices"].append(
+            (
+                "caption",
+                "🖥️ LLM sunucuları: "
+                + ", ".join(
+                    f"{b['name']} {b['requests']} istek"
+                    + (f" ({b['errors']} hata)" if b["errors"] else "")
+                    + ("" if b["healthy"] else " ⚠️ erişilemiyor")
+                    for b in backends
+                ),
+            )
+        )
+    return analysis
+
+
+def cached_chart(analysis, name, build):
+    """Grafik her analiz için bir kez oluşturulur, yeniden çalıştırmalarda tekrar kullanılır"""
+    charts = analysis["charts"]
+    if name not in charts:
+        with analysis["telemetry"].stage("charts"):
+            charts[name] = build()
+        analysis["telemetry_dirty"] = True
+    return charts[name]
+
+
+def chart_data(analysis, with_modules):
+    """Grafik sayımları sonuçlar üzerinde tek geçişte toplanır ve saklanır"""
+    return cached_chart(
+        analysis,
+        ("data", with_modules),
+        lambda: aggregate_chart_data(
+            analysis["results"],
+            analysis["source_store"],
+            with_modules,
+            repo=analysis["github_repo"],
+        ),
+    )
+
+
 if submitted:
-    if not username or not repo_name:
+    use_local = source == "Yerel dizin"
+    if use_local:
+        local_path = local_path.strip()
+        username = "local"
+        repo_name = os.path.basename(os.path.normpath(local_path)) if local_path else ""
+    else:
+        local_path = None
+
+    if use_local and not os.path.isdir(local_path or ""):
+        st.warning("Lütfen var olan bir yerel dizin yolu girin.")
+    elif not username or not repo_name:
         st.warning("Lütfen hem kullanıcı adı hem repo adını girin.")
     else:
-        # Session state'e kaydet (grafiklerde kullanmak için)
-        st.session_state["username"] = username
-        st.session_state["repo_name"] = repo_name
+        analysis_options = {
+            "optimize": do_optimize,
+            "check_errors": do_check_errors,
+            "combined": do_combined,
+            "batch": do_batch,
+            "chunked_summary": do_chunked_summary,
+            "token_budget": int(token_budget),
+            "duplicate_match": DUPLICATE_MATCH if do_dedupe else DUPLICATES_OFF,
+            "stream": do_stream,
+        }
+        result_options = {k: v for k, v in analysis_options.items() if k != "stream"}
+        github_token = github_token.strip() or None
+        revision = get_repository_revision(
+            username,
+            repo_name,
+            local_path,
+            client=None if local_path else create_github_client(github_token),
+        )
+        cache_key = (
+            f"{username}/{repo_name}",
+            revision,
+            tuple(sorted(result_options.items())),
+        )
+
+        # Aynı repo, sürüm ve seçeneklerle tekrar gönderilen form analizi yinelemez
+        previous = st.session_state.get("analysis")
+        if previous is None or previous["key"] != cache_key or revision is None:
+            # Önceki analizin diske taşan kaynakları oturum boyunca birikmesin
+            if previous is not None:
+                previous["source_store"].close()
+                st.session_state["analysis"] = None
+            st.session_state["analysis"] = run_analysis(
+                username,
+                repo_name,
+                local_path,
+                analysis_options,
+                cache_key,
+                github_token,
+            )
+            if st.session_state["analysis"] is None:
+                st.error("Analiz için geçerli bir sonuç alınamadı.")
+
+# Sonuçlar session state'te tutulur; widget etkileşimleri analizi yeniden
+# çalıştırmaz, yalnızca aşağıdaki gösterim yinelenir
+analysis = st.session_state.get("analysis")
+if analysis:
+    results = analysis["results"]
+    telemetry = analysis["telemetry"]
+    do_optimize = analysis["options"]["optimize"]
+    do_check_errors = analysis["options"]["check_errors"]
+
+    for kind, message in analysis["notices"]:
+        getattr(st, kind)(message)
 
-        with st.spinner("Analiz yapılıyor, lütfen bekleyin..."):
-            results = analyze_github_repository(
-                username, repo_name, do_optimize, do_check_errors
+    # Grafikleri göster
+    if (
+        show_function_chart
+        or show_module_chart
+        or show_complexity_chart
+        or show_score_bar
+    ):
+        st.markdown(
+            """
+        <div class="gradient-header">
+            <h2>📊 Proje İstatistikleri ve Grafikler</h2>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+    col1, col2 = st.columns(2)
+
+    # Fonksiyon grafiği
+    st.markdown("#### 🔧 Fonksiyon Analizi")
+    if show_function_chart:
+        with col1:
+            # st.markdown(
+            #     '<div class="chart-container">', unsafe_allow_html=True
+            # )
+
+            func_chart = cached_chart(
+                analysis,
+                "function",
+                lambda: create_function_chart(chart_data(analysis, show_module_chart)),
             )
-            if results:
-                json_path = f"{username}_{repo_name}_analysis.json"
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(results, f, indent=4, ensure_ascii=False)
-                st.success(f"Analiz tamamlandı ve '{json_path}' dosyasına kaydedildi.")
-
-                # Grafikleri göster
-                if show_function_chart or show_module_chart or show_score_bar:
-                    st.markdown(
-                        """
-                    <div class="gradient-header">
-                        <h2>📊 Proje İstatistikleri ve Grafikler</h2>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
+            if func_chart:
+                st.image(func_chart)
+            else:
+                st.info("🔍 Fonksiyon grafiği için yeterli veri bulunamadı.")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    # Modül grafiği
+    if show_module_chart:
+        with col2:
+            # st.markdown(
+            #     '<div class="chart-container">', unsafe_allow_html=True
+            # )
+            # st.markdown("#### 📦 Modül Kullanımı")
+            module_chart = cached_chart(
+                analysis,
+                "module",
+                lambda: create_module_chart(chart_data(analysis, True)),
+            )
+            if module_chart:
+                st.image(module_chart)
+            else:
+                st.info("🔍 Modül grafiği için yeterli veri bulunamadı.")
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    # Karmaşıklık dağılımı (yerel radon metrikleri, LLM gerektirmez)
+    if show_complexity_chart:
+        complexity_chart = cached_chart(
+            analysis,
+            "complexity",
+            lambda: create_complexity_chart(chart_data(analysis, show_module_chart)),
+        )
+        if complexity_chart:
+            st.image(complexity_chart)
+        else:
+            st.info("🔍 Karmaşıklık grafiği için yeterli veri bulunamadı.")
+
+    # Proje puanlama barı
+    if show_score_bar:
+        # st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        details = analysis["score_details"]
+        # Puan yoksa, eski yöntemle hesaplandıysa ya da mod değiştiyse yeniden hesaplanır
+        if details is None or details.get("fast") != fast_score:
+            with st.spinner("🧮 Proje puanı hesaplanıyor..."):
+                with telemetry.activate():
+                    details = score_project(
+                        results, analysis["file_records"], use_llm=not fast_score
                     )
+            analysis["score"] = details["score"]
+            analysis["score_details"] = details
+            analysis["charts"].pop("score", None)
+            analysis["telemetry_dirty"] = True
+            result_store = get_result_store()
+            if analysis["run_id"] and result_store is not None:
+                result_store.set_score(analysis["run_id"], details["score"], details)
+        score = analysis["score"]
+        score_chart = cached_chart(analysis, "score", lambda: create_score_bar(score))
+        st.image(score_chart)
 
-                col1, col2 = st.columns(2)
-
-                # Fonksiyon grafiği
-                st.markdown("#### 🔧 Fonksiyon Analizi")
-                if show_function_chart:
-                    with col1:
-                        # st.markdown(
-                        #     '<div class="chart-container">', unsafe_allow_html=True
-                        # )
-
-                        func_chart = create_function_chart(results)
-                        if func_chart:
-                            st.pyplot(func_chart)
-                        else:
-                            st.info(
-                                "🔍 Fonksiyon grafiği için yeterli veri bulunamadı."
-                            )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                # Modül grafiği
-                if show_module_chart:
-                    with col2:
-                        # st.markdown(
-                        #     '<div class="chart-container">', unsafe_allow_html=True
-                        # )
-                        # st.markdown("#### 📦 Modül Kullanımı")
-                        module_chart = create_module_chart(results)
-                        if module_chart:
-                            st.pyplot(module_chart)
-                        else:
-                            st.info("🔍 Modül grafiği için yeterli veri bulunamadı.")
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                # Proje puanlama barı
-                if show_score_bar:
-                    # st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                    with st.spinner("🤖 AI modeli projeyi değerlendiriyor..."):
-                        score = score_project_with_llama(results)
-                        score_chart = create_score_bar(score)
-                        st.pyplot(score_chart)
-
-                        # Puanlama açıklaması
-                        col1, col2, col3 = st.columns([1, 2, 1])
-                        with col2:
-                            if score >= 80:
-                                st.success(
-                                    f"🎉 **Mükemmel!** Projeniz **{score}** puan aldı. Kod kalitesi çok yüksek."
-                                )
-                            elif score >= 60:
-                                st.warning(
-                                    f"👍 **İyi!** Projeniz **{score}** puan aldı. Bazı iyileştirmeler yapılabilir."
-                                )
-                            else:
-                                st.error(
-                                    f"🔧 **Geliştirilmeli!** Projeniz **{score}** puan aldı. Kod kalitesini artırmaya odaklanın."
-                                )
-                    st.markdown("</div>", unsafe_allow_html=True)
+        # Puanlama açıklaması
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if score >= 80:
+                st.success(
+                    f"🎉 **Mükemmel!** Projeniz **{score}** puan aldı. Kod kalitesi çok yüksek."
+                )
+            elif score >= 60:
+                st.warning(
+                    f"👍 **İyi!** Projeniz **{score}** puan aldı. Bazı iyileştirmeler yapılabilir."
+                )
+            else:
+                st.error(
+                    f"🔧 **Geliştirilmeli!** Projeniz **{score}** puan aldı. Kod kalitesini artırmaya odaklanın."
+                )
+            with st.expander("🔎 Puan dökümü"):
+                st.markdown(
+                    "\n".join(
+                        f"- {SCORE_COMPONENT_LABELS[name]}: **{value}**/100"
+                        for name, value in details["components"].items()
+                        if value is not None
+                    )
+                )
+                st.caption(
+                    f"Yerel metriklerden temel puan: {details['baseline']} "
+                    f"({details['parsed_files']}/{details['files']} dosya, "
+                    f"{details['functions']} fonksiyon)"
+                )
+                if details["llm"]:
+                    adjustment = f"{details['adjustment']:+d}"
+                    reason = f": {details['reason']}" if details["reason"] else ""
+                    st.caption(f"🤖 AI düzeltmesi {adjustment}{reason}")
+                elif not details["fast"]:
+                    st.caption("🤖 AI düzeltmesi alınamadı, temel puan kullanıldı.")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # Telemetri yalnızca yeni bir ölçüm eklendiğinde yeniden yazılır
+    if analysis["record_telemetry"] and analysis["telemetry_dirty"]:
+        analysis["telemetry_dirty"] = False
+        try:
+            telemetry_json, _ = export_telemetry(telemetry, analysis["json_path"])
+            stages = telemetry.snapshot()["stages"]
+            analysis["telemetry_caption"] = (
+                "⏱️ Aşama süreleri: "
+                + ", ".join(
+                    f"{name} {stage['seconds']:.1f}s" for name, stage in stages.items()
+                )
+                + f" ('{telemetry_json}')"
+            )
+        except OSError as e:
+            st.warning(f"Telemetri kaydedilemedi: {e}")
+    if analysis.get("telemetry_caption"):
+        st.caption(analysis["telemetry_caption"])
+
+    st.markdown(
+        """
+    <div class="gradient-header">
+        <h2>📋 Detaylı Analiz Sonuçları</h2>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
 
+    # Kopya fonksiyon raporu
+    if "duplicates" not in analysis:
+        analysis["duplicates"] = duplicate_report(results)
+    if analysis["duplicates"]:
+        with st.expander(
+            f"🔁 **Kopya Fonksiyonlar** ({len(analysis['duplicates'])} grup)"
+        ):
+            for group in analysis["duplicates"][:DUPLICATE_GROUPS_SHOWN]:
+                kind = "birebir" if group["match"] == "exact" else "yakın"
                 st.markdown(
-                    """
-                <div class="gradient-header">
-                    <h2>📋 Detaylı Analiz Sonuçları</h2>
+                    f"**{group['count']} {kind} kopya** "
+                    f"({group['redundant_lines']} gereksiz satır): "
+                    + ", ".join(
+                        f"`{member['path']}:{member['name']}`"
+                        for member in group["functions"]
+                    )
+                )
+
+    # Detaylı sonuçları göster
+    for i, file in enumerate(results):
+        with st.expander(
+            f"📄 **{file['source_file']}** ({len(file.get('functions', []))} fonksiyon)",
+            expanded=(i == 0),
+        ):
+            st.markdown(
+                """
+            <div class="info-card">
+                <strong style="color: var(--text-primary);">📝 Dosya Özeti:</strong>
+            </div>
+            """,
+                unsafe_allow_html=True,
+            )
+            st.info(file["file_summary"])
+
+            for j, func in enumerate(file.get("functions", [])):
+                st.markdown(
+                    f"""
+                <div class="function-card">
+                    <h4>
+                        🔧 {func.get("name", "isimsiz")} 
+                        <span>
+                            (Satır: {func.get("lineno", "?")} | Uzunluk: {func.get("length", "?")} | Karmaşıklık: {func.get("complexity", "?")} {func.get("complexity_rank", "")})
+                        </span>
+                    </h4>
                 </div>
                 """,
                     unsafe_allow_html=True,
                 )
 
-                # Detaylı sonuçları göster
-                for i, file in enumerate(results):
-                    with st.expander(
-                        f"📄 **{file['source_file']}** ({len(file.get('functions', []))} fonksiyon)",
-                        expanded=(i == 0),
-                    ):
-                        st.markdown(
-                            """
-                        <div class="info-card">
-                            <strong style="color: var(--text-primary);">📝 Dosya Özeti:</strong>
-                        </div>
-                        """,
-                            unsafe_allow_html=True,
+                with st.container():
+                    if func.get("duplicate_of"):
+                        original = func["duplicate_of"]
+                        st.caption(
+                            f"🔁 {original['path']}:{original['name']} "
+                            f"(satır {original['lineno']}) fonksiyonunun kopyası; "
+                            "sonuç ondan paylaşıldı."
+                        )
+                    st.markdown("**💡 Açıklama:**")
+                    st.markdown(func.get("explanation", "Açıklama bulunamadı."))
+
+                    if do_optimize and func.get("optimization"):
+                        st.markdown("**🚀 Optimizasyon Önerisi:**")
+                        st.code(
+                            func.get("optimization", "Yok"),
+                            language="python",
                         )
-                        st.info(file["file_summary"])
-
-                        for j, func in enumerate(file.get("functions", [])):
-                            st.markdown(
-                                f"""
-                            <div class="function-card">
-                                <h4>
-                                    🔧 {func.get("name", "isimsiz")} 
-                                    <span>
-                                        (Satır: {func.get("lineno", "?")} | Uzunluk: {func.get("length", "?")} | Karmaşıklık: {func.get("complexity", "?")})
-                                    </span>
-                                </h4>
-                            </div>
-                            """,
-                                unsafe_allow_html=True,
+
+                    if do_check_errors and func.get("error_check"):
+                        st.markdown("**🐛 Hata ve Risk Analizi:**")
+                        st.warning(
+                            func.get(
+                                "error_check",
+                                "Belirtilen bir hata analizi bulunamadı.",
                             )
+                        )
 
-                            with st.container():
-                                st.markdown("**💡 Açıklama:**")
-                                st.markdown(
-                                    func.get("explanation", "Açıklama bulunamadı.")
-                                )
-
-                                if do_optimize and func.get("optimization"):
-                                    st.markdown("**🚀 Optimizasyon Önerisi:**")
-                                    st.code(
-                                        func.get("optimization", "Yok"),
-                                        language="python",
-                                    )
-
-                                if do_check_errors and func.get("error_check"):
-                                    st.markdown("**🐛 Hata ve Risk Analizi:**")
-                                    st.warning(
-                                        func.get(
-                                            "error_check",
-                                            "Belirtilen bir hata analizi bulunamadı.",
-                                        )
-                                    )
-
-                            if j < len(file.get("functions", [])) - 1:
-                                st.markdown("---")
-            else:
-                st.error("Analiz için geçerli bir sonuç alınamadı.")
+                if j < len(file.get("functions", [])) - 1:
+                    st.markdown("---")
+
+            if file.get("skipped_functions"):
+                st.caption(
+                    "⏭️ Bütçe nedeniyle analiz edilmeyen fonksiyonlar: "
+                    + ", ".join(
+                        f"{skipped['name']} (satır {skipped['lineno']}, "
+                        f"{SKIP_REASONS.get(skipped['reason'], skipped['reason'])})"
+                        for skipped in file["skipped_functions"]
+                    )
+                )
 
 # Footer
 st.markdown(